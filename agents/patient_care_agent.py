@@ -6,6 +6,8 @@ English function names with Vietnamese data only
 import logging
 from typing import Dict, Any
 
+from utils.triage_rules import get_triage_rules
+
 logger = logging.getLogger(__name__)
 
 class PatientCareAgent:
@@ -21,10 +23,7 @@ class PatientCareAgent:
             "emergency_priority": 5      # Priority 5 -> Emergency dispatch
         }
         
-        self.emergency_keywords = [
-            'ngất', 'hôn mê', 'co giật', 'khó thở nặng', 'đau ngực dữ dội',
-            'chảy máu nhiều', 'sốc', 'đột quỵ', 'nhồi máu'
-        ]
+        self.triage_rules = get_triage_rules()
     
     def process_patient(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -42,16 +41,13 @@ class PatientCareAgent:
             description = patient_data.get('mo_ta', patient_data.get('description', ''))
             vital_signs = patient_data.get('chi_so_sinh_ton', patient_data.get('vital_signs', {}))
             
-            # Check for emergency keywords in description
-            is_emergency = any(keyword in description.lower() for keyword in self.emergency_keywords)
-            
-            # Check vital signs for emergency indicators
+            # Emergency keywords in description and vital signs ("patient_care_emergency" rules)
+            features = {}
             if vital_signs:
-                heart_rate = vital_signs.get('nhip_tim', vital_signs.get('heart_rate', 0))
-                spo2 = vital_signs.get('spo2', 100)
-                
-                if heart_rate > 120 or heart_rate < 50 or spo2 < 90:
-                    is_emergency = True
+                features["heart_rate"] = vital_signs.get('nhip_tim', vital_signs.get('heart_rate', 0))
+                features["spo2"] = vital_signs.get('spo2', 100)
+            emergency = self.triage_rules.evaluate("patient_care_emergency", features, text=description)
+            is_emergency = emergency["score"] > 0
             
             # Routing decision
             if is_emergency or priority >= self.routing_thresholds["emergency_priority"]:
@@ -75,6 +71,7 @@ class PatientCareAgent:
                 "next_step": next_step,
                 "priority_level": priority,
                 "is_emergency": is_emergency,
+                "emergency_rules": emergency["fired"],
                 "recommended_specialty": patient_data.get('chuyen_khoa', patient_data.get('specialty', 'nội khoa')),
                 "patient_id": patient_data.get('patient_id', 'unknown')
             }
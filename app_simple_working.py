@@ -3,16 +3,28 @@ Simple Working Web Application for Patient Dispatch System
 Uses the tested clean workflow with mock agents
 """
 
-from flask import Flask, render_template, request, jsonify
-from flask_socketio import SocketIO, emit
-import threading
+from flask import Flask, Response, render_template, request, jsonify
+from flask_socketio import SocketIO, emit, join_room, leave_room
+import os
+import hmac
 import json
+import math
+import asyncio
+import time
 import logging
 from datetime import datetime
 import uuid
+from concurrent.futures import TimeoutError as FutureTimeoutError
 
+import config  # noqa: F401 - loads .env
 # Import our working clean workflow
-from workflow_clean_final import PatientDispatchWorkflow as SimplePatientDispatchWorkflow
+from workflow_clean_final import PatientDispatchWorkflow as SimplePatientDispatchWorkflow, WORKFLOW_STEPS
+from workflow_clean_final import AsyncPatientDispatchWorkflow
+from utils.worker_pool import PriorityWorkerPool, QueueFullError
+from utils.progress_events import CompactProgressEncoder
+from utils.session_store import SessionStore
+from utils.llm_metrics import get_metrics
+from utils.http_transport import get_transport
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -26,8 +38,70 @@ socketio = SocketIO(app, cors_allowed_origins="*")
 # Initialize workflow
 workflow = SimplePatientDispatchWorkflow()
 
-# Store active sessions
-active_sessions = {}
+# Bounded worker pool - workflow runs and QA chats are admitted by priority
+QA_CHAT_PRIORITY = 0
+QA_CHAT_TIMEOUT_SECONDS = 30
+worker_pool = PriorityWorkerPool(
+    max_workers=int(os.getenv('WORKFLOW_MAX_WORKERS', '4')),
+    max_queue=int(os.getenv('WORKFLOW_MAX_QUEUE', '100')),
+    name='workflow-pool'
+)
+
+# Bulk NDJSON intake: patients per request and default/maximum concurrency
+BULK_MAX_ITEMS = int(os.getenv('WORKFLOW_BULK_MAX_ITEMS', '10000'))
+BULK_CONCURRENCY = int(os.getenv('WORKFLOW_BULK_CONCURRENCY', '32'))
+bulk_workflow = AsyncPatientDispatchWorkflow(max_blocking_calls=BULK_CONCURRENCY)
+
+# Step pacing: 'demo' waits 1s before each step, 'realtime' emits processing/completed
+# events without delays, 'none' emits only completed events (latency = compute time)
+PACING_MODES = ('demo', 'realtime', 'none')
+PACING_MODE = os.getenv('WORKFLOW_PACING', 'demo')
+if PACING_MODE not in PACING_MODES:
+    logger.warning(f"Unknown WORKFLOW_PACING '{PACING_MODE}', using 'demo'")
+    PACING_MODE = 'demo'
+DEMO_STEP_DELAY_SECONDS = 1
+
+# Hard cap on a single progress event; full step payloads are fetched by URL
+EVENT_MAX_BYTES = int(os.getenv('WORKFLOW_EVENT_MAX_BYTES', '4096'))
+
+STEP_PROCESSING_MESSAGES = {
+    1: 'Đang phân tích mô tả và triệu chứng...',
+    2: 'Đang đánh giá mức độ ưu tiên...',
+    3: 'Đang xác định tuyến điều trị phù hợp...',
+    5: 'Đang tối ưu hóa kết quả...'
+}
+
+# Store active sessions (TTL + LRU bounded, finished sessions compacted)
+active_sessions = SessionStore(
+    ttl_seconds=float(os.getenv('SESSION_TTL_SECONDS', '3600')),
+    max_entries=int(os.getenv('SESSION_MAX_ENTRIES', '1000'))
+)
+
+# Progress events go to the session's room plus this opt-in room for all events.
+# The room sees every patient, so joining needs SUPERVISOR_TOKEN (unset = supervisors disabled);
+# the token is a shared secret sent over the socket - only for trusted networks.
+SUPERVISOR_ROOM = 'supervisor'
+SUPERVISOR_TOKEN = os.getenv('SUPERVISOR_TOKEN', '')
+
+def emit_session_event(event, data):
+    """Emit a workflow event only to clients in the session room and supervisors"""
+    socketio.emit(event, data, to=[data['session_id'], SUPERVISOR_ROOM])
+
+def pre_triage_priority(patient_data):
+    """Cheap priority (1-5) from keywords and vital signs only, used to order the admission queue"""
+    return workflow.pre_triage_priority(patient_data)
+
+def queue_full_response(error):
+    """429 response for a saturated worker pool"""
+    response = jsonify({
+        'success': False,
+        'error': 'Hệ thống đang quá tải, vui lòng thử lại sau',
+        'queue_depth': error.queue_depth,
+        'retry_after': error.retry_after
+    })
+    response.status_code = 429
+    response.headers['Retry-After'] = str(int(error.retry_after))
+    return response
 
 @app.route('/')
 def index():
@@ -41,25 +115,38 @@ def process_patient():
         # Get patient data from request
         patient_data = request.json
         session_id = str(uuid.uuid4())
+        priority = pre_triage_priority(patient_data)
         
         # Store session
-        active_sessions[session_id] = {
-            'status': 'processing',
-            'start_time': datetime.now(),
-            'patient_data': patient_data
-        }
+        active_sessions.create(session_id, {
+            'status': 'queued',
+            'start_time': datetime.now().isoformat(),
+            'patient_data': patient_data,
+            'pre_triage_priority': priority
+        })
         
-        # Start workflow in background thread
-        thread = threading.Thread(
-            target=run_workflow_with_progress,
-            args=(session_id, patient_data)
-        )
-        thread.daemon = True
-        thread.start()
+        # Subscribe the submitting browser before any progress event can fire
+        socket_id = request.headers.get('X-Socket-Id')
+        if socket_id:
+            try:
+                join_room(session_id, sid=socket_id, namespace='/')
+            except (KeyError, ValueError):
+                logger.warning(f"Unknown socket id {socket_id}, client must send join_session")
+        
+        # Queue workflow on the bounded worker pool
+        try:
+            ticket = worker_pool.submit(
+                run_workflow_with_progress, session_id, patient_data, priority=priority
+            )
+        except QueueFullError as e:
+            active_sessions.delete(session_id)
+            return queue_full_response(e)
         
         return jsonify({
             'success': True,
             'session_id': session_id,
+            'priority': priority,
+            'queue_position': ticket.position,
             'message': 'Bắt đầu xử lý bệnh nhân'
         })
         
@@ -70,144 +157,192 @@ def process_patient():
             'error': str(e)
         }), 500
 
-def run_workflow_with_progress(session_id, patient_data):
-    """Run workflow with real-time progress updates"""
+def parse_ndjson_patients(body):
+    """
+    Parse an NDJSON body into patients, isolating malformed lines
+
+    Returns:
+        (list of (line_number, patient), list of (line_number, error))
+    """
+    patients, errors = [], []
+    for line_number, line in enumerate(body.splitlines(), start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            patients.append((line_number, json.loads(line)))
+        except ValueError as e:
+            errors.append((line_number, f'JSON không hợp lệ: {e}'))
+    return patients, errors
+
+def bulk_result_line(line_number, item, result):
+    """One NDJSON output record for a processed patient"""
+    record = {
+        'line': line_number,
+        'id': item.get('id', item.get('request_id')) if isinstance(item, dict) else None,
+        'success': result.get('status') == 'completed',
+        'workflow_id': result.get('workflow_id'),
+        'result': result
+    }
+    if 'error' in result:
+        record['error'] = result['error']
+    return json.dumps(record, ensure_ascii=False, default=str) + '\n'
+
+@app.route('/api/process_patients', methods=['POST'])
+def process_patients():
+    """Bulk intake: NDJSON patients in, NDJSON results streamed back in completion order"""
+    patients, parse_errors = parse_ndjson_patients(request.get_data(as_text=True))
+    if not patients and not parse_errors:
+        return jsonify({
+            'success': False,
+            'error': 'Không có bệnh nhân nào trong yêu cầu'
+        }), 400
+    if len(patients) + len(parse_errors) > BULK_MAX_ITEMS:
+        return jsonify({
+            'success': False,
+            'error': f'Tối đa {BULK_MAX_ITEMS} bệnh nhân mỗi yêu cầu'
+        }), 413
     try:
-        # Initialize progress
-        socketio.emit('workflow_start', {
-            'session_id': session_id,
-            'message': 'Bắt đầu quy trình điều phối bệnh nhân'
-        })
-        
-        # Step 1: Information Extraction
-        socketio.emit('workflow_progress', {
-            'session_id': session_id,
-            'step': 1,
-            'step_name': 'Trích xuất thông tin bệnh nhân',
-            'status': 'processing',
-            'message': 'Đang phân tích mô tả và triệu chứng...'
-        })
-        
-        # Simulate some processing time
-        import time
-        time.sleep(1)
-        
-        extraction_result = workflow.extract_patient_information(patient_data)
-        
-        socketio.emit('workflow_progress', {
-            'session_id': session_id,
-            'step': 1,
-            'step_name': 'Trích xuất thông tin bệnh nhân',
-            'status': 'completed',
-            'result': extraction_result,
-            'message': f"Đã trích xuất {len(extraction_result.get('extracted_symptoms', []))} triệu chứng"
-        })
-        
-        # Step 2: Triage Assessment
-        socketio.emit('workflow_progress', {
-            'session_id': session_id,
-            'step': 2,
-            'step_name': 'Đánh giá phân loại bệnh nhân',
-            'status': 'processing',
-            'message': 'Đang đánh giá mức độ ưu tiên...'
-        })
-        
-        time.sleep(1)
-        triage_result = workflow.perform_triage_assessment(extraction_result)
-        
-        socketio.emit('workflow_progress', {
-            'session_id': session_id,
-            'step': 2,
-            'step_name': 'Đánh giá phân loại bệnh nhân',
-            'status': 'completed',
-            'result': triage_result,
-            'message': f"Mức độ ưu tiên: {triage_result.get('priority_score', 0)}/5 - {triage_result.get('urgency_level', 'N/A')}"
-        })
-        
-        # Step 3: Routing Decision
-        socketio.emit('workflow_progress', {
-            'session_id': session_id,
-            'step': 3,
-            'step_name': 'Quyết định tuyến điều trị',
-            'status': 'processing',
-            'message': 'Đang xác định tuyến điều trị phù hợp...'
-        })
-        
-        time.sleep(1)
-        routing_result = workflow.make_routing_decision(triage_result)
-        
-        socketio.emit('workflow_progress', {
-            'session_id': session_id,
-            'step': 3,
-            'step_name': 'Quyết định tuyến điều trị',
-            'status': 'completed',
-            'result': routing_result,
-            'message': f"Tuyến điều trị: {routing_result.get('route_description', 'N/A')}"
-        })
-        
-        # Step 4: Execute Routing
-        socketio.emit('workflow_progress', {
-            'session_id': session_id,
-            'step': 4,
-            'step_name': 'Thực hiện điều phối',
-            'status': 'processing',
-            'message': f"Đang thực hiện {routing_result.get('route_description', 'điều phối')}..."
-        })
-        
-        time.sleep(1)
-        execution_result = workflow.execute_routing(routing_result, patient_data)
-        
-        socketio.emit('workflow_progress', {
-            'session_id': session_id,
-            'step': 4,
-            'step_name': 'Thực hiện điều phối',
-            'status': 'completed',
-            'result': execution_result,
-            'message': execution_result.get('message', 'Hoàn thành điều phối')
-        })
+        concurrency = min(max(int(request.args.get('concurrency', BULK_CONCURRENCY)), 1), BULK_CONCURRENCY)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Tham số concurrency không hợp lệ'
+        }), 400
+    
+    def generate():
+        for line_number, error in parse_errors:
+            yield json.dumps({'line': line_number, 'id': None, 'success': False, 'error': error},
+                             ensure_ascii=False) + '\n'
         
-        # Step 5: Final Optimization
-        socketio.emit('workflow_progress', {
-            'session_id': session_id,
-            'step': 5,
-            'step_name': 'Tối ưu hóa cuối cùng',
-            'status': 'processing',
-            'message': 'Đang tối ưu hóa kết quả...'
+        # Drive the async workflow on a private event loop for this response
+        loop = asyncio.new_event_loop()
+        results = bulk_workflow.stream_patients((item for _, item in patients), max_in_flight=concurrency)
+        try:
+            while True:
+                try:
+                    index, result = loop.run_until_complete(results.__anext__())
+                except StopAsyncIteration:
+                    break
+                line_number, item = patients[index]
+                yield bulk_result_line(line_number, item, result)
+        finally:
+            loop.run_until_complete(results.aclose())
+            # On client disconnect aclose() cancels the patients in flight; let them finish before closing the loop
+            pending = asyncio.all_tasks(loop)
+            if pending:
+                loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            loop.close()
+    
+    logger.info(f"Bulk intake: {len(patients)} patients, concurrency {concurrency}")
+    return Response(generate(), mimetype='application/x-ndjson')
+
+def step_processing_message(step, previous_result):
+    """Message shown while a step is running"""
+    if step == 4:
+        return f"Đang thực hiện {previous_result.get('route_description', 'điều phối')}..."
+    return STEP_PROCESSING_MESSAGES[step]
+
+def step_completed_message(step, result):
+    """Message shown when a step has finished"""
+    if step == 1:
+        return f"Đã trích xuất {len(result.get('extracted_symptoms', []))} triệu chứng"
+    if step == 2:
+        return f"Mức độ ưu tiên: {result.get('priority_score', 0)}/5 - {result.get('urgency_level', 'N/A')}"
+    if step == 3:
+        return f"Tuyến điều trị: {result.get('route_description', 'N/A')}"
+    if step == 4:
+        return result.get('message', 'Hoàn thành điều phối')
+    return 'Hoàn thành quy trình điều phối bệnh nhân'
+
+class SocketIOProgressSink:
+    """Step event sink that turns workflow StepEvents into Socket.IO progress events"""
+    
+    def __init__(self, session_id, pacing):
+        self.session_id = session_id
+        self.pacing = pacing
+        self.encoder = CompactProgressEncoder(session_id, max_event_bytes=EVENT_MAX_BYTES)
+    
+    def start(self):
+        """Announce the workflow and the first step"""
+        emit_session_event('workflow_start', {
+            'session_id': self.session_id,
+            'message': 'Bắt đầu quy trình điều phối bệnh nhân'
         })
+        self._before_step(1, {})
+    
+    def __call__(self, event):
+        # Keep the full payload for lazy fetching, send only the compact event
+        active_sessions.set_step(self.session_id, event.step, event.result)
+        emit_session_event('workflow_progress', self.encoder.step_event(
+            event.step, event.name, step_completed_message(event.step, event.result),
+            event.result, event.elapsed_ms
+        ))
+        if not event.is_final:
+            self._before_step(event.step + 1, event.result)
+    
+    def _before_step(self, step, previous_result):
+        if self.pacing != 'none':
+            emit_session_event('workflow_progress', {
+                'session_id': self.session_id,
+                'step': step,
+                'step_name': WORKFLOW_STEPS[step - 1][1],
+                'status': 'processing',
+                'message': step_processing_message(step, previous_result)
+            })
+        if self.pacing == 'demo':
+            time.sleep(DEMO_STEP_DELAY_SECONDS)
+
+def run_workflow_with_progress(session_id, patient_data, pacing=None):
+    """Run workflow with real-time progress updates"""
+    try:
+        active_sessions.update(session_id, status='processing')
         
-        time.sleep(1)
-        final_result = workflow.optimize_assignment(execution_result)
+        sink = SocketIOProgressSink(session_id, pacing or PACING_MODE)
+        sink.start()
+        workflow_result = workflow.process_patient_input(patient_data, sink=sink)
+        if workflow_result['status'] != 'completed':
+            raise RuntimeError(workflow_result.get('error', 'Workflow không hoàn thành'))
         
-        socketio.emit('workflow_progress', {
-            'session_id': session_id,
-            'step': 5,
-            'step_name': 'Tối ưu hóa cuối cùng',
-            'status': 'completed',
-            'result': final_result,
-            'message': 'Hoàn thành quy trình điều phối bệnh nhân'
-        })
+        final_result = workflow_result['final_result']
         
         # Send final completion
-        socketio.emit('workflow_complete', {
-            'session_id': session_id,
-            'final_result': final_result,
-            'completion_time': datetime.now().isoformat()
-        })
+        emit_session_event('workflow_complete', sink.encoder.complete_event(
+            workflow.total_steps, final_result, datetime.now().isoformat()
+        ))
         
         # Update session
-        active_sessions[session_id]['status'] = 'completed'
-        active_sessions[session_id]['final_result'] = final_result
+        active_sessions.update(
+            session_id, status='completed', final_result=final_result, end_time=datetime.now().isoformat()
+        )
         
     except Exception as e:
         logger.error(f"Workflow error for session {session_id}: {e}")
-        socketio.emit('workflow_error', {
+        emit_session_event('workflow_error', {
             'session_id': session_id,
             'error': str(e),
             'message': 'Có lỗi xảy ra trong quá trình xử lý'
         })
         
-        active_sessions[session_id]['status'] = 'error'
-        active_sessions[session_id]['error'] = str(e)
+        active_sessions.update(
+            session_id, status='error', error=str(e), end_time=datetime.now().isoformat()
+        )
+
+def qa_timeout_response(ticket):
+    """503 (still queued, job dropped) or 504 (answer still being generated) for a QA chat that timed out"""
+    position = worker_pool.queue_position(ticket.job_id)
+    dropped = worker_pool.cancel(ticket.job_id)
+    response = jsonify({
+        'success': False,
+        'error': 'Hệ thống đang quá tải, vui lòng thử lại sau' if dropped
+                 else 'Quá thời gian chờ câu trả lời, vui lòng thử lại sau',
+        'queue_position': position if dropped else None,
+        'timeout_seconds': QA_CHAT_TIMEOUT_SECONDS
+    })
+    response.status_code = 503 if dropped else 504
+    if dropped:
+        response.headers['Retry-After'] = str(int(worker_pool.stats()['avg_wait_seconds']) + 1)
+    return response
 
 @app.route('/api/qa_chat', methods=['POST'])
 def qa_chat():
@@ -217,13 +352,22 @@ def qa_chat():
         question = data.get('question', '')
         context = data.get('context', '')
         
-        response = workflow.qa_chatbot.ask_question(question, context)
+        ticket = worker_pool.submit(
+            workflow.qa_chatbot.ask_question, question, context,
+            fallback=lambda: workflow.rule_based_answer(question), priority=QA_CHAT_PRIORITY
+        )
+        try:
+            response = ticket.future.result(timeout=QA_CHAT_TIMEOUT_SECONDS)
+        except FutureTimeoutError:
+            return qa_timeout_response(ticket)
         
         return jsonify({
             'success': True,
             'response': response
         })
         
+    except QueueFullError as e:
+        return queue_full_response(e)
     except Exception as e:
         logger.error(f"QA chat error: {e}")
         return jsonify({
@@ -234,6 +378,132 @@ def qa_chat():
             }
         }), 500
 
+# Upper bound for GET /api/sessions/<id>?wait= long-polling
+SESSION_MAX_WAIT_SECONDS = float(os.getenv('SESSION_MAX_WAIT_SECONDS', '30'))
+
+def session_etag(session_id, version):
+    return f"{session_id}-{version}"
+
+def session_view(session_id, session):
+    """Public view of a session: status, outcome and links to step payloads"""
+    steps = sorted(session.get('steps', {}))
+    view = {
+        'session_id': session_id,
+        'status': session.get('status'),
+        'priority': session.get('pre_triage_priority'),
+        'start_time': session.get('start_time'),
+        'end_time': session.get('end_time'),
+        'steps_completed': steps,
+        'step_urls': {step: f"/api/sessions/{session_id}/steps/{step}" for step in steps}
+    }
+    if 'final_result' in session:
+        view['final_result'] = session['final_result']
+    if 'error' in session:
+        view['error'] = session['error']
+    return view
+
+@app.route('/api/sessions/<session_id>')
+def get_session(session_id):
+    """Session status and result, with ETag/If-None-Match and optional long-poll (?wait=seconds)"""
+    try:
+        wait = float(request.args.get('wait', 0))
+    except ValueError:
+        wait = math.nan
+    if not math.isfinite(wait):
+        return jsonify({
+            'success': False,
+            'error': 'Tham số wait không hợp lệ'
+        }), 400
+    wait = min(max(wait, 0.0), SESSION_MAX_WAIT_SECONDS)
+    
+    session, version = active_sessions.get_versioned(session_id)
+    if session is not None and wait and request.if_none_match.contains(session_etag(session_id, version)):
+        # Client already has this version: hold the request until something changes
+        session, version = active_sessions.wait_for_change(session_id, version, wait)
+    
+    if session is None:
+        return jsonify({
+            'success': False,
+            'error': 'Không tìm thấy phiên xử lý'
+        }), 404
+    
+    etag = session_etag(session_id, version)
+    if request.if_none_match.contains(etag):
+        response = app.response_class(status=304)
+    else:
+        response = jsonify({'success': True, **session_view(session_id, session)})
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/api/sessions/<session_id>/steps/<int:step>')
+def get_session_step(session_id, step):
+    """Full result payload of one workflow step"""
+    result = active_sessions.get_step(session_id, step)
+    if result is None:
+        return jsonify({
+            'success': False,
+            'error': 'Không tìm thấy kết quả cho bước này'
+        }), 404
+    
+    return jsonify({
+        'success': True,
+        'session_id': session_id,
+        'step': step,
+        'result': result
+    })
+
+@app.route('/api/queue_stats')
+def queue_stats():
+    """Worker pool queue depth and wait times"""
+    return jsonify({
+        'success': True,
+        'queue': worker_pool.stats()
+    })
+
+@app.route('/api/session_stats')
+def session_stats():
+    """Session store size, evictions and approximate memory usage"""
+    return jsonify({
+        'success': True,
+        'sessions': active_sessions.stats()
+    })
+
+@app.route('/api/llm_cache_stats')
+def llm_cache_stats():
+    """Gemini response cache, single-flight coalescing, circuit breaker, triage cascade and prompt batching counters"""
+    return jsonify({
+        'success': True,
+        'cache': workflow.gemini.cache_stats(),
+        'circuit_breaker': workflow.gemini.breaker.stats(),
+        'triage_cascade': workflow.triage_cascade.stats(),
+        'text_batching': workflow.text_processor.batch_stats()
+    })
+
+@app.route('/api/llm_metrics')
+def llm_metrics():
+    """Per-call-site model call counts, latency percentiles, sizes, cache hits and errors (?reset=1 clears them)"""
+    metrics = get_metrics()
+    stats = metrics.stats()
+    if request.args.get('reset') in ('1', 'true'):
+        metrics.reset()
+    return jsonify({
+        'success': True,
+        'metrics': stats,
+        'transport': get_transport().stats() if workflow.gemini.backend == 'api' else {}
+    })
+
+@app.route('/api/triage_rules')
+def triage_rules():
+    """Loaded triage rule table: version, rule ids per ruleset and reload counters (?reload=1 reloads it now)"""
+    rules = workflow.triage_rules
+    reloaded = rules.reload() if request.args.get('reload') in ('1', 'true') else None
+    return jsonify({
+        'success': reloaded is not False,
+        'reloaded': reloaded,
+        'rules': rules.stats()
+    })
+
 @app.route('/api/test_cases')
 def get_test_cases():
     """Get predefined test cases"""
@@ -298,6 +568,30 @@ def handle_disconnect():
     """Handle client disconnection"""
     logger.info(f"Client disconnected: {request.sid}")
 
+@socketio.on('join_session')
+def handle_join_session(data):
+    """Subscribe this client to a session's progress events"""
+    session_id = (data or {}).get('session_id')
+    if session_id:
+        join_room(session_id)
+
+@socketio.on('leave_session')
+def handle_leave_session(data):
+    """Unsubscribe this client from a session's progress events"""
+    session_id = (data or {}).get('session_id')
+    if session_id:
+        leave_room(session_id)
+
+@socketio.on('join_supervisor')
+def handle_join_supervisor(data=None):
+    """Subscribe this client to progress events of every session ({token} must match SUPERVISOR_TOKEN)"""
+    token = str((data or {}).get('token') or '')
+    if not SUPERVISOR_TOKEN or not hmac.compare_digest(token.encode(), SUPERVISOR_TOKEN.encode()):
+        logger.warning(f"Supervisor join refused for client {request.sid}")
+        return {'success': False, 'error': 'Không có quyền theo dõi tất cả phiên'}
+    join_room(SUPERVISOR_ROOM)
+    return {'success': True}
+
 if __name__ == '__main__':
     print("=" * 60)
     print("🏥 PATIENT DISPATCH SYSTEM")
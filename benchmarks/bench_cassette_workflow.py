@@ -0,0 +1,74 @@
+"""
+Benchmark: workflow latency with recorded model responses (no network needed)
+Usage: python benchmarks/bench_cassette_workflow.py record [count] [cassette]   (records against the local stub server)
+       python benchmarks/bench_cassette_workflow.py replay [count] [cassette] [--no-latency]
+Defaults: count 200, cassette benchmarks/cassettes/workflow.jsonl
+"""
+
+import os
+import sys
+import time
+import logging
+import statistics
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from bench_batch_workflow import make_patients
+from gemini_stub_server import PROFILES, start_stub_server
+
+DEFAULT_CASSETTE = os.path.join(BENCH_DIR, "cassettes", "workflow.jsonl")
+
+
+def distinct_patients(count):
+    """Sample patients with unique descriptions, so every prompt is a separate model call"""
+    return [dict(patient, description=f"{patient['description']} (ca {i})")
+            for i, patient in enumerate(make_patients(count))]
+
+
+def run_benchmark(mode, count, cassette, replay_latency):
+    logging.disable(logging.INFO)
+    os.environ["GEMINI_CACHE_ENABLED"] = "false"
+    os.environ["GEMINI_CASSETTE"] = cassette
+    os.environ["GEMINI_CASSETTE_MODE"] = mode
+    os.environ["GEMINI_CASSETTE_REPLAY_LATENCY"] = "true" if replay_latency else "false"
+
+    server = None
+    if mode == "record":
+        if os.path.exists(cassette):
+            os.remove(cassette)
+        server = start_stub_server(PROFILES["realistic"], seed=7)
+        os.environ["GEMINI_API_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+        os.environ["GEMINI_BACKEND"] = "api"
+        os.environ.setdefault("GOOGLE_AI_API_KEY", "stub")
+        os.environ["MODEL_RATE_LIMIT_RPS"] = "1000"
+        os.environ["MODEL_RATE_LIMIT_BURST"] = "1000"
+
+    from workflow_clean_final import PatientDispatchWorkflow
+    workflow = PatientDispatchWorkflow()
+
+    latencies = []
+    for patient in distinct_patients(count):
+        started = time.perf_counter()
+        workflow.process_patient_input(patient)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    latencies.sort()
+    print(f"mode: {mode}  patients: {count}  replay latency: {replay_latency if mode == 'replay' else '-'}")
+    print(f"per patient  p50 {statistics.median(latencies):.2f} ms  "
+          f"p95 {latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]:.2f} ms  "
+          f"total {sum(latencies) / 1000:.2f} s")
+    print(f"cassette     {workflow.gemini.cassette.stats()}")
+    workflow.gemini.cassette.close()
+    if server is not None:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    run_benchmark(
+        args[0] if args else "replay",
+        int(args[1]) if len(args) > 1 else 200,
+        args[2] if len(args) > 2 else DEFAULT_CASSETTE,
+        "--no-latency" not in sys.argv
+    )
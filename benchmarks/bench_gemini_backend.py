@@ -0,0 +1,65 @@
+"""
+Benchmark: throughput and tail latency of the Gemini backends against the local stub server
+Usage: python benchmarks/bench_gemini_backend.py [profile] [requests] [concurrency] [priority]
+       (default: realistic 500 32 3; priority 5 enables hedged requests)
+"""
+
+import os
+import sys
+import time
+import logging
+import statistics
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gemini_stub_server import PROFILES, start_stub_server
+
+
+def percentile(sorted_values, fraction):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+def run_benchmark(profile_name, total, concurrency, priority):
+    logging.disable(logging.ERROR)
+    server = start_stub_server(PROFILES[profile_name], seed=1)
+    os.environ["GEMINI_API_BASE_URL"] = f"http://127.0.0.1:{server.server_port}"
+    os.environ["HTTP_MAX_CONNECTIONS_PER_HOST"] = str(concurrency)
+
+    from utils.call_policy import call_priority
+    from utils.image_analyzer import ImageAnalyzer
+    analyzer = ImageAnalyzer(api_key="stub")
+
+    def call(_):
+        started = time.perf_counter()
+        with call_priority(priority):
+            result = analyzer.analyze_medical_image(b"\xff\xd8\xff" + os.urandom(2048))
+        return (time.perf_counter() - started) * 1000, result.get("success", False), result.get("error")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(call, range(total)))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(latency for latency, _, _ in results)
+    outcomes = {}
+    for _, success, error in results:
+        key = "ok" if success else error
+        outcomes[key] = outcomes.get(key, 0) + 1
+
+    print(f"profile: {profile_name}  requests: {total}  concurrency: {concurrency}  priority: {priority}")
+    print(f"throughput  {total / elapsed:.1f} req/s")
+    print(f"latency     p50 {statistics.median(latencies):.1f} ms  p95 {percentile(latencies, 0.95):.1f} ms  "
+          f"p99 {percentile(latencies, 0.99):.1f} ms  max {latencies[-1]:.1f} ms")
+    print(f"outcomes    {outcomes}")
+    print(f"policy      {analyzer.transport.stats()}")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    run_benchmark(
+        sys.argv[1] if len(sys.argv) > 1 else "realistic",
+        int(sys.argv[2]) if len(sys.argv) > 2 else 500,
+        int(sys.argv[3]) if len(sys.argv) > 3 else 32,
+        int(sys.argv[4]) if len(sys.argv) > 4 else 3
+    )
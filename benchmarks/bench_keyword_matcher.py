@@ -0,0 +1,85 @@
+"""
+Benchmark: keyword detection - per-site `in` loops vs the shared KeywordMatcher
+Usage: python benchmarks/bench_keyword_matcher.py [length ...]   (description length in characters, default: 200 2000 20000)
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.keyword_matcher import KEYWORD_REGISTRY, KeywordMatcher
+
+FILLER = ("bệnh nhân nam 65 tuổi, tiền sử tăng huyết áp và đái tháo đường, vào viện vì mệt mỏi kéo dài, "
+          "buồn nôn, chóng mặt nhẹ khi đứng dậy, ăn uống kém; ")
+RED_FLAGS = " đột nhiên khó thở nặng, đau ngực dữ dội"
+SPECIALTY_WORDS = {
+    "tim mạch": ["tim", "ngực", "huyết áp"],
+    "hô hấp": ["phổi", "ho", "khó thở"],
+    "tiêu hóa": ["dạ dày", "bụng", "tiêu hóa"]
+}
+
+
+def loops(description):
+    """The three call sites as they were before the shared matcher"""
+    indicators = [keyword for keyword in KEYWORD_REGISTRY["emergency"] if keyword in description]
+    specialty = next((name for name, words in SPECIALTY_WORDS.items()
+                      if any(word in description for word in words)), "nội tổng hợp")
+    critical = any(keyword in description for keyword in KEYWORD_REGISTRY["critical"])
+    return indicators, specialty, critical
+
+
+def matcher_calls(matcher):
+    def run(description):
+        indicators = matcher.match(description, ["emergency"])["emergency"]
+        category = matcher.first_category(description, ["cardiology", "respiratory", "digestive"])
+        critical = matcher.contains_any(description, "critical")
+        return indicators, category, critical
+    return run
+
+
+def per_call_us(func, text, repeat):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func(text)
+    return (time.perf_counter() - started) / repeat * 1e6
+
+
+def synthetic_registry(size, seed=3):
+    """Registry padded with random Vietnamese-looking phrases, to find the automaton crossover"""
+    rng = random.Random(seed)
+    syllables = FILLER.replace(",", "").replace(";", "").split()
+    padded = {name: list(keywords) for name, keywords in KEYWORD_REGISTRY.items()}
+    padded["extra"] = [" ".join(rng.sample(syllables, 2)) + f" {i}" for i in range(size)]
+    return padded
+
+
+def run_benchmark(lengths):
+    scans = KeywordMatcher(KEYWORD_REGISTRY)
+    automaton = KeywordMatcher(KEYWORD_REGISTRY, automaton_min_keywords=0)
+    print("Three call sites per description (shared registry, 24 keywords)")
+    print(f"{'chars':>8} {'loops':>12} {'matcher':>12} {'automaton':>12}")
+    for length in lengths:
+        text = ((FILLER * (length // len(FILLER) + 1))[:length] + RED_FLAGS).lower()
+        assert loops(text)[0] == matcher_calls(scans)(text)[0] == matcher_calls(automaton)(text)[0]
+        repeat = max(5, 200000 // length)
+        print(f"{len(text):>8} {per_call_us(loops, text, repeat):>10.1f}us "
+              f"{per_call_us(matcher_calls(scans), text, repeat):>10.1f}us "
+              f"{per_call_us(matcher_calls(automaton), text, repeat):>10.1f}us")
+
+    print("\nAll categories in one call, 2000-char description, growing registry")
+    print(f"{'keywords':>8} {'in scans':>12} {'automaton':>12}")
+    text = ((FILLER * 20)[:2000] + RED_FLAGS).lower()
+    for size in (0, 40, 100, 300, 1000):
+        registry = synthetic_registry(size)
+        by_scan = KeywordMatcher(registry, automaton_min_keywords=10 ** 9)
+        by_automaton = KeywordMatcher(registry, automaton_min_keywords=0)
+        assert by_scan.match(text) == by_automaton.match(text)
+        print(f"{len(by_scan._keyword_categories):>8} {per_call_us(by_scan.match, text, 50):>10.1f}us "
+              f"{per_call_us(by_automaton.match, text, 50):>10.1f}us")
+
+
+if __name__ == "__main__":
+    run_benchmark([int(arg) for arg in sys.argv[1:]] or [200, 2000, 20000])
@@ -0,0 +1,62 @@
+"""
+Benchmark: time to first step event vs full workflow, and per-step p50/p95, through the StepEvent pipeline
+Usage: python benchmarks/bench_step_stream.py [runs]   (default: 2000)
+"""
+
+import os
+import sys
+import time
+import logging
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from workflow_clean_final import PatientDispatchWorkflow, WORKFLOW_STEPS
+from bench_batch_workflow import make_patients
+
+
+class LatencySink:
+    """Sink recording when the first step event arrives and how long each step took"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.first_event_ms = None
+        self.step_ms = {}
+
+    def __call__(self, event):
+        now_ms = (time.perf_counter() - self.started) * 1000
+        if self.first_event_ms is None:
+            self.first_event_ms = now_ms
+        self.step_ms[event.step] = event.elapsed_ms
+
+
+def p95(values):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+def run_benchmark(runs):
+    logging.disable(logging.INFO)
+    workflow = PatientDispatchWorkflow()
+
+    first_event, total = [], []
+    step_ms = {}
+    for patient in make_patients(runs):
+        sink = LatencySink()
+        workflow.process_patient_input(patient, sink=sink)
+        total.append((time.perf_counter() - sink.started) * 1000)
+        first_event.append(sink.first_event_ms)
+        for step, elapsed_ms in sink.step_ms.items():
+            step_ms.setdefault(step, []).append(elapsed_ms)
+
+    print(f"runs: {runs}")
+    print(f"first step event  median {statistics.median(first_event):.4f} ms")
+    print(f"full workflow     median {statistics.median(total):.4f} ms")
+    print(f"{'step':<22} {'p50 ms':>10} {'p95 ms':>10}")
+    for step in sorted(step_ms):
+        print(f"{step}. {WORKFLOW_STEPS[step - 1][0]:<19} {statistics.median(step_ms[step]):>10.4f} "
+              f"{p95(step_ms[step]):>10.4f}")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 2000)
@@ -0,0 +1,73 @@
+"""
+Benchmark: local symptom extraction latency and how many intakes the cascade decides without the model
+Usage: python benchmarks/bench_symptom_extractor.py [count]   (default: 10000)
+"""
+
+import os
+import sys
+import time
+import logging
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from bench_batch_workflow import SAMPLE_PATIENTS
+
+# Same patients typed without diacritics, plus a few everyday intakes
+EXTRA_PATIENTS = [
+    {"description": "Benh nhan nu 28 tuoi, sot nhe, so mui, dau hong 2 ngay nay",
+     "vital_signs": {"heart_rate": 84, "spo2": 98}},
+    {"description": "Trẻ 6 tuổi, hắt hơi, nghẹt mũi, không sốt",
+     "vital_signs": {"heart_rate": 95, "spo2": 99}},
+    {"description": "Ông 70 tuổi đột ngột yếu nửa người, méo miệng, nói khó",
+     "vital_signs": {"heart_rate": 92, "spo2": 96}},
+    {"description": "Bệnh nhân đau lưng, mệt mỏi, mất ngủ từ tuần trước",
+     "vital_signs": {"heart_rate": 76, "spo2": 99}}
+]
+
+# Typed in a hurry: missing diacritics plus typos, expected symptom per line
+TYPO_PHRASES = [
+    ("dau ngucc du doi", "đau ngực dữ dội"),
+    ("dua nguc", "đau ngực"),
+    ("co giatt", "co giật"),
+    ("kho thoo", "khó thở"),
+    ("tim dap nhanhh", "hồi hộp"),
+    ("non ra mau", "nôn ra máu")
+]
+
+
+def run_benchmark(count):
+    logging.disable(logging.INFO)
+    from workflow_clean_final import PatientDispatchWorkflow
+    workflow = PatientDispatchWorkflow()
+    extractor = workflow.symptom_extractor
+    patients = SAMPLE_PATIENTS + EXTRA_PATIENTS
+
+    for patient in patients:
+        result = extractor.phan_tich(patient["description"])
+        print(f"{patient['description'][:58]:<58} -> {result['trieu_chung']} / {result['chuyen_khoa']}")
+
+    started = time.perf_counter()
+    for i in range(count):
+        extractor.phan_tich(patients[i % len(patients)]["description"])
+    elapsed = time.perf_counter() - started
+    print(f"\nphan_tich: {elapsed / count * 1e6:.1f} us per description ({count} calls)")
+
+    tiers = [workflow.triage_cascade.scorer.score(p["description"], p["vital_signs"]) for p in patients]
+    decided = sum(1 for local in tiers if local["confidence"] >= workflow.triage_cascade.confidence_threshold)
+    print(f"cascade decides {decided}/{len(patients)} sample intakes locally")
+
+    print()
+    for phrase, expected in TYPO_PHRASES:
+        found = [(m["symptom"], m["distance"]) for m in extractor.match(phrase)]
+        print(f"{phrase:<20} -> {found}  {'ok' if expected in [name for name, _ in found] else 'MISSED'}")
+    started = time.perf_counter()
+    for i in range(count):
+        extractor.lookup(TYPO_PHRASES[i % len(TYPO_PHRASES)][0])
+    elapsed = time.perf_counter() - started
+    print(f"lookup: {elapsed / count * 1e6:.1f} us per phrase "
+          f"({len(extractor.term_index.words)} terms, {len(extractor.term_index)} deletion keys)")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
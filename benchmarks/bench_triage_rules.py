@@ -0,0 +1,65 @@
+"""
+Benchmark: compiled triage rule table vs the hand-coded workflow priority score it replaced
+Usage: python benchmarks/bench_triage_rules.py [count]   (default: 50000 patients)
+Parity with the hand-coded scorers is covered by tests/test_triage_rules.py.
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.triage_rules import DEFAULT_TRIAGE_RULES, TriageRules
+
+
+def workflow_priority_legacy(symptom_count, vital_signs, indicator_count):
+    """PatientDispatchWorkflow.calculate_priority_score as it was"""
+    score = 1
+    score += min(symptom_count // 2, 1)
+    score += min(indicator_count, 2)
+    if vital_signs.get("heart_rate", 0) > 120:
+        score += 1
+    if vital_signs.get("spo2", 100) < 90:
+        score += 2
+    return min(score, 5)
+
+
+def timed_us(func, count):
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) / count * 1e6
+
+
+def run_benchmark(count):
+    rng = random.Random(7)
+    patients = [{
+        "symptom_count": rng.randint(0, 5),
+        "indicator_count": rng.randint(0, 4),
+        "vital_signs": {"heart_rate": rng.choice([80, 100, 119, 120, 121, 150]),
+                        "spo2": rng.choice([85, 89, 90, 95, 99])}
+    } for _ in range(count)]
+
+    workflow = TriageRules(DEFAULT_TRIAGE_RULES, reload_interval=0).ruleset("workflow_priority")
+    features = [dict(p["vital_signs"], symptom_count=p["symptom_count"], indicator_count=p["indicator_count"])
+                for p in patients]
+    columns = {
+        "symptom_count": np.array([p["symptom_count"] for p in patients]),
+        "indicator_count": np.array([p["indicator_count"] for p in patients]),
+        "heart_rate": np.array([p["vital_signs"]["heart_rate"] for p in patients], dtype=np.float64),
+        "spo2": np.array([p["vital_signs"]["spo2"] for p in patients], dtype=np.float64)
+    }
+    legacy = timed_us(lambda: [workflow_priority_legacy(p["symptom_count"], p["vital_signs"], p["indicator_count"])
+                               for p in patients], count)
+    scalar = timed_us(lambda: [workflow.evaluate(f) for f in features], count)
+    batch = timed_us(lambda: workflow.evaluate_batch(columns), count)
+    print(f"workflow_priority, {count} patients, microseconds per patient")
+    print(f"{'hand-coded':>12} {'rules scalar':>13} {'rules batch':>12}")
+    print(f"{legacy:>12.2f} {scalar:>13.2f} {batch:>12.3f}")
+
+
+if __name__ == "__main__":
+    run_benchmark(int(sys.argv[1]) if len(sys.argv) > 1 else 50000)
@@ -0,0 +1,215 @@
+"""
+Local stand-in for the Gemini generateContent endpoint, for offline load testing
+Usage: python benchmarks/gemini_stub_server.py [--port 8765] [--profile flaky] [--canned responses.json]
+Then:  GEMINI_API_BASE_URL=http://127.0.0.1:8765 GEMINI_BACKEND=api python app_simple_working.py
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+GENERATE_CONTENT_PATH = re.compile(r"^/v1beta/models/(?P<model>[^/:]+):generateContent$")
+
+# Default answers: structured JSON for text prompts, the ImageAnalyzer report format for images
+DEFAULT_TEXT_RESPONSE = json.dumps({
+    "symptoms": ["sốt", "ho"],
+    "onset_time": "2 ngày trước",
+    "priority": 3,
+    "specialty": "hô hấp",
+    "answer": "Đây là câu trả lời mẫu từ máy chủ giả lập Gemini."
+}, ensure_ascii=False)
+DEFAULT_IMAGE_RESPONSE = """PHÂN TÍCH HÌNH ẢNH Y TẾ:
+**Mô tả quan sát:**
+- Vùng da sưng đỏ nhẹ
+**Mức độ rủi ro:**
+- TRUNG BÌNH
+**Khuyến nghị sơ bộ:**
+- Nên khám bác sĩ trong 24 giờ
+**Mô tả triệu chứng gợi ý:**
+Sưng đỏ vùng da, đau nhẹ khi chạm
+"""
+
+
+@dataclass
+class StubProfile:
+    """Latency and failure behaviour of the stub server"""
+    latency: str = "lognormal"     # fixed | uniform | lognormal
+    latency_ms: float = 300        # fixed value, uniform midpoint or lognormal median
+    latency_spread: float = 0.5    # uniform: +/- fraction of latency_ms; lognormal: sigma
+    error_rate: float = 0.0        # fraction of requests answered with HTTP 500
+    rate_limit_rate: float = 0.0   # fraction of requests answered with HTTP 429
+    burst_every_s: float = 0.0     # every N seconds ...
+    burst_length_s: float = 0.0    # ... all requests get 429 for this long
+    retry_after_s: int = 1
+
+
+PROFILES = {
+    "fast": StubProfile(latency="fixed", latency_ms=5),
+    "realistic": StubProfile(latency="lognormal", latency_ms=400, latency_spread=0.6),
+    "slow": StubProfile(latency="lognormal", latency_ms=2000, latency_spread=0.8),
+    "flaky": StubProfile(latency="lognormal", latency_ms=400, latency_spread=0.6, error_rate=0.05,
+                         rate_limit_rate=0.05),
+    "throttled": StubProfile(latency="lognormal", latency_ms=400, latency_spread=0.6,
+                             burst_every_s=10, burst_length_s=2)
+}
+
+
+class StubState:
+    """Profile, canned responses and counters shared by all request handlers"""
+
+    def __init__(self, profile: StubProfile, canned: Optional[Dict[str, str]] = None, seed: Optional[int] = None):
+        self.profile = profile
+        self.canned = canned or {}
+        self.started = time.monotonic()
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counts = {"requests": 0, "ok": 0, "error_500": 0, "rate_limited_429": 0, "not_found": 0}
+
+    def count(self, key: str):
+        with self.lock:
+            self.counts[key] += 1
+
+    def latency_seconds(self) -> float:
+        profile = self.profile
+        with self.lock:
+            if profile.latency == "fixed":
+                value = profile.latency_ms
+            elif profile.latency == "uniform":
+                spread = profile.latency_ms * profile.latency_spread
+                value = self.random.uniform(profile.latency_ms - spread, profile.latency_ms + spread)
+            else:
+                value = self.random.lognormvariate(0, profile.latency_spread) * profile.latency_ms
+        return max(value, 0) / 1000
+
+    def failure(self) -> Optional[int]:
+        """HTTP status to fail this request with, or None."""
+        profile = self.profile
+        if profile.burst_every_s > 0:
+            phase = (time.monotonic() - self.started) % profile.burst_every_s
+            if phase >= profile.burst_every_s - profile.burst_length_s:
+                return 429
+        with self.lock:
+            roll = self.random.random()
+        if roll < profile.error_rate:
+            return 500
+        if roll < profile.error_rate + profile.rate_limit_rate:
+            return 429
+        return None
+
+    def response_text(self, request: Dict[str, Any]) -> str:
+        parts = [part for content in request.get("contents", []) for part in content.get("parts", [])]
+        prompt = " ".join(part.get("text", "") for part in parts)
+        for needle, text in self.canned.items():
+            if needle in prompt:
+                return text
+        has_image = any("inline_data" in part or "inlineData" in part for part in parts)
+        return DEFAULT_IMAGE_RESPONSE if has_image else DEFAULT_TEXT_RESPONSE
+
+
+class GeminiStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    state: StubState = None
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        self.state.count("requests")
+        if not GENERATE_CONTENT_PATH.match(self.path.split("?", 1)[0]):
+            self.state.count("not_found")
+            return self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+        time.sleep(self.state.latency_seconds())
+        status = self.state.failure()
+        if status == 429:
+            self.state.count("rate_limited_429")
+            return self._send_json(429, {"error": {"code": 429, "status": "RESOURCE_EXHAUSTED"}},
+                                   {"Retry-After": str(self.state.profile.retry_after_s)})
+        if status == 500:
+            self.state.count("error_500")
+            return self._send_json(500, {"error": {"code": 500, "status": "INTERNAL"}})
+
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            return self._send_json(400, {"error": {"code": 400, "message": "Invalid JSON"}})
+        self.state.count("ok")
+        self._send_json(200, {
+            "candidates": [{"content": {"parts": [{"text": self.state.response_text(request)}], "role": "model"},
+                            "finishReason": "STOP"}]
+        })
+
+    def do_GET(self):
+        if self.path == "/stats":
+            with self.state.lock:
+                return self._send_json(200, dict(self.state.counts))
+        self._send_json(404, {"error": {"code": 404, "message": "Not found"}})
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+        data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_stub_server(profile: StubProfile, host: str = "127.0.0.1", port: int = 0,
+                      canned: Optional[Dict[str, str]] = None, seed: Optional[int] = None) -> ThreadingHTTPServer:
+    """
+    Start the stub server on a background thread
+
+    Returns:
+        The running server; its base URL is http://host:server.server_port
+    """
+    handler = type("BoundGeminiStubHandler", (GeminiStubHandler,), {"state": StubState(profile, canned, seed)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="gemini-stub", daemon=True).start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini generateContent stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="realistic")
+    parser.add_argument("--latency", choices=["fixed", "uniform", "lognormal"])
+    parser.add_argument("--latency-ms", type=float)
+    parser.add_argument("--latency-spread", type=float)
+    parser.add_argument("--error-rate", type=float)
+    parser.add_argument("--rate-limit-rate", type=float)
+    parser.add_argument("--burst-every-s", type=float)
+    parser.add_argument("--burst-length-s", type=float)
+    parser.add_argument("--canned", help="JSON file mapping prompt substrings to response text")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args()
+
+    overrides = {field: value for field, value in vars(args).items()
+                 if field in StubProfile.__dataclass_fields__ and value is not None}
+    profile = replace(PROFILES[args.profile], **overrides)
+    canned = None
+    if args.canned:
+        with open(args.canned, "r", encoding="utf-8") as f:
+            canned = json.load(f)
+
+    server = start_stub_server(profile, args.host, args.port, canned, args.seed)
+    print(f"Gemini stub on http://{args.host}:{server.server_port} with {profile}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
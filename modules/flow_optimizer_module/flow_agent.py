@@ -58,6 +58,28 @@ class FlowAgent:
                 "message": "Không thể tối ưu hóa do không xác định được tuyến"
             }
     
+    def optimize(self, candidates: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Pick the best candidate (hospital or ambulance) from a list
+
+        Args:
+            candidates: Candidate assignments, each with an optional distance
+
+        Returns:
+            Selected candidate and the reason for the selection
+        """
+        if not candidates:
+            return {
+                "selected": None,
+                "reason": "Không có lựa chọn để tối ưu hóa"
+            }
+
+        best = min(candidates, key=lambda c: c.get("distance", float("inf")))
+        return {
+            "selected": best,
+            "reason": f"Đã chọn {best.get('name', best.get('vehicle_id', 'lựa chọn'))} theo khoảng cách gần nhất"
+        }
+
     def _optimize_qa_assignment(self, assignment_data: Dict[str, Any]) -> Dict[str, Any]:
         """Optimize QA consultation assignment"""
         qa_data = assignment_data.get("qa_data", {})
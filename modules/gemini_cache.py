@@ -0,0 +1,161 @@
+"""
+Bộ nhớ đệm phản hồi Gemini: LRU + TTL trong bộ nhớ, tùy chọn thêm tầng lưu trên đĩa
+"""
+import copy
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Sentinel returned by get() on a miss (None can be a valid cached response)
+MISS = object()
+
+
+def normalize_prompt(prompt: Any) -> str:
+    """Collapse whitespace so prompts differing only in formatting share a cache entry."""
+    return _WHITESPACE.sub(" ", str(prompt)).strip()
+
+
+def cache_key(prompt: Any, function_call: Optional[str] = None) -> str:
+    """SHA-256 of the normalized prompt and the function_call name."""
+    raw = f"{function_call or ''}\x00{normalize_prompt(prompt)}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class GeminiResponseCache:
+    """
+    Prompt-keyed response cache for GeminiClient.
+
+    Entries live in an in-memory LRU with a TTL. If disk_dir is set, entries are
+    also written there as JSON files and memory misses fall back to disk, so
+    cached responses survive restarts. Any object with get(key) / set(key, value)
+    / stats() can be plugged into GeminiClient instead.
+    """
+
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 600,
+                 disk_dir: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of in-memory entries
+            ttl_seconds: Seconds a response stays valid
+            disk_dir: Optional directory for the on-disk tier
+        """
+        self.logger = logging.getLogger("GeminiResponseCache")
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    @classmethod
+    def from_env(cls) -> Optional["GeminiResponseCache"]:
+        """Cache configured by GEMINI_CACHE_* environment variables, or None if disabled."""
+        if os.getenv("GEMINI_CACHE_ENABLED", "true").lower() in ("0", "false", "no"):
+            return None
+        return cls(
+            max_entries=int(os.getenv("GEMINI_CACHE_MAX_ENTRIES", "512")),
+            ttl_seconds=float(os.getenv("GEMINI_CACHE_TTL_SECONDS", "600")),
+            disk_dir=os.getenv("GEMINI_CACHE_DIR") or None
+        )
+
+    def get(self, key: str) -> Any:
+        """Cached response for key (a private copy), or MISS."""
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if now - stored_at <= self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return copy.deepcopy(value)
+                del self._entries[key]
+
+        entry = self._read_disk(key, now)
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return MISS
+            self._disk_hits += 1
+            self._store(key, entry)
+        return copy.deepcopy(entry[1])
+
+    def set(self, key: str, value: Any):
+        """Store a response under key."""
+        entry = (time.time(), copy.deepcopy(value))
+        with self._lock:
+            self._store(key, entry)
+        self._write_disk(key, entry)
+
+    def clear(self):
+        """Drop all in-memory entries (the disk tier is kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and size."""
+        with self._lock:
+            lookups = self._hits + self._disk_hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self._hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round((self._hits + self._disk_hits) / lookups, 3) if lookups else 0.0
+            }
+
+    def _store(self, key: str, entry: tuple):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _read_disk(self, key: str, now: float) -> Optional[tuple]:
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Unreadable cache file for {key}: {e}")
+            return None
+        if now - data["stored_at"] > self.ttl_seconds:
+            return None
+        return data["stored_at"], data["value"]
+
+    def _write_disk(self, key: str, entry: tuple):
+        if not self.disk_dir:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"stored_at": entry[0], "value": entry[1]}, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            self.logger.warning(f"Could not write cache file for {key}: {e}")
@@ -0,0 +1,140 @@
+"""
+Cassette ghi/phát lại phản hồi Gemini: chạy benchmark lặp lại được mà không cần mạng
+"""
+import copy
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+RECORD = "record"
+REPLAY = "replay"
+
+
+class CassetteMissError(Exception):
+    """Raised in replay mode when the cassette has no response for a prompt."""
+
+
+class GeminiCassette:
+    """
+    Append-only JSONL file of prompt -> response -> latency records.
+
+    In record mode every backend response is appended as one line
+    {"key", "function_call", "response", "latency_ms"}, keyed by the same prompt
+    hash as the response cache. In replay mode responses are served from the
+    file. Repeated prompts cycle through their recordings in order, and the
+    recorded latency can optionally be reproduced (scaled by latency_scale).
+    """
+
+    def __init__(self, path: str, mode: str = REPLAY, replay_latency: bool = False,
+                 latency_scale: float = 1.0):
+        """
+        Initialize the cassette.
+
+        Args:
+            path: JSONL file to append to (record) or read from (replay)
+            mode: "record" or "replay"
+            replay_latency: Sleep for the recorded latency when replaying
+            latency_scale: Multiplier applied to replayed latencies
+        """
+        if mode not in (RECORD, REPLAY):
+            raise ValueError(f"Unknown cassette mode: {mode}")
+        self.logger = logging.getLogger("GeminiCassette")
+        self.path = path
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.latency_scale = latency_scale
+
+        self._lock = threading.Lock()
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+        self._cursors: Dict[str, int] = {}
+        self._file = None
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+        if mode == REPLAY:
+            self._load()
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            self._file = open(path, "a", encoding="utf-8")
+
+    @classmethod
+    def from_env(cls) -> Optional["GeminiCassette"]:
+        """Cassette configured by GEMINI_CASSETTE* environment variables, or None."""
+        path = os.getenv("GEMINI_CASSETTE")
+        if not path:
+            return None
+        return cls(
+            path,
+            mode=os.getenv("GEMINI_CASSETTE_MODE", REPLAY),
+            replay_latency=os.getenv("GEMINI_CASSETTE_REPLAY_LATENCY", "false").lower() in ("1", "true", "yes"),
+            latency_scale=float(os.getenv("GEMINI_CASSETTE_LATENCY_SCALE", "1.0"))
+        )
+
+    def record(self, key: str, function_call: Optional[str], response: Any, latency_seconds: float):
+        """Append one backend response."""
+        line = json.dumps({
+            "key": key,
+            "function_call": function_call,
+            "response": response,
+            "latency_ms": round(latency_seconds * 1000, 3)
+        }, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.recorded += 1
+
+    def replay(self, key: str) -> Any:
+        """
+        Next recorded response for key, after the recorded latency if enabled.
+
+        Raises:
+            CassetteMissError: If nothing was recorded for key
+        """
+        with self._lock:
+            entries = self._entries.get(key)
+            if not entries:
+                self.misses += 1
+                raise CassetteMissError(f"No recorded response for prompt {key[:12]}")
+            cursor = self._cursors.get(key, 0)
+            self._cursors[key] = cursor + 1
+            entry = entries[cursor % len(entries)]
+            self.replayed += 1
+
+        if self.replay_latency:
+            time.sleep(entry["latency_ms"] * self.latency_scale / 1000)
+        return copy.deepcopy(entry["response"])
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self.mode,
+                "path": self.path,
+                "prompts": len(self._entries),
+                "recorded": self.recorded,
+                "replayed": self.replayed,
+                "misses": self.misses
+            }
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line_number, line in enumerate(f, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    # A crash while recording can leave a torn last line
+                    self.logger.warning(f"Skipping unreadable cassette line {line_number}")
+                    continue
+                self._entries.setdefault(entry["key"], []).append(entry)
+        self.logger.info(f"Loaded {sum(len(e) for e in self._entries.values())} responses from {self.path}")
@@ -1,8 +1,163 @@
 """
 Client giả lập Gemini Flash 2.0 cho demo hệ thống điều phối bệnh nhân
 """
+import json
+import logging
+import os
+import re
+import time
+
+from modules.gemini_cache import GeminiResponseCache, MISS, cache_key
+from modules.gemini_cassette import CassetteMissError, GeminiCassette, RECORD, REPLAY
+from utils.circuit_breaker import CircuitBreaker
+from utils.http_transport import gemini_base_url, get_transport
+from utils.llm_metrics import get_metrics
+from utils.single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+GEMINI_MODEL = "gemini-2.0-flash"
+
+# Giá trị mặc định: đọc cấu hình cache từ biến môi trường GEMINI_CACHE_*
+_CACHE_FROM_ENV = object()
+
+# Nguồn tạo ra kết quả, ghi vào trường "source" của mỗi phản hồi
+SOURCE_MODEL = "model"
+SOURCE_RULE_BASED = "rule_based"
+SOURCE_SAMPLE = "sample"
+
+
+class GeminiAPIError(Exception):
+    """Lỗi khi gọi API Gemini (mã HTTP khác 200 hoặc phản hồi không hợp lệ)"""
+
+
 class GeminiClient:
-    def generate(self, prompt, function_call=None):
+    def __init__(self, cache=_CACHE_FROM_ENV, transport=None, api_key=None, breaker=None, cassette=None):
+        # cache: đối tượng có get/set/stats (vd. GeminiResponseCache), None để tắt cache
+        self.cache = GeminiResponseCache.from_env() if cache is _CACHE_FROM_ENV else cache
+        # GEMINI_BACKEND=api gọi API thật qua transport dùng chung, mặc định là dữ liệu mẫu
+        self.backend = os.getenv("GEMINI_BACKEND", "mock")
+        self.api_key = api_key or os.getenv("GOOGLE_AI_API_KEY")
+        self.transport = transport or (get_transport() if self.backend == "api" else None)
+        # Các lời gọi giống hệt nhau đang chạy đồng thời dùng chung một request
+        self.single_flight = SingleFlight("GeminiSingleFlight")
+        # Ngắt mạch khi backend lỗi nhiều hoặc chậm: chuyển sang xử lý theo luật
+        self.breaker = breaker or CircuitBreaker.from_env("GeminiCircuit")
+        # Cassette: ghi lại (record) hoặc phát lại (replay) phản hồi cho benchmark không cần mạng
+        self.cassette = cassette or GeminiCassette.from_env()
+        # Thống kê mỗi lời gọi (nơi gọi, kích thước, độ trễ, cache, lỗi) - xem /api/llm_metrics
+        self.metrics = get_metrics()
+
+    def generate(self, prompt, function_call=None, use_cache=True, fallback=None, call_site=None):
+        # Prompt lặp lại (sau khi chuẩn hóa khoảng trắng) được trả từ cache, bỏ qua lời gọi API
+        # fallback: hàm không tham số trả kết quả theo luật khi backend lỗi hoặc mạch đang mở
+        # call_site: tên nơi gọi dùng trong thống kê (mặc định là function_call)
+        started = time.monotonic()
+        key = cache_key(prompt, function_call)
+        cached = self.cache is not None and use_cache
+        cache_hit = False
+        if cached:
+            response = self.cache.get(key)
+            cache_hit = response is not MISS
+        if not cache_hit:
+            # Chỉ kết quả của mô hình được chia sẻ; khi lỗi mỗi nơi gọi dùng fallback của chính nó
+            response = self.single_flight.do(
+                key, lambda: self._generate_guarded(key, prompt, function_call, cached)
+            )
+            if response is None:
+                response = self._fallback_response(prompt, function_call, fallback)
+        self._record_call(call_site or function_call or "generate", prompt, response,
+                          time.monotonic() - started, cache_hit)
+        return response
+
+    def cache_stats(self):
+        stats = self.cache.stats() if self.cache is not None else {"enabled": False}
+        stats["single_flight"] = self.single_flight.stats()
+        if self.cassette is not None:
+            stats["cassette"] = self.cassette.stats()
+        return stats
+
+    def _record_call(self, call_site, prompt, response, elapsed, cache_hit=False):
+        # Kết quả theo luật hoặc dữ liệu mẫu nghĩa là backend lỗi hoặc bị bỏ qua
+        source = response.get("source") if isinstance(response, dict) else None
+        self.metrics.record(
+            call_site,
+            prompt_chars=len(str(prompt)),
+            response_chars=len(json.dumps(response, ensure_ascii=False, default=str)),
+            latency_seconds=elapsed,
+            cache_hit=cache_hit,
+            error=source in (SOURCE_RULE_BASED, SOURCE_SAMPLE),
+            source=source
+        )
+
+    def _generate_guarded(self, key, prompt, function_call, cached):
+        # Phản hồi của mô hình, hoặc None khi mạch đang mở hay backend lỗi
+        if not self.breaker.allow():
+            return None
+        started = time.monotonic()
+        try:
+            response = self._generate(prompt, function_call)
+        except CassetteMissError as e:
+            # Prompt chưa được ghi trong cassette: không phải lỗi backend, không tính vào bộ ngắt mạch
+            self.breaker.release()
+            logger.warning(f"Cassette miss, using fallback: {e}")
+            return None
+        except Exception as e:
+            self.breaker.record(False, time.monotonic() - started)
+            logger.error(f"Error calling Gemini API: {e}")
+            return None
+        self.breaker.record(True, time.monotonic() - started)
+
+        response["source"] = SOURCE_MODEL
+        if cached:
+            self.cache.set(key, response)
+        return response
+
+    def _fallback_response(self, prompt, function_call, fallback):
+        # Kết quả theo luật (không lưu cache) hoặc dữ liệu mẫu nếu nơi gọi không cung cấp fallback
+        if fallback is not None:
+            response = dict(fallback())
+            response["source"] = SOURCE_RULE_BASED
+        else:
+            response = self._mock_response(prompt, function_call)
+            response["source"] = SOURCE_SAMPLE
+        return response
+
+    def _generate(self, prompt, function_call=None):
+        if self.cassette is not None and self.cassette.mode == REPLAY:
+            return self.cassette.replay(cache_key(prompt, function_call))
+
+        started = time.monotonic()
+        if self.backend == "api":
+            response = self._call_api(prompt, function_call)
+        else:
+            response = self._mock_response(prompt, function_call)
+        if self.cassette is not None and self.cassette.mode == RECORD:
+            self.cassette.record(cache_key(prompt, function_call), function_call, response,
+                                 time.monotonic() - started)
+        return response
+
+    def _call_api(self, prompt, function_call=None):
+        # Gọi generateContent qua kết nối keep-alive; lỗi được báo cho bộ ngắt mạch
+        url = f"{gemini_base_url()}/v1beta/models/{GEMINI_MODEL}:generateContent?key={self.api_key}"
+        payload = {
+            "contents": [{"parts": [{"text": str(prompt)}]}],
+            "generationConfig": {"responseMimeType": "application/json"}
+        }
+        response = self.transport.post_json(url, payload)
+        if response.status_code != 200:
+            raise GeminiAPIError(f"{response.status_code} - {response.text[:200]}")
+        try:
+            text = response.json()["candidates"][0]["content"]["parts"][0]["text"]
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            raise GeminiAPIError(f"Unexpected response format: {e}")
+        try:
+            result = json.loads(text)
+        except ValueError:
+            result = None
+        return result if isinstance(result, dict) else {"answer": text}
+
+    def _mock_response(self, prompt, function_call=None):
         # Trả về kết quả mô phỏng dựa trên prompt
         # Ở bản thực tế sẽ gọi API Gemini, ở đây chỉ trả về mẫu
         if function_call == "hospital_matching":
@@ -15,6 +170,13 @@ class GeminiClient:
                 {"id": "AMB001", "loai": "Cấp cứu", "khoang_cach": 1.2},
                 {"id": "AMB002", "loai": "Vận chuyển thường", "khoang_cach": 2.8}
             ]}
+        if function_call == "batch_extraction":
+            # Một kết quả mẫu cho mỗi dòng "[pN] ..." trong prompt gộp nhiều bệnh nhân
+            return {"results": [
+                {"id": item_id, "symptoms": ["sốt", "ho"], "onset_time": "2 ngày trước",
+                 "priority": 3, "specialty": "hô hấp"}
+                for item_id in re.findall(r"^\[(p\d+)\]", str(prompt), re.MULTILINE)
+            ]}
         # Trường hợp QA hoặc text/image
         return {
             "symptoms": ["sốt", "ho"],
@@ -28,7 +190,10 @@ class GeminiClient:
 
     def generate_image(self, prompt, image_bytes):
         # Trả về kết quả mô phỏng cho ảnh
-        return {
+        started = time.monotonic()
+        response = {
             "findings": ["Tổn thương phổi nhẹ"],
             "risk_level": 2
         }
+        self._record_call("image", prompt, response, time.monotonic() - started)
+        return response
@@ -153,3 +153,21 @@ class DispatchAgent:
                 "available": True,
                 "error": str(e)
             }]
+
+    def find_ambulance(self, location: Dict[str, Any], priority: int, is_emergency: bool = False) -> List[Dict[str, Any]]:
+        """
+        Find suitable ambulances by location and priority (workflow interface)
+
+        Args:
+            location: Patient location dictionary
+            priority: Priority score (1-5)
+            is_emergency: Whether the case is an emergency
+
+        Returns:
+            List of suitable ambulances with paramedic availability
+        """
+        return self.tim_xe_cuu_thuong({
+            "location": location,
+            "priority_level": priority,
+            "is_emergency": is_emergency
+        })
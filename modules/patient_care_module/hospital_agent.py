@@ -175,3 +175,22 @@ class HospitalAgent:
             List of suitable hospitals with doctor availability
         """
         return self.tim_benh_vien(patient_info)
+
+    def find_hospital(self, location: Dict[str, Any], specialty: str, priority: int) -> List[Dict[str, Any]]:
+        """
+        Find suitable hospitals by location, specialty and priority (workflow interface)
+
+        Args:
+            location: Patient location dictionary
+            specialty: Required medical specialty
+            priority: Priority score (1-5)
+
+        Returns:
+            List of suitable hospitals with doctor availability
+        """
+        return self.tim_benh_vien({
+            "location": location,
+            "specialty": specialty,
+            "priority_level": priority,
+            "is_emergency": priority >= 5
+        })
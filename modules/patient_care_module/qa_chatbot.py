@@ -12,16 +12,17 @@ class QAChatbot:
     def __init__(self, gemini_client=None):
         self.gemini = gemini_client or GeminiClient()
         
-    def ask_question(self, question, context=None):
+    def ask_question(self, question, context=None, fallback=None):
         """
         Ask a medical question and get response
         
         Args:
             question: Medical question in Vietnamese
             context: Additional context for the question
+            fallback: Optional callable returning {"answer": ...} when the model is unavailable
             
         Returns:
-            Dictionary with response
+            Dictionary with response and the source that produced it
         """
         try:
             prompt = f"""Hỏi đáp y tế: {question}
@@ -32,12 +33,14 @@ Nếu câu hỏi liên quan đến triệu chứng nghiêm trọng, hãy khuyên
             if context:
                 prompt += f"\nBối cảnh: {context}"
                 
-            response = self.gemini.generate(prompt)
+            response = self.gemini.generate(prompt, fallback=fallback or self._fallback_answer,
+                                            call_site="qa_chatbot")
             
             return {
                 "success": True,
                 "answer": response.get("answer", "Xin lỗi, tôi chưa có câu trả lời cho câu hỏi này."),
-                "context": context
+                "context": context,
+                "source": response.get("source")
             }
             
         except Exception as e:
@@ -51,3 +54,9 @@ Nếu câu hỏi liên quan đến triệu chứng nghiêm trọng, hãy khuyên
     def hoi_dap(self, cau_hoi, context=None):
         """Vietnamese wrapper for compatibility"""
         return self.ask_question(cau_hoi, context)
+    
+    @staticmethod
+    def _fallback_answer():
+        """Canned answer while the model backend is unavailable"""
+        return {"answer": "Hệ thống tư vấn tự động tạm thời gián đoạn. Nếu triệu chứng nghiêm trọng, "
+                          "vui lòng đến cơ sở y tế gần nhất hoặc gọi 115."}
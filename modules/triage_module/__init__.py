@@ -6,6 +6,8 @@ Handles medical triage, image processing, and text analysis
 # Expose main classes for easier imports
 from .image_processing import ImageProcessor
 from .text_processing import TextProcessor
+from .symptom_extractor import SymptomExtractor
+from .symspell import SymSpellIndex
 
 # Optional imports if available
 try:
@@ -18,7 +20,7 @@ try:
 except ImportError:
     pass
     
-    __all__ = ['TriageManager', 'ImageProcessor', 'TextProcessor', 'MedicalModels']
+    __all__ = ['TriageManager', 'ImageProcessor', 'TextProcessor', 'SymptomExtractor', 'SymSpellIndex', 'MedicalModels']
     
 except ImportError as e:
     # Fallback if some imports fail
@@ -0,0 +1,185 @@
+"""
+Cascaded triage: a fast local scorer decides clear-cut cases, the LLM handles the rest
+"""
+
+import logging
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+TIER_LOCAL = "local"
+TIER_MODEL = "model"
+
+
+class LocalTriageScorer:
+    """Keyword + vital-sign scorer returning symptoms, acuity and a confidence in [0, 1]"""
+
+    def __init__(self, emergency_keywords: List[str], mild_keywords: List[str],
+                 tachycardia_heart_rate: float, low_spo2: float,
+                 severe_tachycardia_heart_rate: float, severe_low_spo2: float,
+                 symptom_extractor=None, mild_max_severity: int = 2, red_flag_extractor=None):
+        """
+        Initialize the scorer
+
+        Args:
+            emergency_keywords: Red-flag phrases (substring match without a symptom extractor)
+            mild_keywords: Low-acuity symptom words (whole-word match)
+            tachycardia_heart_rate: Heart rate above which vitals are abnormal
+            low_spo2: SpO2 below which vitals are abnormal
+            severe_tachycardia_heart_rate: Heart rate above which vitals are severe
+            severe_low_spo2: SpO2 below which vitals are severe
+            symptom_extractor: Optional SymptomExtractor; its symptoms up to mild_max_severity
+                count as mild (instead of mild_keywords), more severe ones rule out a local
+                low-acuity decision
+            mild_max_severity: Highest ontology severity treated as mild
+            red_flag_extractor: SymptomExtractor over emergency_keywords (as in check_severity_indicators);
+                built from symptom_extractor's settings if not given
+        """
+        self.emergency_keywords = emergency_keywords
+        self.mild_patterns = [(keyword, re.compile(rf"(?<!\w){re.escape(keyword)}(?!\w)")) for keyword in mild_keywords]
+        self.tachycardia_heart_rate = tachycardia_heart_rate
+        self.low_spo2 = low_spo2
+        self.severe_tachycardia_heart_rate = severe_tachycardia_heart_rate
+        self.severe_low_spo2 = severe_low_spo2
+        self.symptom_extractor = symptom_extractor
+        self.mild_max_severity = mild_max_severity
+        if red_flag_extractor is None and symptom_extractor is not None:
+            red_flag_extractor = type(symptom_extractor).from_phrases(
+                emergency_keywords, max_edit_distance=symptom_extractor.max_edit_distance
+            )
+        self.red_flag_extractor = red_flag_extractor
+
+    def score(self, description: str, vital_signs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Score one patient
+
+        Returns:
+            Dictionary with symptoms, acuity ("emergency", "low" or "uncertain"),
+            priority estimate, specialty and confidence
+        """
+        text = (description or "").lower()
+        # The ontology (when loaded) replaces the mild keyword list: it also knows synonyms,
+        # text written without diacritics and negations such as "không sốt"
+        findings = []
+        if self.symptom_extractor is not None and self.symptom_extractor.symptoms:
+            red_flags = self.red_flag_extractor.match(description)
+            found = {match["symptom"] for match in red_flags}
+            emergency_hits = [keyword for keyword in self.emergency_keywords if keyword in found]
+            findings = self.symptom_extractor.match(description)
+            # Listed symptoms: one per text span, so "đau ngực" inside "đau ngực dữ dội" is not counted twice
+            listed = self.symptom_extractor.longest_non_overlapping(red_flags + findings)
+            symptoms = list(dict.fromkeys(match["symptom"] for match in listed))
+            mild_hits = list(dict.fromkeys(finding["symptom"] for finding in findings
+                                           if finding["severity"] <= self.mild_max_severity))
+        else:
+            emergency_hits = [keyword for keyword in self.emergency_keywords if keyword in text]
+            mild_hits = [keyword for keyword, pattern in self.mild_patterns if pattern.search(text)]
+            symptoms = list(dict.fromkeys(emergency_hits + mild_hits))
+        serious_findings = [finding["symptom"] for finding in findings if finding["severity"] > self.mild_max_severity]
+
+        vital_signs = vital_signs or {}
+        heart_rate = self._number(vital_signs.get("heart_rate"))
+        spo2 = self._number(vital_signs.get("spo2"))
+        vitals_known = heart_rate is not None and spo2 is not None
+        severe_vitals = (heart_rate is not None and heart_rate > self.severe_tachycardia_heart_rate) or \
+                        (spo2 is not None and spo2 < self.severe_low_spo2)
+        abnormal_vitals = (heart_rate is not None and heart_rate > self.tachycardia_heart_rate) or \
+                          (spo2 is not None and spo2 < self.low_spo2)
+
+        if emergency_hits and severe_vitals:
+            acuity, confidence = "emergency", 0.95
+        elif len(emergency_hits) >= 2:
+            acuity, confidence = "emergency", 0.9
+        elif not emergency_hits and not serious_findings and not abnormal_vitals and vitals_known and mild_hits:
+            acuity, confidence = "low", 0.85
+        elif emergency_hits or abnormal_vitals:
+            # One red flag without corroboration: could go either way
+            acuity, confidence = "uncertain", 0.6
+        else:
+            acuity, confidence = "uncertain", 0.4
+
+        return {
+            "symptoms": symptoms,
+            "acuity": acuity,
+            "priority": 5 if acuity == "emergency" else 2,
+            "specialty": self.symptom_extractor.specialty_of(findings) if findings else "chung",
+            "confidence": confidence
+        }
+
+    @staticmethod
+    def _number(value: Any) -> Optional[float]:
+        return float(value) if isinstance(value, (int, float)) and not isinstance(value, bool) else None
+
+
+class TriageCascade:
+    """
+    Two-tier symptom extraction
+
+    The local scorer runs first; if its confidence reaches the threshold its result
+    is used directly, otherwise the case escalates to TextProcessor (the LLM).
+    Results carry triage_tier ("local" or "model") and the local confidence.
+    """
+
+    def __init__(self, text_processor, scorer: LocalTriageScorer, confidence_threshold: float = 0.8):
+        """
+        Initialize the cascade
+
+        Args:
+            text_processor: TextProcessor used for escalated cases
+            scorer: Local first-tier scorer
+            confidence_threshold: Minimum local confidence to skip the model
+        """
+        self.text_processor = text_processor
+        self.scorer = scorer
+        self.confidence_threshold = confidence_threshold
+        self._lock = threading.Lock()
+        self._counts = {TIER_LOCAL: 0, TIER_MODEL: 0}
+
+    def extract_symptoms(self, description: str, vital_signs: Optional[Dict[str, Any]] = None,
+                         additional_info: Optional[str] = None, fallback=None) -> Dict[str, Any]:
+        """
+        Same result shape as TextProcessor.extract_symptoms, plus triage_tier and confidence
+
+        Args:
+            description: Patient description in Vietnamese
+            vital_signs: Vital signs used by the local tier
+            additional_info: Optional extra context for the model prompt
+            fallback: Rule-based fallback passed to the model tier
+        """
+        local = self.scorer.score(description, vital_signs)
+
+        if local["confidence"] >= self.confidence_threshold:
+            self._count(TIER_LOCAL)
+            return {
+                "symptoms": local["symptoms"],
+                "onset_time": "",
+                "priority": local["priority"],
+                "specialty": local["specialty"],
+                "original_text": description,
+                "source": TIER_LOCAL,
+                "triage_tier": TIER_LOCAL,
+                "confidence": local["confidence"],
+                "raw": local
+            }
+
+        self._count(TIER_MODEL)
+        result = self.text_processor.extract_symptoms(description, additional_info, fallback)
+        result["triage_tier"] = TIER_MODEL
+        result["confidence"] = local["confidence"]
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = sum(self._counts.values())
+            return {
+                "local": self._counts[TIER_LOCAL],
+                "model": self._counts[TIER_MODEL],
+                "local_ratio": round(self._counts[TIER_LOCAL] / total, 3) if total else 0.0,
+                "confidence_threshold": self.confidence_threshold
+            }
+
+    def _count(self, tier: str):
+        with self._lock:
+            self._counts[tier] += 1
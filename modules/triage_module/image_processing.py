@@ -7,27 +7,33 @@ import os
 import json
 import logging
 from typing import Dict, List, Optional, Any
-import requests
 from PIL import Image
 import io
 
+from utils.http_transport import HttpTransport, gemini_base_url, get_transport
+
 logger = logging.getLogger(__name__)
 
 class ImageProcessor:
     """Image processing utility for medical images"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, transport: Optional[HttpTransport] = None,
+                 timeout: float = 20):
         """
         Initialize the image processor
         
         Args:
             api_key: Google AI API key. If not provided, will try to get from environment
+            transport: HTTP transport; defaults to the shared pooled transport
+            timeout: Per-attempt timeout of vision API calls in seconds
         """
         self.api_key = api_key or os.getenv('GOOGLE_AI_API_KEY')
         if not self.api_key:
             logger.warning("No API key provided, using mock responses")
         
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-pro-vision:generateContent"
+        self.transport = transport or get_transport()
+        self.timeout = timeout
+        self.base_url = f"{gemini_base_url()}/v1beta/models/gemini-pro-vision:generateContent"
     
     def analyze_image(self, image_path: str) -> Dict[str, Any]:
         """
@@ -70,9 +76,9 @@ class ImageProcessor:
             url = f"{self.base_url}?key={self.api_key}"
             
             # This is simplified - would need proper formatting for the API
-            response = requests.post(
+            response = self.transport.post_json(
                 url,
-                json={
+                {
                     "contents": [{
                         "parts": [
                             {"text": "Analyze this medical image and describe any abnormalities:"},
@@ -84,7 +90,8 @@ class ImageProcessor:
                             }
                         ]
                     }]
-                }
+                },
+                timeout=self.timeout
             )
             
             if response.status_code == 200:
@@ -0,0 +1,207 @@
+"""
+Gom nhiều mô tả bệnh nhân vào một prompt - giảm số lời gọi mô hình khi hàng đợi đông
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Dict, List
+
+from utils.call_policy import call_priority, current_call_priority
+from utils.llm_metrics import collect_llm_calls, current_llm_call_log
+
+logger = logging.getLogger(__name__)
+
+# function_call name of batched extraction prompts (item lines look like "[p3] <mô tả>")
+BATCH_FUNCTION_CALL = "batch_extraction"
+
+
+class _BatchItem:
+    __slots__ = ("noi_dung", "fallback", "priority", "call_log", "future", "enqueued_at")
+
+    def __init__(self, noi_dung, fallback, priority, call_log):
+        self.noi_dung = noi_dung
+        self.fallback = fallback
+        self.priority = priority
+        # Workflow call log of the submitter; the batch runs on another thread
+        self.call_log = call_log
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+def build_batch_prompt(descriptions: List[str]) -> str:
+    """Structured prompt with one "[pN]" line per patient."""
+    lines = [
+        "Với MỖI bệnh nhân dưới đây, hãy trích xuất triệu chứng, thời gian khởi phát, mức độ ưu tiên, "
+        "chuyên khoa phù hợp.",
+        'Trả về JSON dạng {"results": [{"id": "p1", "symptoms": [...], "onset_time": "...", '
+        '"priority": 1-5, "specialty": "..."}]}, mỗi id đúng một phần tử.',
+        ""
+    ]
+    for index, description in enumerate(descriptions, start=1):
+        # One line per item, so ids cannot be spoofed by line breaks in the description
+        lines.append(f"[p{index}] {' '.join(str(description).split())}")
+    return "\n".join(lines)
+
+
+def parse_batch_response(response: Any, count: int) -> Dict[str, Dict[str, Any]]:
+    """Per-item results by id ("p1".."pN"); malformed or unknown items are left out."""
+    results = response.get("results") if isinstance(response, dict) else None
+    if not isinstance(results, list):
+        return {}
+    valid_ids = {f"p{index}" for index in range(1, count + 1)}
+    parsed = {}
+    for item in results:
+        if isinstance(item, dict) and item.get("id") in valid_ids and isinstance(item.get("symptoms", []), list):
+            parsed.setdefault(item["id"], item)
+    return parsed
+
+
+class PromptBatcher:
+    """
+    Packs concurrent TextProcessor.phan_tich calls into multi-patient prompts.
+
+    Calls wait in a queue until max_items are pending or the oldest has waited
+    max_wait_ms, then one structured prompt is sent for the whole batch. Items
+    missing from the parsed answer (or all items, if the batch call fails) are
+    analysed with individual calls, run in parallel on the same executor.
+    """
+
+    def __init__(self, text_processor, max_items: int = 8, max_wait_ms: float = 20,
+                 max_concurrent_batches: int = 4, timeout_seconds: float = 30):
+        """
+        Initialize the batcher and start its collector thread.
+
+        Args:
+            text_processor: TextProcessor whose single-prompt path is used for fallbacks
+            max_items: Maximum descriptions per prompt
+            max_wait_ms: Longest time the first queued item waits for the batch to fill
+            max_concurrent_batches: Batches (and individual fallback calls) sent to the model at the same time
+            timeout_seconds: Longest time phan_tich waits for its result before using the fallback
+        """
+        self.text_processor = text_processor
+        self.max_items = max_items
+        self.max_wait = max_wait_ms / 1000
+        self.timeout = timeout_seconds
+
+        self._pending: List[_BatchItem] = []
+        self._condition = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrent_batches,
+                                            thread_name_prefix="prompt-batch")
+        self._counts = {"batches": 0, "items": 0, "individual_fallbacks": 0, "timed_out": 0}
+        threading.Thread(target=self._collect_loop, name="prompt-batcher", daemon=True).start()
+
+    def submit(self, noi_dung: str, fallback=None) -> Future:
+        """Queue one description; the future resolves to a phan_tich result."""
+        item = _BatchItem(noi_dung, fallback, current_call_priority(), current_llm_call_log())
+        with self._condition:
+            self._pending.append(item)
+            self._condition.notify()
+        return item.future
+
+    def phan_tich(self, noi_dung: str, fallback=None) -> Dict[str, Any]:
+        """
+        Blocking batched equivalent of TextProcessor.phan_tich.
+
+        A caller waits at most timeout_seconds. After that its item is dropped if it
+        has not started, and the caller gets the rule-based (or sample) result.
+        """
+        future = self.submit(noi_dung, fallback)
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            future.cancel()
+            with self._condition:
+                self._counts["timed_out"] += 1
+            logger.warning(f"Batched extraction took longer than {self.timeout}s, using the fallback")
+            gemini = self.text_processor.gemini
+            return self.text_processor._ket_qua(gemini._fallback_response(noi_dung, None, fallback))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._condition:
+            counts = dict(self._counts)
+            counts["pending"] = len(self._pending)
+        counts["avg_batch_size"] = round(counts["items"] / counts["batches"], 2) if counts["batches"] else 0.0
+        return counts
+
+    def _collect_loop(self):
+        while True:
+            with self._condition:
+                while not self._pending:
+                    self._condition.wait()
+                deadline = self._pending[0].enqueued_at + self.max_wait
+                while len(self._pending) < self.max_items:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                batch = self._pending[:self.max_items]
+                del self._pending[:self.max_items]
+                self._counts["batches"] += 1
+                self._counts["items"] += len(batch)
+            self._submit(batch, self._run_batch, batch)
+
+    def _run_batch(self, batch: List[_BatchItem]):
+        # Callers that gave up before the batch was sent are left out of the prompt
+        batch = [item for item in batch if not item.future.cancelled()]
+        if not batch:
+            return
+        if len(batch) == 1:
+            self._run_single(batch[0])
+            return
+
+        priorities = [item.priority for item in batch if item.priority is not None]
+        parsed = {}
+        with call_priority(max(priorities) if priorities else None):
+            try:
+                with collect_llm_calls() as batch_log:
+                    response = self.text_processor.gemini.generate(
+                        build_batch_prompt([item.noi_dung for item in batch]),
+                        function_call=BATCH_FUNCTION_CALL, use_cache=False, call_site="text_processing_batch"
+                    )
+                # Every patient in the batch waited for the shared call
+                for item in batch:
+                    if item.call_log is not None:
+                        for call in batch_log.calls():
+                            item.call_log.add(dict(call, batch_size=len(batch)))
+                # Sample or rule-based stand-ins carry no per-item answers
+                if response.get("source") == "model":
+                    parsed = parse_batch_response(response, len(batch))
+            except Exception as e:
+                logger.error(f"Batched extraction failed, falling back to single prompts: {e}")
+
+        for index, item in enumerate(batch, start=1):
+            result = parsed.get(f"p{index}")
+            if result is not None:
+                self._resolve(item, lambda result=result: self.text_processor._ket_qua(dict(result, source="model")))
+                continue
+            # Items without an answer are analysed one by one, in parallel on the executor
+            with self._condition:
+                self._counts["individual_fallbacks"] += 1
+            self._submit([item], self._run_single, item)
+
+    def _submit(self, items: List[_BatchItem], target: Callable, *args):
+        # A job that cannot be scheduled fails its items instead of leaving their callers waiting
+        try:
+            self._executor.submit(target, *args)
+        except Exception as e:
+            logger.error(f"Could not schedule batched extraction: {e}")
+            for item in items:
+                if item.future.set_running_or_notify_cancel():
+                    item.future.set_exception(e)
+
+    def _run_single(self, item: _BatchItem):
+        with call_priority(item.priority), collect_llm_calls(item.call_log):
+            self._resolve(item, lambda: self.text_processor._phan_tich_mot(item.noi_dung, None, item.fallback))
+
+    @staticmethod
+    def _resolve(item: _BatchItem, produce: Callable[[], Dict[str, Any]]):
+        # A caller past its deadline has cancelled the future and no longer needs a result
+        if not item.future.set_running_or_notify_cancel():
+            return
+        try:
+            item.future.set_result(produce())
+        except Exception as e:
+            item.future.set_exception(e)
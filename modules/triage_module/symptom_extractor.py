@@ -0,0 +1,292 @@
+"""
+Trích xuất triệu chứng cục bộ từ data/symptom_ontology.json - không cần gọi mô hình
+"""
+
+import functools
+import json
+import logging
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+from .symspell import SymSpellIndex
+
+logger = logging.getLogger(__name__)
+
+SOURCE_LOCAL = "local"
+
+# Tokens that negate the symptom right after them ("không sốt", "hết ho"), diacritics folded
+NEGATION_TOKENS = {"khong", "chua", "het", "ko", "k"}
+NEGATION_WINDOW = 2
+
+# Typo tolerance per folded token: length -> edits allowed (shorter tokens must match exactly)
+FUZZY_MIN_LENGTH = {1: 3, 2: 7}
+
+_TOKEN = re.compile(r"\w+")
+_TOKEN_OR_BREAK = re.compile(r"\w+|[,.;:!?\n()]")
+# Matched on folded text: "2 ngày trước", "3 giờ nay", "từ sáng", "từ hôm qua"
+_ONSET = re.compile(
+    r"\b(?:\d+|mot|hai|ba|bon|nam|vai)\s+(?:ngay|gio|tieng|tuan|thang)(?:\s+(?:truoc|nay|qua))?\b"
+    r"|\btu\s+(?:sang|trua|chieu|toi|dem|hom qua|hom kia|tuan truoc|thang truoc)\b"
+)
+
+
+def _build_fold_table() -> Dict[int, str]:
+    table = {ord("đ"): "d", ord("Đ"): "D"}
+    for code in range(0xC0, 0x1EFA):
+        char = chr(code)
+        base = unicodedata.normalize("NFD", char)[0]
+        if base != char and base.isascii() and base.isalpha():
+            table[code] = base
+    return table
+
+
+_FOLD_TABLE = _build_fold_table()
+
+
+def fold_diacritics(text: str) -> str:
+    """Vietnamese text without diacritics ("khó thở" -> "kho tho"), same length as the input."""
+    return text.translate(_FOLD_TABLE)
+
+
+class SymptomExtractor:
+    """
+    Dictionary-based symptom extractor compiled from the symptom ontology.
+
+    Every symptom name and synonym is inserted into a word-level trie keyed by
+    diacritic-folded tokens, so one left-to-right pass over the tokens finds the
+    longest term at each position, on whole words only. Input written without
+    diacritics matches any term; a token written with diacritics must match the
+    term exactly, so "họ" is not read as "ho". Terms preceded by a negation
+    ("không sốt") are skipped.
+
+    Typos are corrected per token with a SymSpell index over the term vocabulary
+    ("ngucc" -> "nguc"). A corrected match must span at least two words, keep at
+    least one of them exact and stay within max_edit_distance edits in total, so
+    one-word symptoms ("sốt", "ngất") are never guessed from a typo.
+    """
+
+    def __init__(self, ontology: Dict[str, Any], max_edit_distance: int = 2):
+        """
+        Compile the ontology.
+
+        Args:
+            ontology: {"symptoms": {name: {"synonyms": [...], "severity": 1-5, "specialty": str}}}
+            max_edit_distance: Edits allowed per match (after diacritic folding), 0 disables typo tolerance
+        """
+        self.symptoms: Dict[str, Dict[str, Any]] = dict(ontology.get("symptoms", {}))
+        self.max_edit_distance = max_edit_distance
+        self._trie: Dict[str, Any] = {}
+        self._terms = 0
+        # Folded term -> symptom names, for whole-phrase lookup()
+        self._term_names: Dict[str, List[str]] = {}
+        for name, entry in self.symptoms.items():
+            for term in dict.fromkeys([name] + list(entry.get("synonyms", []))):
+                self._add_term(term, name)
+        self.term_index = SymSpellIndex(self._term_names, max_distance=max_edit_distance)
+        self.token_index = SymSpellIndex(self._trie_vocabulary(self._trie), max_distance=max_edit_distance)
+        self._correct = functools.lru_cache(maxsize=4096)(self._correct_token)
+
+    @classmethod
+    def from_file(cls, path: str, max_edit_distance: int = 2) -> "SymptomExtractor":
+        """Extractor for an ontology JSON file; a missing or unreadable file gives an empty extractor."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                ontology = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Symptom ontology not loaded from {path}: {e}")
+            ontology = {}
+        extractor = cls(ontology, max_edit_distance=max_edit_distance)
+        logger.info(f"Symptom ontology: {len(extractor.symptoms)} symptoms, {extractor._terms} terms")
+        return extractor
+
+    @classmethod
+    def from_phrases(cls, phrases: List[str], max_edit_distance: int = 2) -> "SymptomExtractor":
+        """Extractor whose symptoms are exactly the given phrases (e.g. a keyword registry category)."""
+        return cls({"symptoms": {phrase: {} for phrase in phrases}}, max_edit_distance=max_edit_distance)
+
+    def phrases_in(self, text: str) -> set:
+        """Symptom names matched in text (folded, typo-tolerant, negations skipped)."""
+        return {match["symptom"] for match in self.match(text)}
+
+    def _add_term(self, term: str, name: str):
+        tokens = _TOKEN.findall(term.lower())
+        if not tokens:
+            return
+        node = self._trie
+        for token in tokens:
+            node = node.setdefault(fold_diacritics(token), {})
+        node.setdefault(None, []).append((tokens, name))
+        self._terms += 1
+        folded_term = fold_diacritics(" ".join(tokens))
+        if name not in self._term_names.setdefault(folded_term, []):
+            self._term_names[folded_term].append(name)
+
+    @staticmethod
+    def _trie_vocabulary(node: Dict[str, Any]) -> set:
+        vocabulary = set()
+        stack = [node]
+        while stack:
+            for key, child in stack.pop().items():
+                if key is not None:
+                    vocabulary.add(key)
+                    stack.append(child)
+        return vocabulary
+
+    def _correct_token(self, folded_token: str) -> Tuple[Tuple[str, int], ...]:
+        # Closest vocabulary tokens (all at the smallest distance); the trie picks the one that forms a term
+        allowed = max((distance for distance, length in FUZZY_MIN_LENGTH.items() if len(folded_token) >= length),
+                      default=0)
+        candidates = self.token_index.lookup(folded_token, min(allowed, self.max_edit_distance)) if allowed else []
+        return tuple(candidate for candidate in candidates if candidate[1] == candidates[0][1])
+
+    def lookup(self, query: str, max_distance: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Fuzzy symptom lookup for a short phrase ("dau ngucc" -> "đau ngực").
+
+        Args:
+            query: Symptom phrase, with or without diacritics
+            max_distance: Edits allowed after diacritic folding (default: max_edit_distance)
+
+        Returns:
+            One dict per candidate (symptom, term, distance), closest first
+        """
+        folded = " ".join(_TOKEN.findall(fold_diacritics(self._normalize(query))))
+        return [
+            {"symptom": name, "term": term, "distance": distance}
+            for term, distance in self.term_index.lookup(folded, max_distance)
+            for name in self._term_names[term]
+        ]
+
+    def match(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Symptom terms found in text, in text order.
+
+        Returns:
+            One dict per match: symptom, term, start/end character offsets, severity, specialty
+            and distance (edits corrected, 0 for an exact match)
+        """
+        lowered = self._normalize(text)
+        return self._match(lowered, fold_diacritics(lowered))
+
+    @staticmethod
+    def _normalize(text: Optional[str]) -> str:
+        # Input in decomposed form (NFD) would split words at the combining marks
+        return unicodedata.normalize("NFC", text or "").lower()
+
+    def _match(self, lowered: str, folded: str) -> List[Dict[str, Any]]:
+        # Words and clause breaks; a break is never a trie key, so terms cannot span clauses
+        spans = [(m.start(), m.end()) for m in _TOKEN_OR_BREAK.finditer(folded)]
+        folded_tokens = [folded[a:b] for a, b in spans]
+        tokens = folded_tokens if lowered == folded else [lowered[a:b] for a, b in spans]
+        # Trie keys per token: the token itself if known, else its typo corrections (maybe none)
+        options = [((folded_token, 0),) if folded_token in self.token_index.words or not self.max_edit_distance
+                   else self._correct(folded_token)
+                   for folded_token in folded_tokens]
+
+        matches = []
+        i = 0
+        while i < len(tokens):
+            best = self._longest_term(i, tokens, folded_tokens, options)
+            if best is None:
+                i += 1
+                continue
+
+            j, term_tokens, name, distance = best
+            if not self._negated(folded_tokens, i):
+                entry = self.symptoms[name]
+                matches.append({
+                    "symptom": name,
+                    "term": " ".join(term_tokens),
+                    "start": spans[i][0],
+                    "end": spans[j - 1][1],
+                    "severity": entry.get("severity", 1),
+                    "specialty": entry.get("specialty", "chung"),
+                    "distance": distance
+                })
+            i = j
+        return matches
+
+    def _longest_term(self, i: int, tokens: List[str], folded_tokens: List[str],
+                      options: List[Tuple[Tuple[str, int], ...]]) -> Optional[Tuple[int, List[str], str, int]]:
+        # Longest (then closest) term starting at token i: (end, term tokens, symptom, distance)
+        best = None
+        stack = [(self._trie, i, 0, False)]
+        while stack:
+            node, j, distance, has_exact = stack.pop()
+            if j > i:
+                for term_tokens, name in node.get(None, ()):
+                    if distance == 0:
+                        valid = tokens[i:j] == term_tokens or all(
+                            token == term_token or token == folded_token
+                            for token, folded_token, term_token in zip(tokens[i:j], folded_tokens[i:j], term_tokens))
+                    else:
+                        valid = j - i >= 2 and has_exact
+                    if valid and (best is None or (j, -distance) > (best[0], -best[3])):
+                        best = (j, term_tokens, name, distance)
+                        break
+            if j < len(tokens):
+                for key, edits in options[j]:
+                    if key in node and distance + edits <= self.max_edit_distance:
+                        stack.append((node[key], j + 1, distance + edits, has_exact or edits == 0))
+        return best
+
+    @staticmethod
+    def _negated(folded_tokens: List[str], index: int) -> bool:
+        for k in range(index - 1, max(-1, index - 1 - NEGATION_WINDOW), -1):
+            token = folded_tokens[k]
+            if token in NEGATION_TOKENS:
+                return True
+            if not token[0].isalnum():
+                return False
+        return False
+
+    @staticmethod
+    def longest_non_overlapping(matches: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Matches (possibly from several extractors) with overlapping spans resolved.
+
+        The longest match wins an overlap ("đau ngực dữ dội" over "đau ngực"); the
+        result is in text order.
+        """
+        kept: List[Dict[str, Any]] = []
+        for match in sorted(matches, key=lambda m: (m["start"] - m["end"], m["start"])):
+            if all(match["end"] <= other["start"] or match["start"] >= other["end"] for other in kept):
+                kept.append(match)
+        return sorted(kept, key=lambda m: m["start"])
+
+    @staticmethod
+    def specialty_of(matches: List[Dict[str, Any]]) -> str:
+        """Specialty with the highest total severity among matches ("chung" if none)."""
+        totals: Dict[str, int] = {}
+        for match in matches:
+            totals[match["specialty"]] = totals.get(match["specialty"], 0) + match["severity"]
+        return max(totals, key=totals.get) if totals else "chung"
+
+    def phan_tich(self, noi_dung: str) -> Dict[str, Any]:
+        """Same result shape as TextProcessor.phan_tich, computed locally (nguon "local")."""
+        lowered = self._normalize(noi_dung)
+        folded = fold_diacritics(lowered)
+        matches = self._match(lowered, folded)
+        onset = _ONSET.search(folded)
+        return {
+            "trieu_chung": list(dict.fromkeys(match["symptom"] for match in matches)),
+            "thoi_gian_khoi_phat": lowered[onset.start():onset.end()] if onset else "",
+            "muc_do_uu_tien": max((match["severity"] for match in matches), default=2),
+            "chuyen_khoa": self.specialty_of(matches),
+            "nguon": SOURCE_LOCAL,
+            "raw": {"matches": matches}
+        }
+
+    def extract_symptoms(self, description: str) -> Dict[str, Any]:
+        """Same result shape as TextProcessor.extract_symptoms, computed locally."""
+        ket_qua = self.phan_tich(description)
+        return {
+            "symptoms": ket_qua["trieu_chung"],
+            "onset_time": ket_qua["thoi_gian_khoi_phat"],
+            "priority": ket_qua["muc_do_uu_tien"],
+            "specialty": ket_qua["chuyen_khoa"],
+            "original_text": description,
+            "source": ket_qua["nguon"],
+            "raw": ket_qua["raw"]
+        }
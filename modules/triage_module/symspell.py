@@ -0,0 +1,90 @@
+"""
+Tra cứu gần đúng kiểu SymSpell: chỉ mục các biến thể xóa ký tự, cho phép sai tối đa 2 ký tự
+"""
+
+from typing import Dict, Iterable, List, Set, Tuple
+
+
+def edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (insert, delete, substitute, swap adjacent).
+
+    Returns:
+        The distance, or max_distance + 1 as soon as it is known to exceed max_distance
+    """
+    if a == b:
+        return 0
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous2: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return min(previous[-1], max_distance + 1)
+
+
+def deletes(word: str, max_distance: int) -> Set[str]:
+    """All strings obtained from word by deleting up to max_distance characters (word included)."""
+    variants = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))}
+        variants |= frontier
+    return variants
+
+
+class SymSpellIndex:
+    """
+    Deletion-neighbourhood index for fuzzy lookup.
+
+    Every word is stored under all its variants with up to max_distance
+    characters deleted. Two words within max_distance edits share at least one
+    variant, so a lookup only generates the query's own deletions and checks
+    the handful of words stored under them - independent of vocabulary size.
+    """
+
+    def __init__(self, words: Iterable[str], max_distance: int = 2):
+        """
+        Build the index.
+
+        Args:
+            words: Vocabulary (callers fold diacritics and case before indexing)
+            max_distance: Largest edit distance lookups may ask for
+        """
+        self.max_distance = max_distance
+        self.words: Set[str] = set(words)
+        self._variants: Dict[str, List[str]] = {}
+        for word in self.words:
+            for variant in deletes(word, max_distance):
+                self._variants.setdefault(variant, []).append(word)
+
+    def lookup(self, query: str, max_distance: int = None) -> List[Tuple[str, int]]:
+        """
+        Vocabulary words within max_distance edits of query.
+
+        Returns:
+            (word, distance) pairs, closest first
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        if query in self.words:
+            return [(query, 0)]
+        candidates: Set[str] = set()
+        for variant in deletes(query, max_distance):
+            candidates.update(self._variants.get(variant, ()))
+        found = []
+        for word in candidates:
+            distance = edit_distance(query, word, max_distance)
+            if distance <= max_distance:
+                found.append((word, distance))
+        return sorted(found, key=lambda item: (item[1], item[0]))
+
+    def __len__(self) -> int:
+        return len(self._variants)
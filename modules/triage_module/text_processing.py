@@ -6,16 +6,62 @@ from modules.gemini_client import GeminiClient
 class TextProcessor:
     def __init__(self, gemini_client=None):
         self.gemini = gemini_client or GeminiClient()
+        # PromptBatcher gộp các lời gọi đồng thời thành một prompt nhiều bệnh nhân (tắt mặc định)
+        self.batcher = None
 
-    def phan_tich(self, noi_dung_benh_nhan, thong_tin_bo_sung=None):
+    def enable_batching(self, max_items=8, max_wait_ms=20, timeout_seconds=30):
+        """Gộp tối đa max_items mô tả đang chờ (chờ không quá max_wait_ms) vào một prompt; quá timeout_seconds thì dùng fallback"""
+        from modules.triage_module.prompt_batcher import PromptBatcher
+        self.batcher = PromptBatcher(self, max_items=max_items, max_wait_ms=max_wait_ms,
+                                     timeout_seconds=timeout_seconds)
+
+    def batch_stats(self):
+        return self.batcher.stats() if self.batcher is not None else {"enabled": False}
+
+    def phan_tich(self, noi_dung_benh_nhan, thong_tin_bo_sung=None, fallback=None):
+        # fallback: phân tích theo luật dùng khi mô hình không khả dụng (xem GeminiClient.generate)
+        # Prompt có thông tin bổ sung luôn được gửi riêng
+        if self.batcher is not None and not thong_tin_bo_sung:
+            return self.batcher.phan_tich(noi_dung_benh_nhan, fallback)
+        return self._phan_tich_mot(noi_dung_benh_nhan, thong_tin_bo_sung, fallback)
+
+    def _phan_tich_mot(self, noi_dung_benh_nhan, thong_tin_bo_sung=None, fallback=None):
         prompt = f"Hãy trích xuất triệu chứng, thời gian khởi phát, mức độ ưu tiên, chuyên khoa phù hợp từ mô tả sau: {noi_dung_benh_nhan}"
         if thong_tin_bo_sung:
             prompt += f"\nThông tin bổ sung: {thong_tin_bo_sung}"
-        ket_qua = self.gemini.generate(prompt)
+        return self._ket_qua(self.gemini.generate(prompt, fallback=fallback, call_site="text_processing"))
+
+    @staticmethod
+    def _ket_qua(ket_qua):
         return {
             "trieu_chung": ket_qua.get("symptoms", []),
             "thoi_gian_khoi_phat": ket_qua.get("onset_time", ""),
             "muc_do_uu_tien": ket_qua.get("priority", 2),
             "chuyen_khoa": ket_qua.get("specialty", "chung"),
+            "nguon": ket_qua.get("source"),
             "raw": ket_qua
-        }
\ No newline at end of file
+        }
+
+    def extract_symptoms(self, description, additional_info=None, fallback=None):
+        """
+        English wrapper used by the workflow
+
+        Args:
+            description: Patient description in Vietnamese
+            additional_info: Optional extra context for the prompt
+            fallback: Optional callable returning a rule-based result when the model is unavailable
+
+        Returns:
+            Dictionary with symptoms, onset time, priority, specialty, the original text
+            and the source that produced it ("model", "rule_based" or "sample")
+        """
+        ket_qua = self.phan_tich(description, additional_info, fallback)
+        return {
+            "symptoms": ket_qua["trieu_chung"],
+            "onset_time": ket_qua["thoi_gian_khoi_phat"],
+            "priority": ket_qua["muc_do_uu_tien"],
+            "specialty": ket_qua["chuyen_khoa"],
+            "original_text": description,
+            "source": ket_qua["nguon"],
+            "raw": ket_qua["raw"]
+        }
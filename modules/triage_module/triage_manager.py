@@ -6,6 +6,8 @@ import logging
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+from utils.triage_rules import get_triage_rules
+
 logger = logging.getLogger(__name__)
 
 class TriageManager:
@@ -99,15 +101,12 @@ class TriageManager:
         image_priority = analysis_results.get("image_analysis", {}).get("risk_level", 2)
         medical_priority = analysis_results.get("medical_assessment", {}).get("priority", 2)
         
-        # Weighted average with medical assessment having highest weight
-        weights = {"text": 0.3, "image": 0.3, "medical": 0.4}
-        final_priority = (
-            text_priority * weights["text"] + 
-            image_priority * weights["image"] + 
-            medical_priority * weights["medical"]
-        )
-        
-        return min(5, max(1, round(final_priority)))
+        # Weighted average with medical assessment having highest weight ("triage_manager_priority" rules)
+        return get_triage_rules().evaluate("triage_manager_priority", {
+            "text_priority": text_priority,
+            "image_priority": image_priority,
+            "medical_priority": medical_priority
+        })["score"]
     
     def _determine_urgency(self, analysis_results: Dict) -> str:
         """Determine urgency level based on analysis"""
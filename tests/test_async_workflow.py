@@ -0,0 +1,33 @@
+import asyncio
+
+import pytest
+
+from workflow_clean_final import AsyncPatientDispatchWorkflow
+
+PATIENT = {"description": "Bệnh nhân nam, 35 tuổi, sốt nhẹ 2 ngày, ho khan",
+           "vital_signs": {"heart_rate": 88, "spo2": 98}}
+
+
+@pytest.fixture(scope="module")
+def workflow():
+    workflow = AsyncPatientDispatchWorkflow(max_blocking_calls=4)
+    yield workflow
+    workflow.executor.shutdown(wait=False)
+
+
+def test_inherited_sync_entry_points_return_results(workflow):
+    assert workflow.process_patient_input(PATIENT)["status"] == "completed"
+    assert isinstance(workflow.extract_patient_information(PATIENT), dict)
+    assert [event.step for event in workflow.iter_steps(PATIENT)] == [1, 2, 3, 4, 5]
+    assert workflow.process_patients_batch([PATIENT])[0]["status"] == "completed"
+
+
+def test_async_entry_points_match_sync(workflow):
+    async def run():
+        return await workflow.aprocess_patient_input(PATIENT), await workflow.process_patients([PATIENT, PATIENT])
+
+    single, many = asyncio.run(run())
+    sync = workflow.process_patient_input(PATIENT)
+
+    assert single["status"] == "completed" and [r["status"] for r in many] == ["completed", "completed"]
+    assert single["steps"]["step2_triage"]["priority_score"] == sync["steps"]["step2_triage"]["priority_score"]
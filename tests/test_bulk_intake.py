@@ -0,0 +1,28 @@
+import asyncio
+import json
+
+import app_simple_working
+
+
+def test_client_disconnect_mid_stream_finishes_cancelled_patients(monkeypatch):
+    tasks = []
+
+    async def fake_process(patient_data, sink=None):
+        tasks.append(asyncio.current_task())
+        if patient_data["description"] != "nhanh":
+            # Like the concurrent step-1 calls: cancelling needs a few loop iterations to settle
+            await asyncio.gather(asyncio.sleep(30), asyncio.sleep(30))
+        return {"status": "completed", "workflow_id": patient_data["description"]}
+
+    monkeypatch.setattr(app_simple_working.bulk_workflow, "aprocess_patient_input", fake_process)
+    body = "\n".join(json.dumps({"description": description}) for description in ["nhanh", "cham", "cham"])
+
+    client = app_simple_working.app.test_client()
+    response = client.post("/api/process_patients", data=body, buffered=False)
+    first = json.loads(next(iter(response.response)))
+    response.close()
+
+    assert first["workflow_id"] == "nhanh"
+    assert len(tasks) == 3
+    assert all(task.done() for task in tasks)
+    assert sum(task.cancelled() for task in tasks) == 2
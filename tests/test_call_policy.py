@@ -0,0 +1,23 @@
+import time
+
+from utils.call_policy import AdaptiveRateLimiter, CallPolicy
+
+
+class _Response:
+    status_code = 200
+    headers = {}
+
+
+def test_denied_hedge_returns_its_rate_limit_token():
+    policy = CallPolicy(hedge_default_delay=0.01)
+    while policy.budget.try_withdraw():
+        pass
+    limiter = AdaptiveRateLimiter(rate=0.001, burst=1)
+
+    def slow_attempt(timeout):
+        time.sleep(0.05)
+        return _Response()
+
+    assert policy._hedged(slow_attempt, 1.0, limiter).status_code == 200
+    assert policy.stats()["hedges"] == 0
+    assert limiter.try_acquire()
@@ -0,0 +1,75 @@
+import itertools
+import time
+
+from modules.gemini_cache import cache_key
+from modules.gemini_cassette import RECORD, REPLAY, GeminiCassette
+from modules.gemini_client import GeminiClient
+from utils.circuit_breaker import CLOSED, CircuitBreaker
+
+
+def record_prompts(path, prompts, function_call="symptom_extraction"):
+    """Record one response per prompt; the n-th backend response is {"answer": n}"""
+    client = GeminiClient(cache=None, cassette=GeminiCassette(str(path), mode=RECORD))
+    counter = itertools.count()
+    client._mock_response = lambda prompt, function_call=None: {"answer": next(counter)}
+    for prompt in prompts:
+        client.generate(prompt, function_call)
+    client.cassette.close()
+
+
+def replay_client(path, **kwargs):
+    return GeminiClient(cache=None, cassette=GeminiCassette(str(path), mode=REPLAY, **kwargs))
+
+
+def test_record_then_replay_round_trip(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    record_prompts(path, ["đau đầu, sốt", "ho khan"])
+    client = replay_client(path)
+
+    # Keys use the normalized prompt, so whitespace differences replay the same response
+    assert client.generate("  đau đầu,   sốt ", "symptom_extraction") == {"answer": 0, "source": "model"}
+    assert client.generate("ho khan", "symptom_extraction") == {"answer": 1, "source": "model"}
+    # The function_call name is part of the key
+    assert client.generate("ho khan", "qa_chat")["source"] == "sample"
+    assert client.cassette.stats()["replayed"] == 2
+
+
+def test_repeated_prompt_cycles_through_its_recordings(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    record_prompts(path, ["ho khan"] * 3)
+    client = replay_client(path)
+
+    answers = [client.generate("ho khan", "symptom_extraction")["answer"] for _ in range(4)]
+
+    assert answers == [0, 1, 2, 0]
+    assert client.cassette.stats()["prompts"] == 1
+
+
+def test_replay_latency_is_optional(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    cassette = GeminiCassette(str(path), mode=RECORD)
+    cassette.record(cache_key("ho khan", "symptom_extraction"), "symptom_extraction", {"answer": 0}, 0.3)
+    cassette.close()
+
+    started = time.monotonic()
+    replay_client(path).generate("ho khan", "symptom_extraction")
+    assert time.monotonic() - started < 0.1
+
+    started = time.monotonic()
+    replay_client(path, replay_latency=True, latency_scale=0.5).generate("ho khan", "symptom_extraction")
+    assert time.monotonic() - started >= 0.15
+
+
+def test_replay_miss_does_not_trip_the_breaker(tmp_path):
+    path = tmp_path / "cassette.jsonl"
+    record_prompts(path, ["đau đầu, sốt"])
+    breaker = CircuitBreaker("CassetteTest", window=4, min_calls=2)
+    client = GeminiClient(cache=None, breaker=breaker, cassette=GeminiCassette(str(path), mode=REPLAY))
+
+    for _ in range(6):
+        missed = client.generate("ho khan", "symptom_extraction", fallback=lambda: {"priority": 2})
+        assert missed == {"priority": 2, "source": "rule_based"}
+
+    assert breaker.state == CLOSED
+    assert client.generate("đau đầu, sốt", "symptom_extraction")["source"] == "model"
+    assert client.cassette.stats()["misses"] == 6
@@ -0,0 +1,28 @@
+import threading
+import time
+
+from modules.gemini_client import GeminiClient
+
+
+def test_coalesced_callers_get_their_own_fallback():
+    client = GeminiClient()
+
+    def failing_backend(prompt, function_call=None):
+        time.sleep(0.2)
+        raise RuntimeError("backend down")
+
+    client._generate = failing_backend
+    results = {}
+
+    def call(i):
+        results[i] = client.generate("same description", "symptom_extraction", use_cache=False,
+                                     fallback=lambda: {"priority": i})
+
+    threads = [threading.Thread(target=call, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert client.single_flight.stats()["coalesced"] > 0
+    assert results == {i: {"priority": i, "source": "rule_based"} for i in range(4)}
@@ -0,0 +1,23 @@
+import pytest
+
+from workflow_clean_final import PatientDispatchWorkflow
+
+
+@pytest.fixture(scope="module")
+def scorer():
+    return PatientDispatchWorkflow().triage_cascade.scorer
+
+
+@pytest.mark.parametrize("description", ["đau ngực dữ dội, khó thở", "dau nguc du doi, kho tho"])
+def test_overlapping_phrases_count_once(scorer, description):
+    result = scorer.score(description, {"heart_rate": 130, "spo2": 97})
+
+    assert result["symptoms"] == ["đau ngực dữ dội", "khó thở"]
+    assert result["acuity"] == "emergency"
+
+
+def test_negated_red_flag_is_not_an_emergency_hit(scorer):
+    result = scorer.score("sốt nhẹ, ho khan, không khó thở", {"heart_rate": 88, "spo2": 98})
+
+    assert result["symptoms"] == ["sốt", "ho"]
+    assert result["acuity"] == "low"
@@ -0,0 +1,134 @@
+import re
+import threading
+import time
+
+from modules.gemini_client import GeminiClient
+from modules.triage_module.prompt_batcher import BATCH_FUNCTION_CALL
+from modules.triage_module.text_processing import TextProcessor
+
+
+class FakeModel:
+    """Stands in for GeminiClient._generate; the answer for a description is its own text as the symptom."""
+
+    def __init__(self, batch_error=None, skip_ids=(), reverse=False, delay=0.0):
+        self.batch_error = batch_error
+        self.skip_ids = set(skip_ids)
+        self.reverse = reverse
+        self.delay = delay
+        self.batches = []
+        self.singles = []
+        self._lock = threading.Lock()
+
+    def __call__(self, prompt, function_call=None):
+        time.sleep(self.delay)
+        if function_call == BATCH_FUNCTION_CALL:
+            items = re.findall(r"^\[(p\d+)\] (.*)$", prompt, re.MULTILINE)
+            with self._lock:
+                self.batches.append([description for _, description in items])
+            if self.batch_error is not None:
+                raise self.batch_error
+            results = [{"id": item_id, "symptoms": [description], "priority": 3}
+                       for item_id, description in items if item_id not in self.skip_ids]
+            return {"results": results[::-1] if self.reverse else results}
+        description = prompt.split(": ", 1)[1]
+        with self._lock:
+            self.singles.append(description)
+        return {"symptoms": [description], "priority": 2}
+
+
+def make_processor(model, max_items=4, max_wait_ms=5000, timeout_seconds=5):
+    client = GeminiClient(cache=None)
+    client._generate = model
+    processor = TextProcessor(client)
+    processor.enable_batching(max_items, max_wait_ms, timeout_seconds)
+    return processor
+
+
+def run_concurrently(processor, descriptions):
+    results = {}
+
+    def call(description):
+        results[description] = processor.phan_tich(description, fallback=lambda: {"symptoms": ["rule"]})
+
+    threads = [threading.Thread(target=call, args=(description,)) for description in descriptions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    return results
+
+
+def test_full_batch_is_sent_without_waiting_for_max_wait():
+    model = FakeModel()
+    processor = make_processor(model, max_items=3, max_wait_ms=5000)
+
+    started = time.monotonic()
+    results = run_concurrently(processor, ["sốt", "ho", "khó thở"])
+
+    assert time.monotonic() - started < 2
+    assert len(model.batches) == 1 and sorted(model.batches[0]) == ["ho", "khó thở", "sốt"]
+    assert processor.batch_stats()["items"] == 3
+    assert all(result["nguon"] == "model" for result in results.values())
+
+
+def test_partial_batch_is_sent_after_max_wait():
+    model = FakeModel()
+    processor = make_processor(model, max_items=8, max_wait_ms=100)
+
+    started = time.monotonic()
+    futures = [processor.batcher.submit(description) for description in ["sốt", "ho"]]
+    for future in futures:
+        future.result(timeout=5)
+
+    assert time.monotonic() - started >= 0.1
+    assert model.batches == [["sốt", "ho"]]
+
+
+def test_answers_map_to_their_own_item():
+    model = FakeModel(reverse=True)
+    processor = make_processor(model, max_items=4)
+
+    results = run_concurrently(processor, ["sốt", "ho", "khó thở", "đau bụng"])
+
+    assert {description: result["trieu_chung"] for description, result in results.items()} == {
+        "sốt": ["sốt"], "ho": ["ho"], "khó thở": ["khó thở"], "đau bụng": ["đau bụng"]
+    }
+    assert model.singles == []
+
+
+def test_item_missing_from_the_answer_gets_a_single_call():
+    model = FakeModel(skip_ids={"p2"})
+    processor = make_processor(model, max_items=3)
+
+    futures = [processor.batcher.submit(description) for description in ["sốt", "ho", "khó thở"]]
+    results = [future.result(timeout=5) for future in futures]
+
+    assert [result["trieu_chung"] for result in results] == [["sốt"], ["ho"], ["khó thở"]]
+    assert model.singles == ["ho"]
+    assert processor.batch_stats()["individual_fallbacks"] == 1
+
+
+def test_failed_batch_falls_back_to_parallel_single_calls():
+    model = FakeModel(batch_error=RuntimeError("backend down"), delay=0.2)
+    processor = make_processor(model, max_items=4)
+
+    started = time.monotonic()
+    results = run_concurrently(processor, ["sốt", "ho", "khó thở", "đau bụng"])
+    elapsed = time.monotonic() - started
+
+    assert sorted(model.singles) == ["ho", "khó thở", "sốt", "đau bụng"]
+    assert all(results[description]["trieu_chung"] == [description] for description in results)
+    # One batch round trip plus one round of parallel single calls, not four in a row
+    assert elapsed < 0.2 * 4
+
+
+def test_caller_past_its_deadline_gets_the_fallback():
+    model = FakeModel(delay=1.0)
+    processor = make_processor(model, max_items=2, max_wait_ms=10, timeout_seconds=0.2)
+
+    started = time.monotonic()
+    result = processor.phan_tich("sốt", fallback=lambda: {"symptoms": ["rule"]})
+
+    assert time.monotonic() - started < 0.8
+    assert result["trieu_chung"] == ["rule"] and result["nguon"] == "rule_based"
+    assert processor.batch_stats()["timed_out"] == 1
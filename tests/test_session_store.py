@@ -0,0 +1,47 @@
+from utils.session_store import SessionStore, deep_sizeof
+
+
+def step_results():
+    return {
+        1: {"success": True, "extracted_symptoms": ["sốt", "ho"], "severity_indicators": ["khó thở"],
+            "raw_text": "x" * 5000},
+        2: {"success": True, "priority_score": 4, "urgency_level": "high", "rule_trace": ["r"] * 500},
+        3: {"success": True, "route_type": "hospital_direct", "route_description": "Chuyển viện",
+            "priority_score": 4, "analysis": {"notes": "y" * 5000}},
+        5: {"success": True, "type": "hospital", "message": "Đã điều phối", "final_status": "dispatched",
+            "hospital": {"id": "HOSP001", "details": "z" * 2000}}
+    }
+
+
+def test_finished_session_keeps_only_summaries_and_the_final_result():
+    store = SessionStore()
+    store.create("s1", {"status": "queued", "patient_data": {"description": "sốt, ho", "image_data": "b" * 10000}})
+    results = step_results()
+    for step, result in results.items():
+        store.set_step("s1", step, result)
+    before = deep_sizeof(store.get("s1"))
+
+    store.update("s1", status="completed", final_result=results[5])
+    session = store.get("s1")
+
+    assert "patient_data" not in session
+    assert session["patient_summary"] == {"description_length": 7, "has_image": True, "has_vital_signs": False}
+    assert store.get_step("s1", 1) == {"success": True, "symptom_count": 2, "indicator_count": 1, "compacted": True}
+    assert store.get_step("s1", 2) == {"success": True, "priority_score": 4, "urgency_level": "high",
+                                       "compacted": True}
+    assert store.get_step("s1", 3) == {"success": True, "route_type": "hospital_direct",
+                                       "route_description": "Chuyển viện", "priority_score": 4, "compacted": True}
+    assert store.get_step("s1", 5) is results[5]
+    assert session["final_result"] is results[5]
+    assert deep_sizeof(store.get("s1")) < before / 4
+
+
+def test_compaction_is_idempotent_and_covers_failed_sessions():
+    store = SessionStore()
+    store.create("s1", {"status": "queued"})
+    store.set_step("s1", 1, step_results()[1])
+
+    store.update("s1", status="error", error="boom")
+    store.update("s1", status="error", error="boom again")
+
+    assert store.get_step("s1", 1) == {"success": True, "symptom_count": 2, "indicator_count": 1, "compacted": True}
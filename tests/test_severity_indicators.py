@@ -0,0 +1,39 @@
+import pytest
+
+from workflow_clean_final import PatientDispatchWorkflow
+
+NORMAL_VITALS = {"heart_rate": 90, "spo2": 97}
+
+
+@pytest.fixture(scope="module")
+def workflow():
+    return PatientDispatchWorkflow()
+
+
+@pytest.mark.parametrize("description", [
+    "đau ngực dữ dội, khó thở",
+    "dau nguc du doi, kho tho",
+    "dau ngucc du doi, kho thoo"
+])
+def test_red_flags_found_with_or_without_diacritics(workflow, description):
+    indicators = workflow.check_severity_indicators({"original_text": description}, NORMAL_VITALS)
+
+    assert indicators == ["Triệu chứng khẩn cấp: khó thở", "Triệu chứng khẩn cấp: đau ngực"]
+
+
+def test_negated_red_flag_is_not_an_indicator(workflow):
+    assert workflow.check_severity_indicators({"original_text": "sốt nhẹ, không khó thở"}, NORMAL_VITALS) == []
+
+
+def test_unaccented_red_flags_route_like_accented(workflow):
+    patients = [{"description": "đau ngực dữ dội, khó thở", "vital_signs": NORMAL_VITALS},
+                {"description": "dau nguc du doi, kho tho", "vital_signs": NORMAL_VITALS}]
+
+    single = [workflow.process_patient_input(patient)["steps"] for patient in patients]
+    batch = [result["steps"] for result in workflow.process_patients_batch(patients)]
+
+    for steps in single + batch:
+        assert steps["step2_triage"]["priority_score"] == 4
+        assert steps["step3_routing"]["route_type"] == "hospital_direct"
+    assert [s["step1_extraction"]["severity_indicators"] for s in single] == \
+        [s["step1_extraction"]["severity_indicators"] for s in batch]
@@ -0,0 +1,157 @@
+import json
+import os
+import random
+import shutil
+import time
+
+import numpy as np
+import pytest
+
+from utils.keyword_matcher import KEYWORD_REGISTRY
+from utils.triage_rules import DEFAULT_TRIAGE_RULES, CompiledRuleset, TriageRules
+
+DESCRIPTIONS = ["sốt nhẹ, ho khan", "Đau ngực dữ dội, vã mồ hôi", "bị ngất tại nhà", "đau bụng", "",
+                "Co giật 5 phút", "mệt mỏi, chán ăn"]
+
+
+def workflow_priority_legacy(symptom_count, vital_signs, indicator_count):
+    """PatientDispatchWorkflow.calculate_priority_score before the rule table"""
+    score = 1
+    score += min(symptom_count // 2, 1)
+    score += min(indicator_count, 2)
+    if vital_signs.get("heart_rate", 0) > 120:
+        score += 1
+    if vital_signs.get("spo2", 100) < 90:
+        score += 2
+    return min(score, 5)
+
+
+def patient_care_emergency_legacy(description, vital_signs):
+    """PatientCareAgent.process_patient emergency check before the rule table"""
+    is_emergency = any(keyword in description.lower() for keyword in KEYWORD_REGISTRY["critical"])
+    if vital_signs:
+        heart_rate = vital_signs.get('nhip_tim', vital_signs.get('heart_rate', 0))
+        spo2 = vital_signs.get('spo2', 100)
+        if heart_rate > 120 or heart_rate < 50 or spo2 < 90:
+            is_emergency = True
+    return is_emergency
+
+
+def triage_manager_priority_legacy(text_priority, image_priority, medical_priority):
+    """TriageManager._calculate_priority before the rule table"""
+    final_priority = text_priority * 0.3 + image_priority * 0.3 + medical_priority * 0.4
+    return min(5, max(1, round(final_priority)))
+
+
+@pytest.fixture(scope="module")
+def rules():
+    return TriageRules(DEFAULT_TRIAGE_RULES, reload_interval=0)
+
+
+@pytest.fixture(scope="module")
+def patients():
+    """Random patients concentrated on the band boundaries, some without vital signs"""
+    rng = random.Random(7)
+    patients = []
+    for _ in range(5000):
+        vital_signs = {}
+        if rng.random() < 0.9:
+            vital_signs["heart_rate"] = rng.choice([0, 45, 49, 50, 51, 80, 100, 119, 120, 121, 150])
+        if rng.random() < 0.9:
+            vital_signs["spo2"] = rng.choice([80, 89, 89.5, 90, 91, 95, 99, 100])
+        patients.append({
+            "symptom_count": rng.randint(0, 5),
+            "indicator_count": rng.randint(0, 4),
+            "vital_signs": vital_signs,
+            "description": rng.choice(DESCRIPTIONS),
+            "sub_priorities": [rng.choice([0, 1, 1.5, 2, 2.5, 3, 4, 5]) for _ in range(3)]
+        })
+    return patients
+
+
+def test_workflow_priority_matches_legacy(rules, patients):
+    ruleset = rules.ruleset("workflow_priority")
+    scalar = [ruleset.evaluate(dict(p["vital_signs"], symptom_count=p["symptom_count"],
+                                    indicator_count=p["indicator_count"])) for p in patients]
+    batch = ruleset.evaluate_batch({
+        "symptom_count": [p["symptom_count"] for p in patients],
+        "indicator_count": [p["indicator_count"] for p in patients],
+        "heart_rate": [p["vital_signs"].get("heart_rate", 0) for p in patients],
+        "spo2": [p["vital_signs"].get("spo2", 100) for p in patients]
+    })
+
+    legacy = [workflow_priority_legacy(p["symptom_count"], p["vital_signs"], p["indicator_count"]) for p in patients]
+    assert [result["score"] for result in scalar] == legacy
+    assert batch["scores"].tolist() == legacy
+    assert [result["fired"] for result in scalar] == [ruleset.fired_ids(row) for row in batch["fired"]]
+
+
+def test_patient_care_emergency_matches_legacy(rules, patients):
+    ruleset = rules.ruleset("patient_care_emergency")
+    texts = [p["description"] for p in patients]
+    scalar = []
+    for p in patients:
+        vital_signs = p["vital_signs"]
+        features = {"heart_rate": vital_signs.get("heart_rate", 0), "spo2": vital_signs.get("spo2", 100)} \
+            if vital_signs else {}
+        scalar.append(ruleset.evaluate(features, text=p["description"]))
+    batch = ruleset.evaluate_batch({
+        "heart_rate": [p["vital_signs"].get("heart_rate", 0) if p["vital_signs"] else np.nan for p in patients],
+        "spo2": [p["vital_signs"].get("spo2", 100) if p["vital_signs"] else np.nan for p in patients]
+    }, texts)
+
+    legacy = [patient_care_emergency_legacy(p["description"], p["vital_signs"]) for p in patients]
+    assert [result["score"] > 0 for result in scalar] == legacy
+    assert (batch["scores"] > 0).tolist() == legacy
+    assert [result["fired"] for result in scalar] == [ruleset.fired_ids(row) for row in batch["fired"]]
+
+
+def test_triage_manager_priority_matches_legacy(rules, patients):
+    ruleset = rules.ruleset("triage_manager_priority")
+    columns = np.array([p["sub_priorities"] for p in patients], dtype=np.float64)
+    scalar = [ruleset.evaluate(dict(zip(["text_priority", "image_priority", "medical_priority"], p["sub_priorities"])))
+              for p in patients]
+    batch = ruleset.evaluate_batch({"text_priority": columns[:, 0], "image_priority": columns[:, 1],
+                                    "medical_priority": columns[:, 2]})
+
+    legacy = [triage_manager_priority_legacy(*p["sub_priorities"]) for p in patients]
+    assert [result["score"] for result in scalar] == legacy
+    assert batch["scores"].tolist() == legacy
+
+
+def test_non_numeric_feature_raises_like_legacy(rules):
+    with pytest.raises(TypeError):
+        rules.evaluate("workflow_priority", {"heart_rate": None})
+
+
+def test_keyword_rules_must_name_a_registry_category():
+    with pytest.raises(ValueError):
+        CompiledRuleset("custom", {"rules": [{"id": "inline", "keywords": ["ngất"]}]})
+
+
+def _rewrite(path, table, at):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(table if isinstance(table, str) else json.dumps(table, ensure_ascii=False))
+    os.utime(path, (at, at))
+
+
+def test_hot_reload_follows_file_and_keeps_rules_on_broken_edit(tmp_path):
+    path = str(tmp_path / "triage_rules.json")
+    shutil.copy(DEFAULT_TRIAGE_RULES, path)
+    rules = TriageRules(path, reload_interval=0.01)
+    features = {"heart_rate": 115}
+    assert rules.evaluate("workflow_priority", features)["score"] == 1
+
+    with open(path, "r", encoding="utf-8") as f:
+        table = json.load(f)
+    table["version"] += 1
+    table["rulesets"]["workflow_priority"]["rules"][3]["value"] = 110
+    _rewrite(path, table, time.time() + 1)
+    time.sleep(0.02)
+    assert rules.evaluate("workflow_priority", features)["score"] == 2
+
+    _rewrite(path, "{ not json", time.time() + 2)
+    time.sleep(0.02)
+    assert rules.evaluate("workflow_priority", features)["score"] == 2
+    stats = rules.stats()
+    assert (stats["version"], stats["reloads"], stats["reload_errors"]) == (2, 1, 1)
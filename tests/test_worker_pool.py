@@ -0,0 +1,29 @@
+import threading
+
+from utils.worker_pool import PriorityWorkerPool
+
+
+def test_cancel_drops_queued_job_only():
+    pool = PriorityWorkerPool(max_workers=1, max_queue=10, name="test-pool")
+    started, release = threading.Event(), threading.Event()
+    ran = []
+    try:
+        running = pool.submit(lambda: started.set() or release.wait())
+        assert started.wait(5)
+        queued = [pool.submit(ran.append, i) for i in range(3)]
+
+        assert pool.cancel(queued[1].job_id)
+        assert not pool.cancel(queued[1].job_id)
+        assert queued[1].future.cancelled()
+        assert pool.queue_position(queued[2].job_id) == 2
+
+        release.set()
+        running.future.result(timeout=5)
+        for ticket in (queued[0], queued[2]):
+            ticket.future.result(timeout=5)
+        assert ran == [0, 2]
+        assert not pool.cancel(running.job_id)
+        assert pool.stats()["cancelled"] == 1
+    finally:
+        release.set()
+        pool.shutdown()
@@ -0,0 +1,345 @@
+import contextlib
+import contextvars
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+# Patient priority (1-5) of the model calls made in the current context
+_call_priority: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("call_priority", default=None)
+
+RETRYABLE_STATUS = {429, 500, 502, 503, 504}
+
+
+@contextlib.contextmanager
+def call_priority(priority: Optional[int]) -> Iterator[None]:
+    """Tag model calls made inside the block with a patient priority."""
+    token = _call_priority.set(priority)
+    try:
+        yield
+    finally:
+        _call_priority.reset(token)
+
+
+def current_call_priority() -> Optional[int]:
+    return _call_priority.get()
+
+
+class RateLimitTimeout(Exception):
+    """Raised when no rate-limit token became available within the call timeout."""
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket whose refill rate adapts to server feedback (AIMD).
+
+    A 429 halves the rate (at most once per decrease_cooldown, so a burst of
+    concurrent 429s counts once) and pauses the bucket for Retry-After; every
+    success raises it by increase_step, up to max_rate.
+    """
+
+    def __init__(self, rate: float = 10, burst: int = 20, min_rate: float = 0.5,
+                 max_rate: Optional[float] = None, increase_step: Optional[float] = None,
+                 decrease_cooldown: float = 1.0):
+        """
+        Initialize the limiter.
+
+        Args:
+            rate: Initial requests per second
+            burst: Bucket capacity
+            min_rate: Floor for the adapted rate
+            max_rate: Ceiling for the adapted rate (defaults to the initial rate)
+            increase_step: Requests per second added per successful call (default max_rate / 20)
+            decrease_cooldown: Minimum seconds between two rate decreases
+        """
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate
+        self.increase_step = increase_step if increase_step is not None else self.max_rate / 20
+        self.decrease_cooldown = decrease_cooldown
+        self._last_decrease = float("-inf")
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """Take one token, waiting up to timeout seconds. Returns False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self._paused_until and self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                delay = max(self._paused_until - now, (1 - self._tokens) / self.rate)
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                delay = min(delay, remaining)
+            time.sleep(delay)
+
+    def try_acquire(self) -> bool:
+        """Take one token only if it is available right now."""
+        return self.acquire(timeout=0)
+
+    def release(self):
+        """Give back a token taken by acquire() for a request that was not sent."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens = min(self.burst, self._tokens + 1)
+
+    def on_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def on_throttled(self, retry_after: Optional[float] = None):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now - self._last_decrease >= self.decrease_cooldown:
+                self.rate = max(self.min_rate, self.rate / 2)
+                self._last_decrease = now
+            self._tokens = 0.0
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+
+class RetryBudget:
+    """
+    Global cap on retries: each original call deposits `ratio` tokens and each
+    retry or hedge withdraws one, so retries stay below ratio * traffic (plus a
+    small reserve) even when the backend is failing hard.
+    """
+
+    def __init__(self, ratio: float = 0.1, reserve: float = 10):
+        self.ratio = ratio
+        self.reserve = reserve
+        self._balance = float(reserve)
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.denied = 0
+
+    def deposit(self):
+        with self._lock:
+            self._balance = min(self._balance + self.ratio, self.reserve + 100 * self.ratio)
+
+    def try_withdraw(self) -> bool:
+        with self._lock:
+            if self._balance >= 1:
+                self._balance -= 1
+                self.retries += 1
+                return True
+            self.denied += 1
+            return False
+
+    @property
+    def balance(self) -> float:
+        return self._balance
+
+
+class LatencyTracker:
+    """Rolling window of successful call latencies."""
+
+    def __init__(self, window: int = 500, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Latency percentile in seconds, or None until min_samples calls were seen."""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class CallPolicy:
+    """
+    Rate limiting, retries and hedging around one HTTP call.
+
+    Attempts are paced by a per-host AdaptiveRateLimiter. Retryable failures
+    (429, 5xx, connection errors, timeouts) are retried with full-jitter
+    exponential backoff while the shared RetryBudget allows it. Calls for
+    patients at hedge_min_priority or above fire a duplicate request once the
+    first has been outstanding for the observed p95 latency; the first good
+    answer wins.
+    """
+
+    def __init__(self, rate: float = 10, burst: int = 20, max_attempts: int = 3,
+                 base_delay: float = 0.1, max_delay: float = 2.0, retry_budget_ratio: float = 0.1,
+                 hedge_min_priority: Optional[int] = 5, hedge_default_delay: float = 0.5):
+        """
+        Initialize the policy.
+
+        Args:
+            rate: Initial requests per second per host
+            burst: Token bucket capacity per host
+            max_attempts: Attempts per call including the first
+            base_delay: Backoff base in seconds
+            max_delay: Backoff cap in seconds
+            retry_budget_ratio: Retries allowed per original call, on average
+            hedge_min_priority: Lowest patient priority that gets hedged requests (None disables hedging)
+            hedge_default_delay: Hedge delay in seconds until enough latencies were observed
+        """
+        self.rate = rate
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.hedge_min_priority = hedge_min_priority
+        self.hedge_default_delay = hedge_default_delay
+
+        self.budget = RetryBudget(ratio=retry_budget_ratio)
+        self.latency = LatencyTracker()
+        self._limiters: Dict[str, AdaptiveRateLimiter] = {}
+        self._lock = threading.Lock()
+        self._hedge_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="hedge")
+        self._counts = {"calls": 0, "throttled": 0, "hedges": 0, "hedge_wins": 0}
+
+    @classmethod
+    def from_env(cls) -> "CallPolicy":
+        hedge_enabled = os.getenv("HEDGE_ENABLED", "true").lower() not in ("0", "false", "no")
+        return cls(
+            rate=float(os.getenv("MODEL_RATE_LIMIT_RPS", "10")),
+            burst=int(os.getenv("MODEL_RATE_LIMIT_BURST", "20")),
+            max_attempts=int(os.getenv("RETRY_MAX_ATTEMPTS", "3")),
+            base_delay=float(os.getenv("RETRY_BASE_DELAY_MS", "100")) / 1000,
+            max_delay=float(os.getenv("RETRY_MAX_DELAY_MS", "2000")) / 1000,
+            retry_budget_ratio=float(os.getenv("RETRY_BUDGET_RATIO", "0.1")),
+            hedge_min_priority=int(os.getenv("HEDGE_MIN_PRIORITY", "5")) if hedge_enabled else None,
+            hedge_default_delay=float(os.getenv("HEDGE_DEFAULT_DELAY_MS", "500")) / 1000
+        )
+
+    def limiter(self, host: str) -> AdaptiveRateLimiter:
+        with self._lock:
+            if host not in self._limiters:
+                self._limiters[host] = AdaptiveRateLimiter(rate=self.rate, burst=self.burst)
+            return self._limiters[host]
+
+    def call(self, attempt: Callable[[float], Any], host: str, timeout: float,
+             priority: Optional[int] = None) -> Any:
+        """
+        Run attempt(timeout) under the policy.
+
+        Args:
+            attempt: Performs one request and returns a response with status_code/headers
+            host: Rate limiting key
+            timeout: Per-attempt timeout in seconds, also the longest wait for a rate-limit token
+            priority: Patient priority; defaults to the priority of the current context
+
+        Returns:
+            The last response (which may still be an error response)
+
+        Raises:
+            RateLimitTimeout: If no token became available in time
+            Exception: The last attempt's exception if every attempt raised
+        """
+        priority = priority if priority is not None else current_call_priority()
+        hedge = self.hedge_min_priority is not None and priority is not None and priority >= self.hedge_min_priority
+        limiter = self.limiter(host)
+        self.budget.deposit()
+        with self._lock:
+            self._counts["calls"] += 1
+
+        for attempt_number in range(1, self.max_attempts + 1):
+            if not limiter.acquire(timeout=timeout):
+                raise RateLimitTimeout(f"No rate limit token for {host} within {timeout}s")
+
+            error, response = None, None
+            try:
+                response = self._hedged(attempt, timeout, limiter) if hedge else self._timed(attempt, timeout)
+            except Exception as e:
+                error = e
+
+            retryable = error is not None or response.status_code in RETRYABLE_STATUS
+            if response is not None and response.status_code == 429:
+                with self._lock:
+                    self._counts["throttled"] += 1
+                limiter.on_throttled(self._retry_after(response))
+            elif not retryable:
+                limiter.on_success()
+
+            if not retryable or attempt_number == self.max_attempts or not self.budget.try_withdraw():
+                if error is not None:
+                    raise error
+                return response
+
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt_number - 1)))
+            logger.warning(f"Retrying call to {host} in {delay:.2f}s "
+                           f"({error or response.status_code}, attempt {attempt_number})")
+            time.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            counts = dict(self._counts)
+            rates = {host: round(limiter.rate, 2) for host, limiter in self._limiters.items()}
+        p95 = self.latency.percentile(0.95)
+        return {
+            **counts,
+            "retries": self.budget.retries,
+            "retries_denied": self.budget.denied,
+            "retry_budget": round(self.budget.balance, 2),
+            "rate_per_host": rates,
+            "p95_latency_ms": round(p95 * 1000, 1) if p95 is not None else None
+        }
+
+    def _timed(self, attempt: Callable[[float], Any], timeout: float) -> Any:
+        started = time.monotonic()
+        response = attempt(timeout)
+        if response.status_code not in RETRYABLE_STATUS:
+            self.latency.record(time.monotonic() - started)
+        return response
+
+    def _hedged(self, attempt: Callable[[float], Any], timeout: float, limiter: AdaptiveRateLimiter) -> Any:
+        """Primary request plus a duplicate after p95; the first good answer wins."""
+        delay = self.latency.percentile(0.95) or self.hedge_default_delay
+        primary = self._hedge_executor.submit(self._timed, attempt, timeout)
+        done, _ = wait([primary], timeout=delay)
+        if done or not limiter.try_acquire():
+            return primary.result()
+        if not self.budget.try_withdraw():
+            # No hedge goes out, so its rate-limit token is not spent
+            limiter.release()
+            return primary.result()
+
+        with self._lock:
+            self._counts["hedges"] += 1
+        hedge = self._hedge_executor.submit(self._timed, attempt, timeout)
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None and future.result().status_code not in RETRYABLE_STATUS:
+                    if future is hedge:
+                        with self._lock:
+                            self._counts["hedge_wins"] += 1
+                    return future.result()
+        # Both failed: report the primary's outcome
+        return primary.result()
+
+    @staticmethod
+    def _retry_after(response: Any) -> Optional[float]:
+        try:
+            return float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            return None
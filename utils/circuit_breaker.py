@@ -0,0 +1,153 @@
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open."""
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker tripping on error rate or slow-call rate.
+
+    Outcomes of the last `window` calls are tracked while closed. Once at least
+    min_calls were seen and the failure rate or slow-call rate reaches its
+    threshold, the circuit opens and calls are rejected for open_seconds. It then
+    half-opens: up to half_open_probes calls go through, and the circuit closes
+    after that many good probes or reopens on the first bad one.
+    """
+
+    def __init__(self, name: str = "circuit", window: int = 20, min_calls: int = 10,
+                 failure_rate_threshold: float = 0.5, slow_call_seconds: float = 10,
+                 slow_call_rate_threshold: float = 0.5, open_seconds: float = 30,
+                 half_open_probes: int = 3):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            name: Name used in logs
+            window: Number of recent calls evaluated
+            min_calls: Calls needed in the window before the circuit can trip
+            failure_rate_threshold: Failure fraction that opens the circuit
+            slow_call_seconds: Calls slower than this count as slow
+            slow_call_rate_threshold: Slow fraction that opens the circuit
+            open_seconds: Seconds the circuit stays open before probing
+            half_open_probes: Probe calls allowed (and needed to close) while half-open
+        """
+        self.logger = logging.getLogger(name)
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.open_seconds = open_seconds
+        self.half_open_probes = half_open_probes
+
+        self._outcomes = deque(maxlen=window)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        self._counts = {"rejected": 0, "opened": 0}
+
+    @classmethod
+    def from_env(cls, name: str) -> "CircuitBreaker":
+        return cls(
+            name=name,
+            window=int(os.getenv("CIRCUIT_WINDOW", "20")),
+            min_calls=int(os.getenv("CIRCUIT_MIN_CALLS", "10")),
+            failure_rate_threshold=float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5")),
+            slow_call_seconds=float(os.getenv("CIRCUIT_SLOW_CALL_SECONDS", "10")),
+            slow_call_rate_threshold=float(os.getenv("CIRCUIT_SLOW_CALL_RATE", "0.5")),
+            open_seconds=float(os.getenv("CIRCUIT_OPEN_SECONDS", "30")),
+            half_open_probes=int(os.getenv("CIRCUIT_HALF_OPEN_PROBES", "3"))
+        )
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._maybe_half_open()
+            return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go to the protected backend now (reserves a probe slot when half-open)."""
+        with self._lock:
+            self._maybe_half_open()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self._counts["rejected"] += 1
+            return False
+
+    def release(self):
+        """Give back an allowed call that never reached the backend (frees its half-open probe slot)."""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+
+    def record(self, success: bool, elapsed: float):
+        """Record the outcome of an allowed call."""
+        slow = elapsed > self.slow_call_seconds
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if not success or slow:
+                    self._open(f"probe {'failed' if not success else 'slow'}")
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.half_open_probes:
+                    self._state = CLOSED
+                    self._outcomes.clear()
+                    self.logger.info(f"Circuit {self.name} closed")
+                return
+            if self._state == OPEN:
+                return
+
+            self._outcomes.append((success, slow))
+            calls = len(self._outcomes)
+            if calls < self.min_calls:
+                return
+            failure_rate = sum(1 for ok, _ in self._outcomes if not ok) / calls
+            slow_rate = sum(1 for _, is_slow in self._outcomes if is_slow) / calls
+            if failure_rate >= self.failure_rate_threshold:
+                self._open(f"failure rate {failure_rate:.0%}")
+            elif slow_rate >= self.slow_call_rate_threshold:
+                self._open(f"slow call rate {slow_rate:.0%}")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            self._maybe_half_open()
+            calls = len(self._outcomes)
+            return {
+                "state": self._state,
+                "window_calls": calls,
+                "failure_rate": round(sum(1 for ok, _ in self._outcomes if not ok) / calls, 3) if calls else 0.0,
+                "slow_call_rate": round(sum(1 for _, slow in self._outcomes if slow) / calls, 3) if calls else 0.0,
+                **self._counts
+            }
+
+    def _open(self, reason: str):
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+        self._counts["opened"] += 1
+        self.logger.warning(f"Circuit {self.name} opened: {reason}")
+
+    def _maybe_half_open(self):
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+            self._probe_successes = 0
+            self.logger.info(f"Circuit {self.name} half-open, probing")
@@ -0,0 +1,122 @@
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from utils.call_policy import CallPolicy
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_GEMINI_BASE_URL = "https://generativelanguage.googleapis.com"
+
+
+def gemini_base_url() -> str:
+    """Base URL of the Gemini API; point GEMINI_API_BASE_URL at a local stub server for tests."""
+    return os.getenv("GEMINI_API_BASE_URL", DEFAULT_GEMINI_BASE_URL).rstrip("/")
+
+
+class HttpTransport:
+    """
+    Shared HTTP transport with keep-alive connection pooling.
+
+    One requests.Session is reused for all calls, so TLS handshakes are paid once
+    per pooled connection instead of once per request. At most max_per_host
+    connections are opened to a single host; further calls wait for a free
+    connection. Async methods run the same pooled calls on a private thread pool.
+    An optional CallPolicy adds rate limiting, retries and hedging to every call.
+    """
+
+    def __init__(self, max_per_host: int = 10, max_hosts: int = 10, timeout: float = 30,
+                 policy: Optional[CallPolicy] = None):
+        """
+        Initialize the transport.
+
+        Args:
+            max_per_host: Maximum concurrent connections to one host
+            max_hosts: Number of per-host connection pools kept
+            timeout: Default request timeout in seconds
+            policy: Rate limit / retry / hedging policy (None sends every call once)
+        """
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+        self.policy = policy
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_hosts, pool_maxsize=max_per_host, pool_block=True)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_per_host * max_hosts, thread_name_prefix="http-transport"
+        )
+
+    @classmethod
+    def from_env(cls) -> "HttpTransport":
+        """Transport configured by HTTP_* variables, with the CallPolicy from its own variables."""
+        return cls(
+            max_per_host=int(os.getenv("HTTP_MAX_CONNECTIONS_PER_HOST", "10")),
+            timeout=float(os.getenv("HTTP_TIMEOUT_SECONDS", "30")),
+            policy=CallPolicy.from_env()
+        )
+
+    def post_json(self, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None,
+                  timeout: Optional[float] = None, priority: Optional[int] = None) -> requests.Response:
+        """
+        POST a JSON payload over a pooled connection.
+
+        Args:
+            url: Full request URL
+            payload: JSON-serializable body
+            headers: Extra request headers
+            timeout: Per-attempt timeout in seconds (defaults to the transport timeout)
+            priority: Patient priority for hedging (defaults to the current call_priority)
+
+        Returns:
+            The requests.Response of the last attempt
+        """
+        timeout = timeout if timeout is not None else self.timeout
+
+        def attempt(attempt_timeout):
+            return self.session.post(url, json=payload, headers=headers, timeout=attempt_timeout)
+
+        if self.policy is None:
+            return attempt(timeout)
+        return self.policy.call(attempt, urlsplit(url).netloc, timeout, priority)
+
+    async def apost_json(self, url: str, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None,
+                         timeout: Optional[float] = None, priority: Optional[int] = None) -> requests.Response:
+        """Async version of post_json; the call itself uses the same connection pool."""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self._executor, context.run, functools.partial(self.post_json, url, payload, headers, timeout, priority)
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Call policy counters (empty without a policy)."""
+        return self.policy.stats() if self.policy is not None else {}
+
+    def close(self):
+        """Close pooled connections and the async thread pool."""
+        self._executor.shutdown(wait=False)
+        self.session.close()
+
+
+_shared_transport: Optional[HttpTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Process-wide transport shared by GeminiClient, ImageProcessor and ImageAnalyzer."""
+    global _shared_transport
+    with _shared_lock:
+        if _shared_transport is None:
+            _shared_transport = HttpTransport.from_env()
+        return _shared_transport
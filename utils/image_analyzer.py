@@ -5,6 +5,8 @@ import json
 from typing import Dict, Any, Optional
 import logging
 
+from utils.http_transport import HttpTransport, gemini_base_url, get_transport
+
 logger = logging.getLogger(__name__)
 
 class ImageAnalyzer:
@@ -12,18 +14,23 @@ class ImageAnalyzer:
     Image analyzer using Google Gemini Flash 2.0 API for medical image analysis
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, transport: Optional[HttpTransport] = None,
+                 timeout: float = 20):
         """
         Initialize the image analyzer
         
         Args:
             api_key: Google AI API key. If not provided, will try to get from environment
+            transport: HTTP transport; defaults to the shared pooled transport
+            timeout: Per-attempt timeout in seconds (retries may add attempts)
         """
         self.api_key = api_key or os.getenv('GOOGLE_AI_API_KEY')
         if not self.api_key:
             logger.warning("No Google AI API key provided. Image analysis will be disabled.")
         
-        self.base_url = "https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-exp:generateContent"
+        self.transport = transport or get_transport()
+        self.timeout = timeout
+        self.base_url = f"{gemini_base_url()}/v1beta/models/gemini-2.0-flash-exp:generateContent"
     
     def analyze_medical_image(self, image_data: bytes, mime_type: str = "image/jpeg") -> Dict[str, Any]:
         """
@@ -77,7 +84,7 @@ class ImageAnalyzer:
             }
             
             url = f"{self.base_url}?key={self.api_key}"
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
+            response = self.transport.post_json(url, payload, headers=headers, timeout=self.timeout)
             
             if response.status_code == 200:
                 result = response.json()
@@ -0,0 +1,148 @@
+from collections import deque
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+# Shared keyword registry: category -> keywords (lowercase, substring semantics)
+KEYWORD_REGISTRY: Dict[str, List[str]] = {
+    # Red flags used for severity indicators and the local triage tier
+    "emergency": ["khó thở", "đau ngực", "choáng váng", "bất tỉnh", "co giật"],
+    # Phrases that make PatientCareAgent route straight to emergency
+    "critical": ["ngất", "hôn mê", "co giật", "khó thở nặng", "đau ngực dữ dội",
+                 "chảy máu nhiều", "sốc", "đột quỵ", "nhồi máu"],
+    # Specialty hints, checked in this order by determine_required_specialty
+    "cardiology": ["tim", "ngực", "huyết áp"],
+    "respiratory": ["phổi", "ho", "khó thở"],
+    "digestive": ["dạ dày", "bụng", "tiêu hóa"]
+}
+
+
+class KeywordMatcher:
+    """
+    Multi-category keyword matcher with `keyword in text` semantics.
+
+    All keywords are compiled into one Aho-Corasick automaton, which finds every
+    keyword of every category (overlapping ones included) in a single pass over
+    the text. CPython's substring search is implemented in C, so for a handful of
+    keywords separate `in` scans are still faster than stepping the automaton in
+    Python; lookups use the scans below automaton_min_keywords keywords and the
+    automaton from there on (crossover around 100 keywords, see
+    benchmarks/bench_keyword_matcher.py).
+    """
+
+    def __init__(self, categories: Dict[str, Iterable[str]], automaton_min_keywords: int = 100):
+        """
+        Build the automaton.
+
+        Args:
+            categories: Category name -> keywords; a keyword may appear in several categories
+            automaton_min_keywords: Distinct keyword count from which lookups scan with the automaton
+        """
+        self.categories: Dict[str, List[str]] = {name: list(keywords) for name, keywords in categories.items()}
+        self.automaton_min_keywords = automaton_min_keywords
+        self._keyword_categories: Dict[str, Tuple[str, ...]] = {}
+        for name, keywords in self.categories.items():
+            for keyword in keywords:
+                if keyword and name not in self._keyword_categories.get(keyword, ()):
+                    self._keyword_categories[keyword] = self._keyword_categories.get(keyword, ()) + (name,)
+        self._transitions, self._outputs = self._build_automaton(self._keyword_categories)
+        self._use_automaton = len(self._keyword_categories) >= automaton_min_keywords
+
+    @staticmethod
+    def _build_automaton(keywords: Iterable[str]) -> Tuple[List[Dict[str, int]], List[FrozenSet[str]]]:
+        # Trie of all keywords
+        goto: List[Dict[str, int]] = [{}]
+        outputs: List[set] = [set()]
+        for keyword in keywords:
+            state = 0
+            for char in keyword:
+                if char not in goto[state]:
+                    goto.append({})
+                    outputs.append(set())
+                    goto[state][char] = len(goto) - 1
+                state = goto[state][char]
+            outputs[state].add(keyword)
+
+        # Failure links breadth-first, folded into complete transition tables so
+        # the scan takes exactly one dictionary lookup per character
+        fail = [0] * len(goto)
+        transitions: List[Dict[str, int]] = [dict(goto[0])] + [{} for _ in range(len(goto) - 1)]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            transitions[state] = dict(transitions[fail[state]])
+            transitions[state].update(goto[state])
+            outputs[state] |= outputs[fail[state]]
+            for char, child in goto[state].items():
+                fail[child] = transitions[fail[state]].get(char, 0)
+                queue.append(child)
+        return transitions, [frozenset(output) for output in outputs]
+
+    def find_all(self, text: str) -> List[Tuple[int, str, Tuple[str, ...]]]:
+        """
+        Every keyword occurrence in one automaton pass.
+
+        Returns:
+            (end index, keyword, categories) per occurrence, in text order
+        """
+        transitions = self._transitions
+        outputs = self._outputs
+        hits = []
+        state = 0
+        for index, char in enumerate(text):
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                hits.extend((index + 1, keyword, self._keyword_categories[keyword])
+                            for keyword in outputs[state])
+        return hits
+
+    def keywords_in(self, text: str) -> FrozenSet[str]:
+        """Distinct keywords occurring in text (automaton pass)."""
+        transitions = self._transitions
+        outputs = self._outputs
+        found = set()
+        state = 0
+        for char in text:
+            state = transitions[state].get(char, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return frozenset(found)
+
+    def match(self, text: str, categories: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """
+        Keywords of each category occurring in text.
+
+        Args:
+            text: Text to search (callers lowercase it, as the registry is lowercase)
+            categories: Categories to report (default: all)
+
+        Returns:
+            Category -> hits, in registry order within each category
+        """
+        names = list(self.categories) if categories is None else list(categories)
+        if self._use_automaton:
+            found = self.keywords_in(text)
+            return {name: [keyword for keyword in self.categories[name] if keyword in found] for name in names}
+        return {name: [keyword for keyword in self.categories[name] if keyword in text] for name in names}
+
+    def first_category(self, text: str, categories: Iterable[str]) -> Optional[str]:
+        """First of categories with at least one keyword in text, or None."""
+        if self._use_automaton:
+            found = self.keywords_in(text)
+            return next((name for name in categories if not found.isdisjoint(self.categories[name])), None)
+        # Stops at the first hit, like the any(...) chains it replaces
+        return next((name for name in categories
+                     if any(keyword in text for keyword in self.categories[name])), None)
+
+    def contains_any(self, text: str, category: str) -> bool:
+        """Whether any keyword of category occurs in text."""
+        return self.first_category(text, [category]) is not None
+
+
+_shared_matcher: Optional[KeywordMatcher] = None
+
+
+def get_keyword_matcher() -> KeywordMatcher:
+    """Matcher over KEYWORD_REGISTRY shared by the workflow, the triage cascade and the agents."""
+    global _shared_matcher
+    if _shared_matcher is None:
+        _shared_matcher = KeywordMatcher(KEYWORD_REGISTRY)
+    return _shared_matcher
@@ -0,0 +1,168 @@
+import contextlib
+import contextvars
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional
+
+# Per-workflow log receiving the model calls made in the current context
+_active_log: contextvars.ContextVar[Optional["LLMCallLog"]] = contextvars.ContextVar("llm_call_log", default=None)
+
+
+class LLMCallLog:
+    """Model calls made while processing one workflow."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: List[Dict[str, Any]] = []
+
+    def add(self, call: Dict[str, Any]):
+        with self._lock:
+            self._calls.append(call)
+
+    def calls(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._calls)
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals, per-call-site latency and the individual calls."""
+        calls = self.calls()
+        by_call_site: Dict[str, Dict[str, Any]] = {}
+        for call in calls:
+            site = by_call_site.setdefault(call["call_site"], {"count": 0, "latency_ms": 0.0})
+            site["count"] += 1
+            site["latency_ms"] = round(site["latency_ms"] + call["latency_ms"], 3)
+        return {
+            "count": len(calls),
+            "total_latency_ms": round(sum(call["latency_ms"] for call in calls), 3),
+            "cache_hits": sum(1 for call in calls if call["cache_hit"]),
+            "errors": sum(1 for call in calls if call["error"]),
+            "prompt_chars": sum(call["prompt_chars"] for call in calls),
+            "response_chars": sum(call["response_chars"] for call in calls),
+            "by_call_site": by_call_site,
+            "calls": calls
+        }
+
+
+@contextlib.contextmanager
+def collect_llm_calls(log: Optional[LLMCallLog] = None) -> Iterator[LLMCallLog]:
+    """Also record model calls made inside the block (and in contexts copied from it) into log."""
+    log = log if log is not None else LLMCallLog()
+    token = _active_log.set(log)
+    try:
+        yield log
+    finally:
+        _active_log.reset(token)
+
+
+def current_llm_call_log() -> Optional[LLMCallLog]:
+    return _active_log.get()
+
+
+class _CallSiteStats:
+    __slots__ = ("count", "errors", "cache_hits", "latency_ms", "max_latency_ms",
+                 "prompt_chars", "response_chars", "recent")
+
+    def __init__(self, sample_size: int):
+        self.count = 0
+        self.errors = 0
+        self.cache_hits = 0
+        self.latency_ms = 0.0
+        self.max_latency_ms = 0.0
+        self.prompt_chars = 0
+        self.response_chars = 0
+        self.recent = deque(maxlen=sample_size)
+
+
+class LLMMetrics:
+    """
+    In-process registry of model call metrics, aggregated per call site.
+
+    Every record counts calls, errors, cache hits, prompt/response sizes and
+    latency; p50/p95 are computed over the last sample_size latencies of each
+    call site. Records are also appended to the LLMCallLog active in the
+    caller's context (see collect_llm_calls).
+    """
+
+    def __init__(self, sample_size: int = 1024):
+        self.sample_size = sample_size
+        self._lock = threading.Lock()
+        self._sites: Dict[str, _CallSiteStats] = {}
+
+    def record(self, call_site: str, prompt_chars: int, response_chars: int, latency_seconds: float,
+               cache_hit: bool = False, error: bool = False, source: Optional[str] = None):
+        """
+        Record one model call.
+
+        Args:
+            call_site: Caller name, e.g. "text_processing"
+            prompt_chars: Prompt length in characters
+            response_chars: Serialized response length in characters
+            latency_seconds: Wall time of the call, including cache lookup and fallback
+            cache_hit: Whether the response came from the response cache
+            error: Whether the backend failed or was skipped (fallback or sample answer)
+            source: Source tag of the response ("model", "rule_based" or "sample")
+        """
+        latency_ms = latency_seconds * 1000
+        with self._lock:
+            site = self._sites.get(call_site)
+            if site is None:
+                site = self._sites[call_site] = _CallSiteStats(self.sample_size)
+            site.count += 1
+            site.errors += error
+            site.cache_hits += cache_hit
+            site.latency_ms += latency_ms
+            site.max_latency_ms = max(site.max_latency_ms, latency_ms)
+            site.prompt_chars += prompt_chars
+            site.response_chars += response_chars
+            site.recent.append(latency_ms)
+
+        log = _active_log.get()
+        if log is not None:
+            log.add({
+                "call_site": call_site,
+                "latency_ms": round(latency_ms, 3),
+                "prompt_chars": prompt_chars,
+                "response_chars": response_chars,
+                "cache_hit": cache_hit,
+                "error": error,
+                "source": source
+            })
+
+    def stats(self) -> Dict[str, Any]:
+        """Aggregates per call site, slowest total latency first."""
+        with self._lock:
+            snapshot = {name: (site.count, site.errors, site.cache_hits, site.latency_ms, site.max_latency_ms,
+                               site.prompt_chars, site.response_chars, sorted(site.recent))
+                        for name, site in self._sites.items()}
+        sites = {}
+        for name, (count, errors, cache_hits, latency_ms, max_latency_ms,
+                   prompt_chars, response_chars, recent) in snapshot.items():
+            sites[name] = {
+                "count": count,
+                "errors": errors,
+                "cache_hits": cache_hits,
+                "total_latency_ms": round(latency_ms, 3),
+                "avg_latency_ms": round(latency_ms / count, 3),
+                "p50_latency_ms": round(recent[len(recent) // 2], 3),
+                "p95_latency_ms": round(recent[min(len(recent) - 1, int(len(recent) * 0.95))], 3),
+                "max_latency_ms": round(max_latency_ms, 3),
+                "avg_prompt_chars": round(prompt_chars / count, 1),
+                "avg_response_chars": round(response_chars / count, 1)
+            }
+        return {
+            "total_calls": sum(site["count"] for site in sites.values()),
+            "total_latency_ms": round(sum(site["total_latency_ms"] for site in sites.values()), 3),
+            "call_sites": dict(sorted(sites.items(), key=lambda item: -item[1]["total_latency_ms"]))
+        }
+
+    def reset(self):
+        with self._lock:
+            self._sites.clear()
+
+
+_shared_metrics = LLMMetrics()
+
+
+def get_metrics() -> LLMMetrics:
+    """Process-wide registry used by GeminiClient."""
+    return _shared_metrics
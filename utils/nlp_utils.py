@@ -1,6 +1,52 @@
 import re
 import logging
 
+# Compiled once at import: abbreviations go through one alternation, entities through one named-group pattern
+ABBREVIATIONS = {
+    "dr.": "doctor",
+    "hr": "heart rate",
+    "bp": "blood pressure",
+    "temp": "temperature",
+    "meds": "medications",
+    "med": "medication"
+}
+# "dr." is matched literally and must not be followed by a word character
+_ABBREVIATION_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(re.escape(abbr) for abbr in sorted(ABBREVIATIONS, key=len, reverse=True)) + r')(?!\w)'
+)
+_WHITESPACE_PATTERN = re.compile(r'\s+')
+
+SYMPTOM_PATTERNS = [
+    (r'\b(?:head ?aches?|migraine)\b', 'headache'),
+    (r'\bfever\b', 'fever'),
+    (r'\bcough(?:ing)?\b', 'cough'),
+    (r'\b(?:short|difficulty) of breath\b', 'shortness of breath'),
+    (r'\bchest pain\b', 'chest pain'),
+    (r'\bnause(?:a|ated)\b', 'nausea'),
+    (r'\bvomit(?:ing)?\b', 'vomiting'),
+    (r'\bdizziness\b', 'dizziness')
+]
+# Every symptom pattern starts with \b; that boundary and a guard on the letters the patterns
+# can start with are checked once per position instead of once per branch
+# (keep the letters in sync with SYMPTOM_PATTERNS)
+_SYMPTOM_FIRST_LETTERS = "cdfhmnsv"
+_SYMPTOM_PATTERN = re.compile(
+    rf'\b(?=[{_SYMPTOM_FIRST_LETTERS}])(?:'
+    + '|'.join(f'(?P<s{index}>{pattern[2:]})' for index, (pattern, _) in enumerate(SYMPTOM_PATTERNS))
+    + ')',
+    re.IGNORECASE
+)
+_SYMPTOM_BY_GROUP = {f's{index}': entity for index, (_, entity) in enumerate(SYMPTOM_PATTERNS)}
+_SYMPTOM_ORDER = {entity: index for index, (_, entity) in enumerate(SYMPTOM_PATTERNS)}
+
+# Joins texts for batch processing; never matched by the patterns above
+_BATCH_SEPARATOR = "\x00"
+
+
+def _expand_abbreviation(match):
+    return ABBREVIATIONS[match.group(0)]
+
+
 def preprocess_text(text):
     """
     Preprocess text for NLP analysis
@@ -13,28 +59,32 @@ def preprocess_text(text):
     """
     if not text:
         return ""
-        
-    # Convert to lowercase
-    text = text.lower()
-    
-    # Replace common medical abbreviations
-    abbreviations = {
-        "dr.": "doctor",
-        "hr": "heart rate",
-        "bp": "blood pressure",
-        "temp": "temperature",
-        "meds": "medications",
-        "med": "medication"
-    }
     
-    for abbr, full in abbreviations.items():
-        pattern = r'\b' + abbr + r'\b'
-        text = re.sub(pattern, full, text)
+    # Lowercase, expand common medical abbreviations, clean up extra whitespace
+    text = _ABBREVIATION_PATTERN.sub(_expand_abbreviation, text.lower())
+    return _WHITESPACE_PATTERN.sub(' ', text).strip()
+
+def preprocess_text_batch(texts):
+    """
+    Preprocess many texts at once (same results as preprocess_text per text)
     
-    # Clean up extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
+    The texts are joined and each regex runs once over the joined string.
     
-    return text
+    Args:
+        texts: Iterable of raw texts
+        
+    Returns:
+        List of preprocessed texts, in input order
+    """
+    texts = [text or "" for text in texts]
+    if not texts:
+        return []
+    if any(_BATCH_SEPARATOR in text for text in texts):
+        return [preprocess_text(text) for text in texts]
+    
+    joined = _ABBREVIATION_PATTERN.sub(_expand_abbreviation, _BATCH_SEPARATOR.join(texts).lower())
+    joined = _WHITESPACE_PATTERN.sub(' ', joined)
+    return [text.strip() for text in joined.split(_BATCH_SEPARATOR)]
 
 def extract_medical_entities(text):
     """
@@ -55,24 +105,40 @@ def extract_medical_entities(text):
         "conditions": []
     }
     
-    # Simple pattern matching for common symptoms
-    symptom_patterns = [
-        (r'\b(head ?aches?|migraine)\b', 'headache'),
-        (r'\bfever\b', 'fever'),
-        (r'\bcough(ing)?\b', 'cough'),
-        (r'\b(short|difficulty) of breath\b', 'shortness of breath'),
-        (r'\bchest pain\b', 'chest pain'),
-        (r'\bnause(a|ated)\b', 'nausea'),
-        (r'\bvomit(ing)?\b', 'vomiting'),
-        (r'\bdizziness\b', 'dizziness')
-    ]
-    
-    for pattern, entity in symptom_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
-            entities["symptoms"].append(entity)
+    # One pass with the combined pattern; symptoms keep the order of SYMPTOM_PATTERNS
+    found = {_SYMPTOM_BY_GROUP[match.lastgroup] for match in _SYMPTOM_PATTERN.finditer(text)}
+    entities["symptoms"] = sorted(found, key=_SYMPTOM_ORDER.get)
     
     return entities
 
+def extract_medical_entities_batch(texts):
+    """
+    Extract medical entities from many texts with one pass of the combined pattern
+    
+    Args:
+        texts: Iterable of preprocessed texts
+        
+    Returns:
+        List of entity dictionaries, in input order
+    """
+    texts = list(texts)
+    if any(_BATCH_SEPARATOR in text for text in texts):
+        return [extract_medical_entities(text) for text in texts]
+    
+    found = [set() for _ in texts]
+    index = 0
+    next_start = len(texts[0]) + 1 if texts else 0
+    for match in _SYMPTOM_PATTERN.finditer(_BATCH_SEPARATOR.join(texts)):
+        while match.start() >= next_start:
+            index += 1
+            next_start += len(texts[index]) + 1
+        found[index].add(_SYMPTOM_BY_GROUP[match.lastgroup])
+    
+    return [
+        {"symptoms": sorted(symptoms, key=_SYMPTOM_ORDER.get), "medications": [], "conditions": []}
+        for symptoms in found
+    ]
+
 def calculate_similarity(text1, text2):
     """
     Calculate similarity between two texts
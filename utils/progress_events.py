@@ -0,0 +1,119 @@
+import json
+from typing import Any, Dict, Optional
+
+# Small fields sent inline for each step; everything else is in the delta or fetched by URL
+STEP_SUMMARY_FIELDS = {
+    1: ("success",),
+    2: ("success", "priority_score", "urgency_level"),
+    3: ("success", "route_type", "route_description", "priority_score"),
+    4: ("success", "type", "message"),
+    5: ("success", "type", "message", "final_status")
+}
+MAX_SUMMARY_TEXT = 200
+
+_MISSING = object()
+
+
+def summarize_step(step: int, result: Dict[str, Any]) -> Dict[str, Any]:
+    """Small scalar fields of a step result."""
+    summary = {}
+    for field in STEP_SUMMARY_FIELDS.get(step, ("success",)):
+        if field in result:
+            value = result[field]
+            if isinstance(value, str) and len(value) > MAX_SUMMARY_TEXT:
+                value = value[:MAX_SUMMARY_TEXT] + "…"
+            summary[field] = value
+    if step == 1:
+        summary["symptom_count"] = len(result.get("extracted_symptoms", []))
+        summary["indicator_count"] = len(result.get("severity_indicators", []))
+    return summary
+
+
+def _encoded_size(payload: Dict[str, Any]) -> int:
+    return len(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"))
+
+
+class CompactProgressEncoder:
+    """
+    Builds compact Socket.IO progress events for one workflow session.
+
+    Each completed-step event carries a summary of the step, a delta with the
+    top-level result fields the client has not been sent yet, and a URL for the
+    full payload. Events larger than max_event_bytes drop the delta values and
+    list only the changed keys.
+    """
+
+    def __init__(self, session_id: str, max_event_bytes: int = 4096,
+                 result_url_template: str = "/api/sessions/{session_id}/steps/{step}"):
+        self.session_id = session_id
+        self.max_event_bytes = max_event_bytes
+        self.result_url_template = result_url_template
+        self._sent: Dict[str, Any] = {}
+
+    def result_url(self, step: int) -> str:
+        return self.result_url_template.format(session_id=self.session_id, step=step)
+
+    def step_event(self, step: int, step_name: str, message: str, result: Dict[str, Any],
+                   elapsed_ms: Optional[float] = None) -> Dict[str, Any]:
+        """Compact 'completed' workflow_progress event for one step."""
+        summary = self.summarize(step, result)
+        event = {
+            "session_id": self.session_id,
+            "step": step,
+            "step_name": step_name,
+            "status": "completed",
+            "message": message,
+            "summary": summary,
+            "delta": self._delta(result, summary),
+            "result_url": self.result_url(step)
+        }
+        if elapsed_ms is not None:
+            event["elapsed_ms"] = round(elapsed_ms, 3)
+
+        event = self._cap(event)
+        # Only what actually went on the wire counts as sent
+        self._sent.update(event.get("summary", {}))
+        self._sent.update(event.get("delta", {}))
+        return event
+
+    def complete_event(self, final_step: int, final_result: Dict[str, Any],
+                       completion_time: str) -> Dict[str, Any]:
+        """workflow_complete event: final summary and a URL instead of the full result."""
+        return self._cap({
+            "session_id": self.session_id,
+            "summary": self.summarize(final_step, final_result),
+            "result_url": self.result_url(final_step),
+            "completion_time": completion_time
+        })
+
+    def summarize(self, step: int, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Small scalar fields of a step result."""
+        return summarize_step(step, result)
+
+    def _delta(self, result: Dict[str, Any], summary: Dict[str, Any]) -> Dict[str, Any]:
+        """Top-level fields not in the summary whose value differs from what was already sent."""
+        delta = {}
+        for key, value in result.items():
+            previous = summary.get(key, self._sent.get(key, _MISSING))
+            if previous is _MISSING or (previous is not value and previous != value):
+                delta[key] = value
+        return delta
+
+    def _cap(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """Enforce the per-event size cap."""
+        if _encoded_size(event) <= self.max_event_bytes:
+            return event
+
+        if "delta" in event:
+            event["delta_keys"] = list(event.pop("delta"))
+            event["truncated"] = True
+            if _encoded_size(event) <= self.max_event_bytes:
+                return event
+            event.pop("delta_keys")
+
+        # Still too large: keep only identifiers, status and the URL
+        event["truncated"] = True
+        event["summary"] = {}
+        if isinstance(event.get("message"), str):
+            event["message"] = event["message"][:MAX_SUMMARY_TEXT]
+        return event
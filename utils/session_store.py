@@ -0,0 +1,230 @@
+import logging
+import math
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from utils.progress_events import summarize_step
+
+# Session states after which a session is compacted
+FINISHED_STATUSES = ("completed", "error")
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """Approximate memory footprint of a nested dict/list structure in bytes."""
+    seen = seen if seen is not None else set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in obj)
+    return size
+
+
+class SessionStore:
+    """
+    Thread-safe workflow session store with TTL and LRU eviction.
+
+    Sessions expire ttl_seconds after they were last read or updated. When more than
+    max_entries sessions are stored, the least recently used ones are evicted.
+    Finished sessions are compacted: the raw patient input (which may include a
+    base64 image) is replaced by a small summary, and step results other than the
+    final result shrink to the summary fields sent in progress events.
+    """
+
+    def __init__(self, ttl_seconds: float = 3600, max_entries: int = 1000):
+        """
+        Initialize the session store.
+
+        Args:
+            ttl_seconds: Seconds after the last access before a session expires
+            max_entries: Maximum number of sessions kept
+        """
+        self.logger = logging.getLogger("SessionStore")
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self._sessions: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._touched: Dict[str, float] = {}
+        self._versions: Dict[str, int] = {}
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._evicted_ttl = 0
+        self._evicted_lru = 0
+
+    def create(self, session_id: str, data: Dict[str, Any]):
+        """Store a new session."""
+        with self._lock:
+            self._sessions[session_id] = dict(data)
+            self._touch(session_id)
+            self._bump(session_id)
+            self._evict()
+
+    def get(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Shallow copy of a session, or None if it does not exist or has expired."""
+        with self._lock:
+            session = self._live(session_id)
+            if session is None:
+                return None
+            self._touch(session_id)
+            return dict(session)
+
+    def update(self, session_id: str, **fields) -> bool:
+        """
+        Update fields of a session. Sessions moving to a finished status are compacted.
+
+        Returns:
+            False if the session no longer exists (expired or evicted)
+        """
+        with self._lock:
+            session = self._live(session_id)
+            if session is None:
+                return False
+            session.update(fields)
+            if fields.get("status") in FINISHED_STATUSES:
+                self._compact(session)
+            self._touch(session_id)
+            self._bump(session_id)
+            return True
+
+    def set_step(self, session_id: str, step: int, result: Dict[str, Any]) -> bool:
+        """Record the full result of one workflow step."""
+        with self._lock:
+            session = self._live(session_id)
+            if session is None:
+                return False
+            session.setdefault("steps", {})[step] = result
+            self._touch(session_id)
+            self._bump(session_id)
+            return True
+
+    def get_step(self, session_id: str, step: int) -> Optional[Dict[str, Any]]:
+        """Full result of one workflow step, or None."""
+        with self._lock:
+            session = self._live(session_id)
+            return (session or {}).get("steps", {}).get(step)
+
+    def get_versioned(self, session_id: str) -> Tuple[Optional[Dict[str, Any]], int]:
+        """Shallow copy of a session together with its version (0 if it does not exist)."""
+        with self._lock:
+            session = self.get(session_id)
+            return session, self._versions.get(session_id, 0) if session is not None else 0
+
+    def wait_for_change(self, session_id: str, version: int,
+                        timeout: float) -> Tuple[Optional[Dict[str, Any]], int]:
+        """
+        Block until the session's version differs from version, or timeout expires.
+
+        Args:
+            session_id: Session to watch
+            version: Version the caller already has
+            timeout: Maximum seconds to wait
+
+        Returns:
+            (session copy or None, current version)
+        """
+        # NaN or infinite timeouts would never expire
+        deadline = time.monotonic() + (timeout if math.isfinite(timeout) else 0.0)
+        with self._lock:
+            while self._versions.get(session_id, 0) == version and session_id in self._sessions:
+                remaining = deadline - time.monotonic()
+                if not remaining > 0:
+                    break
+                self._changed.wait(remaining)
+            return self.get_versioned(session_id)
+
+    def delete(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+            self._touched.pop(session_id, None)
+            self._versions.pop(session_id, None)
+            self._changed.notify_all()
+
+    def __contains__(self, session_id: str) -> bool:
+        with self._lock:
+            return self._live(session_id) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts, eviction counters and approximate memory usage."""
+        with self._lock:
+            self._evict()
+            statuses: Dict[str, int] = {}
+            for session in self._sessions.values():
+                status = session.get("status", "unknown")
+                statuses[status] = statuses.get(status, 0) + 1
+            return {
+                "entries": len(self._sessions),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "by_status": statuses,
+                "evicted_ttl": self._evicted_ttl,
+                "evicted_lru": self._evicted_lru,
+                "approx_bytes": deep_sizeof(self._sessions)
+            }
+
+    def _touch(self, session_id: str):
+        self._touched[session_id] = time.monotonic()
+        self._sessions.move_to_end(session_id)
+
+    def _bump(self, session_id: str):
+        """Mark a session as changed and wake up long-polling readers."""
+        self._versions[session_id] = self._versions.get(session_id, 0) + 1
+        self._changed.notify_all()
+
+    def _live(self, session_id: str) -> Optional[Dict[str, Any]]:
+        """Session if present and not expired; expired sessions are dropped."""
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if time.monotonic() - self._touched[session_id] > self.ttl_seconds:
+            self.delete(session_id)
+            self._evicted_ttl += 1
+            return None
+        return session
+
+    def _evict(self):
+        """Drop expired sessions, then least recently used ones above max_entries."""
+        now = time.monotonic()
+        # Touch order is kept in the OrderedDict, so expired sessions sit at the front
+        while self._sessions:
+            oldest_id = next(iter(self._sessions))
+            if now - self._touched[oldest_id] <= self.ttl_seconds:
+                break
+            self.delete(oldest_id)
+            self._evicted_ttl += 1
+
+        while len(self._sessions) > self.max_entries:
+            oldest_id = next(iter(self._sessions))
+            self.delete(oldest_id)
+            self._evicted_lru += 1
+            self.logger.debug(f"Evicted session {oldest_id} (max_entries={self.max_entries})")
+
+    @staticmethod
+    def _compact(session: Dict[str, Any]):
+        """Replace the raw patient input and intermediate step results of a finished session by summaries."""
+        patient_data = session.pop("patient_data", None)
+        if isinstance(patient_data, dict):
+            session["patient_summary"] = {
+                "description_length": len(patient_data.get("description") or ""),
+                "has_image": bool(patient_data.get("image_data")),
+                "has_vital_signs": bool(patient_data.get("vital_signs"))
+            }
+        # The last step's result is the final result (served whole); the others keep their summary fields
+        final_result = session.get("final_result")
+        steps = session.get("steps")
+        if steps:
+            session["steps"] = {
+                step: result if result is final_result or result.get("compacted")
+                else dict(summarize_step(step, result), compacted=True)
+                for step, result in steps.items()
+            }
@@ -0,0 +1,69 @@
+import copy
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key (the leader) runs the function; callers arriving
+    while it is in flight wait for the leader's result instead of running it
+    again. Errors are shared the same way. Once the call finishes the key is
+    released, so later calls run normally.
+    """
+
+    def __init__(self, name: str = "single-flight"):
+        self.logger = logging.getLogger(name)
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self._leaders = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Run func for key, or wait for the call already in flight for key.
+
+        Args:
+            key: Identity of the request
+            func: Zero-argument callable producing the result
+
+        Returns:
+            The result of func; followers receive a deep copy
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self._leaders += 1
+            else:
+                self._coalesced += 1
+
+        if not leader:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            # Followers copy from a private snapshot the leader cannot mutate
+            future.set_result(copy.deepcopy(result))
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        """Number of executed calls, coalesced callers and keys in flight."""
+        with self._lock:
+            return {
+                "leaders": self._leaders,
+                "coalesced": self._coalesced,
+                "in_flight": len(self._in_flight)
+            }
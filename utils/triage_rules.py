@@ -0,0 +1,350 @@
+import json
+import logging
+import math
+import numbers
+import operator
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from utils.keyword_matcher import KEYWORD_REGISTRY, get_keyword_matcher
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRIAGE_RULES = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                    "data", "triage_rules.json")
+
+# Threshold operators; the same callables work on Python numbers and NumPy arrays
+OPERATORS: Dict[str, Callable[[Any, Any], Any]] = {
+    ">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le,
+    "==": operator.eq, "!=": operator.ne
+}
+
+_RULESET_KEYS = {"description", "base", "min", "max", "round", "defaults", "rules"}
+_RULE_KEYS = {"id", "description", "feature", "op", "value", "weight", "keywords"}
+_MISSING = object()
+_PLAIN_NUMBERS = (int, float)
+
+
+class _Rule:
+    """One compiled rule: threshold (feature op value), linear (weight * feature) or keyword (value = category)."""
+
+    __slots__ = ("id", "kind", "feature", "op", "value", "weight")
+
+    def __init__(self, rule_id: str, kind: str, feature: Optional[str], op: Optional[Callable],
+                 value: Optional[float], weight: float):
+        self.id = rule_id
+        self.kind = kind
+        self.feature = feature
+        self.op = op
+        self.value = value
+        self.weight = weight
+
+
+class CompiledRuleset:
+    """
+    Decision function compiled from one ruleset of the rule table.
+
+    score = base + sum of the weights of the rules that fire (weight * feature for
+    linear rules), rounded half-to-even if `round`, clipped to [min, max].
+    evaluate() scores one patient in plain Python; evaluate_batch() applies the
+    same rules, in the same order, as one array expression per rule, so both
+    give identical scores. A feature missing from the input takes the ruleset
+    default; without a default its rules do not fire (NaN in a batch column).
+    """
+
+    def __init__(self, name: str, spec: Dict[str, Any]):
+        """
+        Compile a ruleset.
+
+        Args:
+            name: Ruleset name (used in error messages)
+            spec: {"base", "min", "max", "round", "defaults", "rules": [...]}
+
+        Raises:
+            ValueError: On unknown keys, operators, keyword categories or non-numeric values
+        """
+        unknown = set(spec) - _RULESET_KEYS
+        if unknown:
+            raise ValueError(f"Ruleset {name}: unknown keys {sorted(unknown)}")
+        self.name = name
+        self.base = self._number(spec.get("base", 0), f"{name}.base")
+        self.min = None if spec.get("min") is None else self._number(spec["min"], f"{name}.min")
+        self.max = None if spec.get("max") is None else self._number(spec["max"], f"{name}.max")
+        self.round = bool(spec.get("round", False))
+        self.defaults = {feature: self._number(value, f"{name}.defaults.{feature}")
+                         for feature, value in spec.get("defaults", {}).items()}
+
+        self.rules: List[_Rule] = []
+        for index, rule in enumerate(spec.get("rules", [])):
+            rule_id = str(rule.get("id", f"rule_{index}"))
+            where = f"{name}.{rule_id}"
+            unknown = set(rule) - _RULE_KEYS
+            if unknown:
+                raise ValueError(f"Rule {where}: unknown keys {sorted(unknown)}")
+            weight = self._number(rule.get("weight", 1), f"{where}.weight")
+            if "keywords" in rule:
+                # Keyword lists live in KEYWORD_REGISTRY only; rules name a category
+                if not isinstance(rule["keywords"], str) or rule["keywords"] not in KEYWORD_REGISTRY:
+                    raise ValueError(f"Rule {where}: keywords must be a KEYWORD_REGISTRY category, "
+                                     f"got {rule['keywords']!r}")
+                self.rules.append(_Rule(rule_id, "keyword", None, None, rule["keywords"], weight))
+            elif "op" in rule:
+                if rule["op"] not in OPERATORS:
+                    raise ValueError(f"Rule {where}: unknown operator {rule['op']!r}")
+                self.rules.append(_Rule(rule_id, "threshold", self._feature(rule, where), OPERATORS[rule["op"]],
+                                        self._number(rule.get("value"), f"{where}.value"), weight))
+            else:
+                self.rules.append(_Rule(rule_id, "linear", self._feature(rule, where), None, None, weight))
+        self.rule_ids = [rule.id for rule in self.rules]
+        self.features = list(dict.fromkeys(rule.feature for rule in self.rules if rule.feature))
+        self._keywords = get_keyword_matcher() if any(rule.kind == "keyword" for rule in self.rules) else None
+        # Flat per-rule tuples for the scalar path, defaults resolved at compile time
+        self._steps = [(rule.kind, rule.id, rule.feature, rule.op, rule.value, rule.weight,
+                        self.defaults.get(rule.feature, _MISSING)) for rule in self.rules]
+        # Integer scores unless a weight or bound is fractional and nothing rounds them
+        self.integral = self.round or all(float(number).is_integer() for number in
+                                          [self.base] + [rule.weight for rule in self.rules])
+
+    @staticmethod
+    def _number(value: Any, where: str) -> float:
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ValueError(f"{where} must be a number, got {value!r}")
+        return value
+
+    @staticmethod
+    def _feature(rule: Dict[str, Any], where: str) -> str:
+        if not isinstance(rule.get("feature"), str):
+            raise ValueError(f"Rule {where}: threshold and linear rules need a feature name")
+        return rule["feature"]
+
+    def _finish(self, total):
+        if self.round:
+            total = round(total)
+        if self.min is not None and total < self.min:
+            total = self.min
+        if self.max is not None and total > self.max:
+            total = self.max
+        return int(total) if self.integral else total
+
+    def evaluate(self, features: Dict[str, Any], text: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Score one patient.
+
+        Args:
+            features: Feature name -> number (None raises, an absent key takes the default); keys no rule reads are ignored
+            text: Description for keyword rules (case-insensitive); None fires none of them
+
+        Returns:
+            {"score": number, "fired": [rule ids in table order]}
+
+        Raises:
+            TypeError: If a feature a rule reads is not a number
+        """
+        lowered = text.lower() if text and self._keywords else None
+        total = self.base
+        fired = []
+        for kind, rule_id, feature, op, operand, weight, default in self._steps:
+            if kind == "keyword":
+                if lowered is None or not self._keywords.contains_any(lowered, operand):
+                    continue
+                total += weight
+            else:
+                value = features.get(feature, default)
+                if value is _MISSING:
+                    continue
+                if type(value) not in _PLAIN_NUMBERS and not isinstance(value, numbers.Real):
+                    raise TypeError(f"Feature {feature} is not numeric: {value!r}")
+                if kind == "threshold":
+                    if not op(value, operand):
+                        continue
+                    total += weight
+                else:
+                    if value == 0 or math.isnan(value):
+                        continue
+                    total += weight * value
+            fired.append(rule_id)
+        return {"score": self._finish(total), "fired": fired}
+
+    def evaluate_batch(self, columns: Dict[str, Any], texts: Optional[Sequence[Optional[str]]] = None,
+                       size: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Score a batch with the same semantics as evaluate().
+
+        Args:
+            columns: Feature name -> array-like of numbers (NaN = missing for that patient)
+            texts: Descriptions for keyword rules, one per patient
+            size: Batch size when no column or text is given
+
+        Returns:
+            {"scores": ndarray (n,), "fired": bool ndarray (n, rules), "rule_ids": [...]}
+        """
+        arrays = {feature: np.asarray(column, dtype=np.float64) for feature, column in columns.items()}
+        if size is None:
+            size = len(texts) if texts is not None else next((len(a) for a in arrays.values()), None)
+        if size is None:
+            raise ValueError("evaluate_batch needs a column, texts or size")
+
+        total = np.full(size, self.base, dtype=np.float64)
+        fired = np.zeros((size, len(self.rules)), dtype=bool)
+        lowered = None
+        if texts is not None and self._keywords:
+            lowered = [text.lower() if text else None for text in texts]
+        for k, rule in enumerate(self.rules):
+            if rule.kind == "keyword":
+                if lowered is None:
+                    continue
+                fired[:, k] = [text is not None and self._keywords.contains_any(text, rule.value) for text in lowered]
+                total += np.where(fired[:, k], rule.weight, 0.0)
+                continue
+            values = arrays.get(rule.feature)
+            if values is None:
+                if rule.feature not in self.defaults:
+                    continue
+                values = np.full(size, float(self.defaults[rule.feature]))
+            if rule.kind == "threshold":
+                fired[:, k] = rule.op(values, rule.value)
+                total += np.where(fired[:, k], rule.weight, 0.0)
+            else:
+                fired[:, k] = (values != 0) & ~np.isnan(values)
+                total += np.where(fired[:, k], rule.weight * values, 0.0)
+
+        if self.round:
+            total = np.rint(total)
+        if self.min is not None or self.max is not None:
+            total = np.clip(total, self.min, self.max)
+        return {
+            "scores": total.astype(np.int64) if self.integral else total,
+            "fired": fired,
+            "rule_ids": list(self.rule_ids)
+        }
+
+    def fired_ids(self, fired_row: np.ndarray) -> List[str]:
+        """Rule ids for one row of evaluate_batch()["fired"]."""
+        return [self.rule_ids[k] for k in np.flatnonzero(fired_row)]
+
+
+def compile_rules(table: Dict[str, Any]) -> Dict[str, CompiledRuleset]:
+    """Compile every ruleset of a rule table ({"rulesets": {name: spec}})."""
+    rulesets = table.get("rulesets")
+    if not isinstance(rulesets, dict) or not rulesets:
+        raise ValueError("Rule table has no rulesets")
+    return {name: CompiledRuleset(name, spec) for name, spec in rulesets.items()}
+
+
+class TriageRules:
+    """
+    Rule table loaded from JSON, compiled once and hot-reloaded when the file changes.
+
+    The file's modification time is checked at most every reload_interval
+    seconds on evaluation. A changed file is recompiled and swapped in whole;
+    a table that fails to load or compile is logged and the previous rules stay
+    active, so a bad edit never stops triage.
+    """
+
+    def __init__(self, path: str = DEFAULT_TRIAGE_RULES, reload_interval: float = 2.0):
+        """
+        Load and compile the rule table.
+
+        Args:
+            path: Rule table JSON file
+            reload_interval: Seconds between file checks, 0 reloads only on reload()
+
+        Raises:
+            OSError, ValueError: If the table cannot be loaded at startup
+        """
+        self.path = path
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._reloads = 0
+        self._reload_errors = 0
+        self._last_error: Optional[str] = None
+        self._mtime = self._file_mtime()
+        self._version, self._rulesets = self._load()
+        self._loaded_at = time.time()
+        self._next_check = time.monotonic() + reload_interval
+
+    @classmethod
+    def from_env(cls) -> "TriageRules":
+        """Rules from TRIAGE_RULES_PATH, checked every TRIAGE_RULES_RELOAD_SECONDS."""
+        return cls(os.getenv("TRIAGE_RULES_PATH", DEFAULT_TRIAGE_RULES),
+                   float(os.getenv("TRIAGE_RULES_RELOAD_SECONDS", "2")))
+
+    def _file_mtime(self) -> Optional[float]:
+        try:
+            return os.stat(self.path).st_mtime
+        except OSError:
+            return None
+
+    def _load(self):
+        with open(self.path, "r", encoding="utf-8") as f:
+            table = json.load(f)
+        return table.get("version"), compile_rules(table)
+
+    def reload(self) -> bool:
+        """Recompile the table now; returns False (keeping the current rules) if it fails."""
+        with self._lock:
+            self._mtime = self._file_mtime()
+            try:
+                version, rulesets = self._load()
+            except (OSError, ValueError) as e:
+                self._reload_errors += 1
+                self._last_error = str(e)
+                logger.error(f"Triage rules not reloaded from {self.path}, keeping version {self._version}: {e}")
+                return False
+            self._version, self._rulesets = version, rulesets
+            self._loaded_at = time.time()
+            self._reloads += 1
+            self._last_error = None
+        logger.info(f"Triage rules reloaded from {self.path} (version {version})")
+        return True
+
+    def _maybe_reload(self):
+        if not self.reload_interval or time.monotonic() < self._next_check:
+            return
+        self._next_check = time.monotonic() + self.reload_interval
+        if self._file_mtime() != self._mtime:
+            self.reload()
+
+    def ruleset(self, name: str) -> CompiledRuleset:
+        """Current compiled ruleset (reloading first if the file changed)."""
+        self._maybe_reload()
+        return self._rulesets[name]
+
+    def evaluate(self, name: str, features: Dict[str, Any], text: Optional[str] = None) -> Dict[str, Any]:
+        """CompiledRuleset.evaluate on the named ruleset."""
+        return self.ruleset(name).evaluate(features, text)
+
+    def evaluate_batch(self, name: str, columns: Dict[str, Any], texts: Optional[Sequence[Optional[str]]] = None,
+                       size: Optional[int] = None) -> Dict[str, Any]:
+        """CompiledRuleset.evaluate_batch on the named ruleset."""
+        return self.ruleset(name).evaluate_batch(columns, texts, size)
+
+    def stats(self) -> Dict[str, Any]:
+        """Loaded version, reload counters and rule ids per ruleset."""
+        rulesets = self._rulesets
+        return {
+            "path": self.path,
+            "version": self._version,
+            "loaded_at": self._loaded_at,
+            "reloads": self._reloads,
+            "reload_errors": self._reload_errors,
+            "last_error": self._last_error,
+            "rulesets": {name: ruleset.rule_ids for name, ruleset in rulesets.items()}
+        }
+
+
+_shared_rules: Optional[TriageRules] = None
+_shared_lock = threading.Lock()
+
+
+def get_triage_rules() -> TriageRules:
+    """Rule table shared by the workflow, PatientCareAgent and TriageManager."""
+    global _shared_rules
+    with _shared_lock:
+        if _shared_rules is None:
+            _shared_rules = TriageRules.from_env()
+        return _shared_rules
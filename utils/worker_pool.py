@@ -0,0 +1,188 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional
+
+
+class QueueFullError(Exception):
+    """Raised when the admission queue of a PriorityWorkerPool is full."""
+
+    def __init__(self, queue_depth: int, retry_after: float):
+        super().__init__(f"Admission queue full ({queue_depth} waiting)")
+        self.queue_depth = queue_depth
+        self.retry_after = retry_after
+
+
+class PoolTicket:
+    """Handle returned by PriorityWorkerPool.submit."""
+
+    def __init__(self, job_id: int, priority: int, future: Future, position: int):
+        self.job_id = job_id
+        self.priority = priority
+        self.future = future
+        self.position = position
+
+
+class _Job:
+    __slots__ = ("job_id", "priority", "func", "args", "kwargs", "future", "enqueued_at")
+
+    def __init__(self, job_id, priority, func, args, kwargs):
+        self.job_id = job_id
+        self.priority = priority
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.future = Future()
+        self.enqueued_at = time.monotonic()
+
+
+class PriorityWorkerPool:
+    """
+    Fixed-size worker pool with a bounded, priority-ordered admission queue.
+    Higher priority jobs run first; jobs of equal priority run in arrival order.
+    """
+
+    def __init__(self, max_workers: int = 4, max_queue: int = 100, name: str = "worker-pool"):
+        """
+        Initialize the pool and start its worker threads.
+
+        Args:
+            max_workers: Number of worker threads
+            max_queue: Maximum number of jobs waiting for a worker
+            name: Prefix for worker thread names
+        """
+        self.logger = logging.getLogger(name)
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+
+        self._queue: List[tuple] = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._running = True
+        self._active = 0
+        self._completed = 0
+        self._rejected = 0
+        self._cancelled = 0
+        self._recent_waits = deque(maxlen=1000)
+
+        self._workers = []
+        for index in range(max_workers):
+            worker = threading.Thread(target=self._worker_loop, name=f"{name}-{index}", daemon=True)
+            worker.start()
+            self._workers.append(worker)
+
+    def submit(self, func: Callable, *args, priority: int = 0, **kwargs) -> PoolTicket:
+        """
+        Queue a job for execution.
+
+        Args:
+            func: Callable to run on a worker thread
+            priority: Higher values are served first
+            *args, **kwargs: Arguments for func
+
+        Returns:
+            PoolTicket with the job's future and its position in the queue (1 = next)
+
+        Raises:
+            QueueFullError: If the admission queue is full
+        """
+        with self._condition:
+            if not self._running:
+                raise RuntimeError("Worker pool is shut down")
+            if len(self._queue) >= self.max_queue:
+                self._rejected += 1
+                raise QueueFullError(len(self._queue), self._estimate_retry_after())
+
+            job = _Job(next(self._sequence), priority, func, args, kwargs)
+            entry = (-priority, job.job_id, job)
+            heapq.heappush(self._queue, entry)
+            position = sum(1 for queued in self._queue if queued[:2] <= entry[:2])
+            self._condition.notify()
+
+        return PoolTicket(job.job_id, priority, job.future, position)
+
+    def queue_position(self, job_id: int) -> Optional[int]:
+        """Current position of a queued job (1 = next), or None if it is no longer queued."""
+        with self._condition:
+            for queued in self._queue:
+                if queued[1] == job_id:
+                    return sum(1 for other in self._queue if other[:2] <= queued[:2])
+        return None
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Drop a job that is still queued (its future is cancelled).
+
+        Returns:
+            True if the job was removed, False if it already started or finished
+        """
+        with self._condition:
+            for index, queued in enumerate(self._queue):
+                if queued[1] == job_id:
+                    self._queue[index] = self._queue[-1]
+                    self._queue.pop()
+                    heapq.heapify(self._queue)
+                    self._cancelled += 1
+                    queued[2].future.cancel()
+                    return True
+        return False
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, worker utilisation and recent queue wait times."""
+        with self._condition:
+            now = time.monotonic()
+            waits = sorted(self._recent_waits)
+            oldest_wait = max((now - queued[2].enqueued_at for queued in self._queue), default=0.0)
+            return {
+                "workers": self.max_workers,
+                "active": self._active,
+                "queue_depth": len(self._queue),
+                "max_queue": self.max_queue,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "cancelled": self._cancelled,
+                "oldest_wait_seconds": round(oldest_wait, 3),
+                "avg_wait_seconds": round(sum(waits) / len(waits), 3) if waits else 0.0,
+                "p95_wait_seconds": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 3) if waits else 0.0
+            }
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs; queued jobs still run before the workers exit."""
+        with self._condition:
+            self._running = False
+            self._condition.notify_all()
+        if wait:
+            for worker in self._workers:
+                worker.join()
+
+    def _estimate_retry_after(self) -> float:
+        """Rough seconds until a queue slot frees up, from recent wait times."""
+        if not self._recent_waits:
+            return 1.0
+        return max(1.0, round(sum(self._recent_waits) / len(self._recent_waits), 1))
+
+    def _worker_loop(self):
+        while True:
+            with self._condition:
+                while not self._queue and self._running:
+                    self._condition.wait()
+                if not self._queue:
+                    return
+                _, _, job = heapq.heappop(self._queue)
+                self._recent_waits.append(time.monotonic() - job.enqueued_at)
+                self._active += 1
+
+            if job.future.set_running_or_notify_cancel():
+                try:
+                    job.future.set_result(job.func(*job.args, **job.kwargs))
+                except Exception as e:
+                    self.logger.error(f"Job {job.job_id} failed: {e}")
+                    job.future.set_exception(e)
+
+            with self._condition:
+                self._active -= 1
+                self._completed += 1
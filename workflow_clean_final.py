@@ -4,10 +4,20 @@ Architecture: Input -> Triage Agent -> Patient Care Agent -> (QA/Hospital/Dispat
 English function names with Vietnamese data only
 """
 
+import asyncio
+import contextlib
+import contextvars
+import functools
 import logging
 import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, AsyncIterator, Callable, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, 
@@ -18,11 +28,62 @@ logger = logging.getLogger(__name__)
 from modules.gemini_client import GeminiClient
 from modules.triage_module.text_processing import TextProcessor
 from modules.triage_module.image_processing import ImageProcessor
+from modules.triage_module.cascade import LocalTriageScorer, TriageCascade
+from modules.triage_module.symptom_extractor import SymptomExtractor
 from modules.patient_care_module.qa_chatbot import QAChatbot
 from modules.patient_care_module.hospital_agent import HospitalAgent
 from modules.patient_care_module.dispatch_agent import DispatchAgent
+from utils.call_policy import call_priority
+from utils.llm_metrics import LLMCallLog, collect_llm_calls
+from utils.keyword_matcher import KEYWORD_REGISTRY, get_keyword_matcher
+from utils.triage_rules import get_triage_rules
 from modules.flow_optimizer_module.flow_agent import FlowAgent
 
+# Severity thresholds shared by the single-patient and batch paths; the step-2 priority
+# score itself comes from the "workflow_priority" ruleset in data/triage_rules.json
+EMERGENCY_KEYWORDS = KEYWORD_REGISTRY["emergency"]
+TACHYCARDIA_HEART_RATE = 100
+LOW_SPO2 = 95
+SEVERE_TACHYCARDIA_HEART_RATE = 120
+SEVERE_LOW_SPO2 = 90
+
+# Low-acuity symptoms the local triage tier may decide without the model (whole words)
+MILD_SYMPTOM_KEYWORDS = ["sốt", "ho", "sổ mũi", "nghẹt mũi", "đau họng", "hắt hơi", "mệt mỏi", "đau đầu"]
+
+# Symptom -> synonyms, severity, specialty; compiled once for the local extractor
+DEFAULT_SYMPTOM_ONTOLOGY = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "symptom_ontology.json")
+
+# Keyword registry categories -> specialty, first match wins
+SPECIALTY_CATEGORIES = {"cardiology": "tim mạch", "respiratory": "hô hấp", "digestive": "tiêu hóa"}
+
+# Step 4 order for batches: most urgent route group is executed first
+ROUTE_GROUP_ORDER = ["emergency_dispatch", "hospital_direct", "qa_consultation"]
+
+# (result key, display name, log message) for steps 1-5
+WORKFLOW_STEPS = [
+    ("step1_extraction", "Trích xuất thông tin bệnh nhân", "Extracting patient information"),
+    ("step2_triage", "Đánh giá phân loại bệnh nhân", "Performing triage assessment"),
+    ("step3_routing", "Quyết định tuyến điều trị", "Making routing decision"),
+    ("step4_execution", "Thực hiện điều phối", "Executing routing"),
+    ("step5_optimization", "Tối ưu hóa cuối cùng", "Final optimization")
+]
+
+
+@dataclass
+class StepEvent:
+    """One finished workflow step, as yielded by PatientDispatchWorkflow.iter_steps"""
+    workflow_id: Optional[str]
+    step: int
+    key: str
+    name: str
+    result: Dict[str, Any]
+    elapsed_ms: float
+    
+    @property
+    def is_final(self) -> bool:
+        return self.step == len(WORKFLOW_STEPS)
+
+
 class PatientDispatchWorkflow:
     """Main workflow class for patient dispatch system"""
     
@@ -32,6 +93,31 @@ class PatientDispatchWorkflow:
         
         # Initialize all agents with English names
         self.text_processor = TextProcessor(self.gemini)
+        self.keyword_matcher = get_keyword_matcher()
+        self.triage_rules = get_triage_rules()
+        self.symptom_extractor = SymptomExtractor.from_file(
+            os.getenv("SYMPTOM_ONTOLOGY_PATH", DEFAULT_SYMPTOM_ONTOLOGY),
+            max_edit_distance=int(os.getenv("SYMPTOM_MAX_EDIT_DISTANCE", "2"))
+        )
+        # Red flags matched like symptoms: with or without diacritics, small typos, negations skipped
+        self.red_flag_extractor = SymptomExtractor.from_phrases(
+            EMERGENCY_KEYWORDS, max_edit_distance=self.symptom_extractor.max_edit_distance
+        )
+        # Concurrent step-1 prompts are packed into multi-patient requests (1 = one prompt per patient)
+        text_batch_max_items = int(os.getenv("TEXT_BATCH_MAX_ITEMS", "1"))
+        if text_batch_max_items > 1:
+            self.text_processor.enable_batching(text_batch_max_items,
+                                                float(os.getenv("TEXT_BATCH_MAX_WAIT_MS", "20")),
+                                                float(os.getenv("TEXT_BATCH_TIMEOUT_SECONDS", "30")))
+        # Cascaded triage: clear-cut cases are decided locally, the rest go to the model
+        self.triage_cascade = TriageCascade(
+            self.text_processor,
+            LocalTriageScorer(EMERGENCY_KEYWORDS, MILD_SYMPTOM_KEYWORDS, TACHYCARDIA_HEART_RATE, LOW_SPO2,
+                              SEVERE_TACHYCARDIA_HEART_RATE, SEVERE_LOW_SPO2,
+                              symptom_extractor=self.symptom_extractor,
+                              red_flag_extractor=self.red_flag_extractor),
+            confidence_threshold=float(os.getenv("TRIAGE_LOCAL_CONFIDENCE", "0.8"))
+        )
         self.image_processor = ImageProcessor(self.gemini)
         self.qa_chatbot = QAChatbot(self.gemini)
         self.hospital_agent = HospitalAgent(self.gemini)
@@ -42,97 +128,420 @@ class PatientDispatchWorkflow:
         self.current_step = 0
         self.total_steps = 5
         
-    def process_patient_input(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
+    def process_patient_input(self, patient_data: Dict[str, Any],
+                              sink: Optional[Callable[["StepEvent"], None]] = None) -> Dict[str, Any]:
         """
         Main workflow function - processes patient from input to final routing
         
         Args:
             patient_data: Dictionary containing patient information
+            sink: Optional callable receiving each StepEvent as soon as the step finishes
             
         Returns:
             Complete workflow result with all steps
         """
-        workflow_result = {
-            "workflow_id": f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
+        workflow_result = self._new_workflow_result()
+        
+        with collect_llm_calls() as call_log:
+            try:
+                for event in self.iter_steps(patient_data, workflow_result["workflow_id"]):
+                    workflow_result["steps"][event.key] = event.result
+                    if sink is not None:
+                        sink(event)
+                return self._complete_workflow_result(workflow_result)
+                
+            except Exception as e:
+                return self._fail_workflow_result(workflow_result, e)
+            finally:
+                workflow_result["llm_calls"] = call_log.summary()
+    
+    def iter_steps(self, patient_data: Dict[str, Any], workflow_id: Optional[str] = None) -> Iterator["StepEvent"]:
+        """
+        Run the five workflow steps lazily
+        
+        Args:
+            patient_data: Dictionary containing patient information
+            workflow_id: Optional id stamped on every event
+            
+        Yields:
+            StepEvent as soon as each step finishes
+        """
+        extraction = self._run_step(workflow_id, 1, self.extract_patient_information, patient_data)
+        yield extraction
+        
+        triage = self._run_step(workflow_id, 2, self.perform_triage_assessment, extraction.result)
+        yield triage
+        
+        routing = self._run_step(workflow_id, 3, self.make_routing_decision, triage.result)
+        yield routing
+        
+        execution = self._run_step(workflow_id, 4, self.execute_routing, routing.result, patient_data)
+        yield execution
+        
+        yield self._run_step(workflow_id, 5, self.optimize_assignment, execution.result)
+    
+    def _run_step(self, workflow_id: Optional[str], step: int, func: Callable, *args) -> "StepEvent":
+        """Run one workflow step and wrap its result in a StepEvent"""
+        logger.info(f"Step {step}: {WORKFLOW_STEPS[step - 1][2]}")
+        return self._timed_step(workflow_id, step, func, *args)
+    
+    @staticmethod
+    def _timed_step(workflow_id: Optional[str], step: int, func: Callable, *args) -> "StepEvent":
+        """Call a step function and time it (no logging, used per patient in batches)"""
+        key, name, _ = WORKFLOW_STEPS[step - 1]
+        started = time.perf_counter()
+        result = func(*args)
+        return StepEvent(workflow_id, step, key, name, result, (time.perf_counter() - started) * 1000)
+    
+    @staticmethod
+    def _new_workflow_result(workflow_id: Optional[str] = None) -> Dict[str, Any]:
+        """Empty workflow result in the processing state"""
+        return {
+            "workflow_id": workflow_id or f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}",
             "start_time": datetime.now().isoformat(),
             "steps": {},
             "final_result": None,
             "status": "processing"
         }
+    
+    @staticmethod
+    def _complete_workflow_result(workflow_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Mark a workflow result completed, with the last step as final result"""
+        workflow_result["final_result"] = workflow_result["steps"]["step5_optimization"]
+        workflow_result["status"] = "completed"
+        workflow_result["end_time"] = datetime.now().isoformat()
+        return workflow_result
+    
+    @staticmethod
+    def _fail_workflow_result(workflow_result: Dict[str, Any], error: Exception) -> Dict[str, Any]:
+        """Mark a workflow result failed"""
+        logger.error(f"Workflow error: {error}")
+        workflow_result["status"] = "error"
+        workflow_result["error"] = str(error)
+        workflow_result["end_time"] = datetime.now().isoformat()
+        return workflow_result
+    
+    def process_patients_batch(self, patients: List[Dict[str, Any]],
+                               sink: Optional[Callable[[StepEvent], None]] = None) -> List[Dict[str, Any]]:
+        """
+        Batch workflow - processes many patients with column-wise triage
         
-        try:
-            # Step 1: Extract symptoms from text and image
-            logger.info("Step 1: Extracting patient information")
-            step1_result = self.extract_patient_information(patient_data)
-            workflow_result["steps"]["step1_extraction"] = step1_result
-            
-            # Step 2: Triage assessment
-            logger.info("Step 2: Performing triage assessment")
-            step2_result = self.perform_triage_assessment(step1_result)
-            workflow_result["steps"]["step2_triage"] = step2_result
-            
-            # Step 3: Patient care routing decision
-            logger.info("Step 3: Making routing decision")
-            step3_result = self.make_routing_decision(step2_result)
-            workflow_result["steps"]["step3_routing"] = step3_result
-            
-            # Step 4: Execute routing (QA/Hospital/Emergency)
-            logger.info("Step 4: Executing routing")
-            step4_result = self.execute_routing(step3_result, patient_data)
-            workflow_result["steps"]["step4_execution"] = step4_result
-            
-            # Step 5: Final optimization and assignment
-            logger.info("Step 5: Final optimization")
-            step5_result = self.optimize_assignment(step4_result)
-            workflow_result["steps"]["step5_optimization"] = step5_result
-            
-            workflow_result["final_result"] = step5_result
-            workflow_result["status"] = "completed"
-            workflow_result["end_time"] = datetime.now().isoformat()
+        Steps 1-3 are evaluated over NumPy arrays for the whole batch, then
+        each route group goes through steps 4-5 together, most urgent group first.
+        
+        Args:
+            patients: List of patient dictionaries (same shape as process_patient_input)
+            sink: Optional callable receiving a StepEvent per patient and step; batch
+                steps 1-3 report the whole batch step's elapsed time
             
-            return workflow_result
+        Returns:
+            List of workflow results, in the same order as the input
+        """
+        id_prefix = f"workflow_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        results = [self._new_workflow_result(f"{id_prefix}_{index:05d}") for index in range(len(patients))]
+        
+        if not patients:
+            return results
+        
+        # Model calls are accounted per patient during batch step 1 (the only step calling the model)
+        call_logs = [LLMCallLog() for _ in patients]
+        batch_steps = [
+            (functools.partial(self.extract_patients_information_batch, call_logs=call_logs), f"Extracting information for {len(patients)} patients"),
+            (self.perform_triage_assessment_batch, "Performing triage assessment"),
+            (self.make_routing_decision_batch, "Making routing decisions")
+        ]
+        step_results = patients
+        for step, (batch_func, log_message) in enumerate(batch_steps, start=1):
+            logger.info(f"Batch step {step}: {log_message}")
+            started = time.perf_counter()
+            step_results = batch_func(step_results)
+            elapsed_ms = (time.perf_counter() - started) * 1000
             
-        except Exception as e:
-            logger.error(f"Workflow error: {e}")
-            workflow_result["status"] = "error"
-            workflow_result["error"] = str(e)
-            workflow_result["end_time"] = datetime.now().isoformat()
-            return workflow_result
+            key, name, _ = WORKFLOW_STEPS[step - 1]
+            for result, step_result in zip(results, step_results):
+                result["steps"][key] = step_result
+                if sink is not None:
+                    sink(StepEvent(result["workflow_id"], step, key, name, step_result, elapsed_ms))
+        routings = step_results
+        
+        # Steps 4-5 per route group, emergency dispatch first
+        groups: Dict[str, List[int]] = {}
+        for index, routing in enumerate(routings):
+            groups.setdefault(routing.get("route_type"), []).append(index)
+        
+        ordered_routes = [r for r in ROUTE_GROUP_ORDER if r in groups]
+        ordered_routes += [r for r in groups if r not in ROUTE_GROUP_ORDER]
+        
+        for route_type in ordered_routes:
+            indices = groups[route_type]
+            # Patients of one group at the same location share hospital/ambulance lookups
+            lookup_cache: Dict = {}
+            logger.info(f"Batch step 4-5: Executing {route_type} for {len(indices)} patients")
+            for index in indices:
+                result = results[index]
+                try:
+                    execution = self._timed_step(
+                        result["workflow_id"], 4, self.execute_routing, routings[index], patients[index], lookup_cache
+                    )
+                    result["steps"][execution.key] = execution.result
+                    if sink is not None:
+                        sink(execution)
+                    
+                    optimization = self._timed_step(
+                        result["workflow_id"], 5, self.optimize_assignment, execution.result, lookup_cache
+                    )
+                    result["steps"][optimization.key] = optimization.result
+                    if sink is not None:
+                        sink(optimization)
+                    
+                    self._complete_workflow_result(result)
+                except Exception as e:
+                    self._fail_workflow_result(result, e)
+        
+        for result, call_log in zip(results, call_logs):
+            result["llm_calls"] = call_log.summary()
+        return results
     
-    def extract_patient_information(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Step 1: Extract and process patient information"""
-        try:
-            # Process text description
-            text_result = {}
-            if patient_data.get("description"):
-                text_result = self.text_processor.extract_symptoms(patient_data["description"])
-            
-            # Process image if available
-            image_result = {}
-            if patient_data.get("image_data"):
-                image_result = self.image_processor.analyze_image(patient_data["image_data"])
-            
-            # Combine vital signs
-            vital_signs = patient_data.get("vital_signs", {})
+    def extract_patients_information_batch(self, patients: List[Dict[str, Any]],
+                                           call_logs: Optional[List[LLMCallLog]] = None) -> List[Dict[str, Any]]:
+        """
+        Batch step 1: extraction with column-wise severity indicators
+        
+        Text and image analysis stay per patient (they are model calls); vital-sign
+        thresholds are evaluated over the whole batch, emergency keyword hits (red-flag
+        extractor, one pass per description) are assembled into the same hit matrix.
+        Patients whose vital signs are not numeric fall back to the single-patient path.
+        If call_logs is given, each patient's model calls are recorded into call_logs[i].
+        """
+        def row_calls(i):
+            return collect_llm_calls(call_logs[i]) if call_logs is not None else contextlib.nullcontext()
+        
+        n = len(patients)
+        extractions: List[Optional[Dict[str, Any]]] = [None] * n
+        text_results: List[Dict[str, Any]] = [{} for _ in range(n)]
+        image_results: List[Dict[str, Any]] = [{} for _ in range(n)]
+        
+        heart_rate = np.zeros(n, dtype=np.float64)
+        spo2 = np.full(n, 100.0, dtype=np.float64)
+        vectorized = np.ones(n, dtype=bool)
+        
+        for i, patient_data in enumerate(patients):
+            try:
+                with row_calls(i), call_priority(self.pre_triage_priority(patient_data)):
+                    if patient_data.get("description"):
+                        text_results[i] = self.triage_cascade.extract_symptoms(
+                            patient_data["description"], patient_data.get("vital_signs"),
+                            fallback=functools.partial(self.rule_based_extraction, patient_data)
+                        )
+                    if patient_data.get("image_data"):
+                        image_results[i] = self.image_processor.analyze_image(patient_data["image_data"])
+                
+                vital_signs = patient_data.get("vital_signs", {})
+                heart_rate[i] = self._numeric_vital(vital_signs.get("heart_rate", 0))
+                spo2[i] = self._numeric_vital(vital_signs.get("spo2", 100))
+                if not isinstance(text_results[i].get("original_text", ""), str):
+                    raise TypeError("original_text is not a string")
+            except (TypeError, ValueError, AttributeError):
+                # Let the single-patient path produce its own result for odd inputs
+                vectorized[i] = False
+                text_results[i] = {}
+            except Exception as e:
+                vectorized[i] = False
+                extractions[i] = self._extraction_error(e)
+        
+        # Column-wise severity indicators: vitals first, then keywords, same order as check_severity_indicators
+        red_flags = [self.red_flag_extractor.phrases_in(text_result.get("original_text", ""))
+                     for text_result in text_results]
+        
+        labels = ["Nhịp tim nhanh", "SpO2 thấp"]
+        labels += [f"Triệu chứng khẩn cấp: {keyword}" for keyword in EMERGENCY_KEYWORDS]
+        
+        hits = np.empty((n, len(labels)), dtype=bool)
+        hits[:, 0] = heart_rate > TACHYCARDIA_HEART_RATE
+        hits[:, 1] = spo2 < LOW_SPO2
+        for column, keyword in enumerate(EMERGENCY_KEYWORDS, start=2):
+            hits[:, column] = [keyword in found for found in red_flags]
+        
+        # Rows with the same hit pattern share one indicator list template
+        patterns = hits.astype(np.int64) @ (1 << np.arange(len(labels), dtype=np.int64))
+        pattern_labels = {
+            int(pattern): [labels[j] for j in range(len(labels)) if int(pattern) >> j & 1]
+            for pattern in np.unique(patterns)
+        }
+        
+        for i, patient_data in enumerate(patients):
+            if extractions[i] is not None:
+                continue
+            if not vectorized[i]:
+                with row_calls(i):
+                    extractions[i] = self.extract_patient_information(patient_data)
+                continue
             
-            return {
+            text_result = text_results[i]
+            extractions[i] = {
                 "success": True,
                 "text_analysis": text_result,
-                "image_analysis": image_result,
-                "vital_signs": vital_signs,
+                "image_analysis": image_results[i],
+                "vital_signs": patient_data.get("vital_signs", {}),
                 "location": patient_data.get("location", {}),
                 "extracted_symptoms": text_result.get("symptoms", []),
-                "severity_indicators": self.check_severity_indicators(text_result, vital_signs)
+                "analysis_source": text_result.get("source"),
+                "triage_tier": text_result.get("triage_tier"),
+                "triage_confidence": text_result.get("confidence"),
+                "severity_indicators": list(pattern_labels[int(patterns[i])])
             }
+        
+        return extractions
+    
+    def perform_triage_assessment_batch(self, extraction_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Batch step 2: priority scores for the whole batch as one array expression"""
+        n = len(extraction_results)
+        symptom_counts = np.empty(n, dtype=np.int64)
+        indicator_counts = np.empty(n, dtype=np.int64)
+        heart_rate = np.zeros(n, dtype=np.float64)
+        spo2 = np.full(n, 100.0, dtype=np.float64)
+        
+        for i, extraction in enumerate(extraction_results):
+            vital_signs = extraction.get("vital_signs", {})
+            symptom_counts[i] = len(extraction.get("extracted_symptoms", []))
+            indicator_counts[i] = len(extraction.get("severity_indicators", []))
+            heart_rate[i] = vital_signs.get("heart_rate", 0)
+            spo2[i] = vital_signs.get("spo2", 100)
+        
+        priority = self.evaluate_priorities(symptom_counts, heart_rate, spo2, indicator_counts)
+        priority_scores = priority["scores"]
+        rule_ids = priority["rule_ids"]
+        
+        # Urgency bands, same thresholds as perform_triage_assessment
+        band = np.where(priority_scores >= 5, 0, np.where(priority_scores >= 3, 1, 2))
+        urgency_levels = ["Cấp cứu", "Khẩn cấp", "Không khẩn cấp"]
+        recommended_actions = [
+            "Cần xe cấp cứu ngay lập tức",
+            "Cần đưa đến bệnh viện",
+            "Có thể tư vấn trực tuyến trước"
+        ]
+        
+        return [{
+            "success": True,
+            "priority_score": int(priority_scores[i]),
+            "urgency_level": urgency_levels[band[i]],
+            "recommended_action": recommended_actions[band[i]],
+            "priority_rules": [rule_ids[k] for k in np.flatnonzero(priority["fired"][i])],
+            "triage_notes": f"Đánh giá dựa trên {int(symptom_counts[i])} triệu chứng và chỉ số sinh tồn"
+        } for i in range(n)]
+    
+    def make_routing_decision_batch(self, triage_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Batch step 3: routing decisions for the whole batch"""
+        priority_scores = np.fromiter(
+            (triage.get("priority_score", 2) for triage in triage_results),
+            dtype=np.int64, count=len(triage_results)
+        )
+        band = np.where(priority_scores >= 5, 0, np.where(priority_scores >= 3, 1, 2))
+        routes = [
+            ("emergency_dispatch", "Chuyển đến điều phối cấp cứu", "dispatch_agent"),
+            ("hospital_direct", "Chuyển trực tiếp đến bệnh viện", "hospital_agent"),
+            ("qa_consultation", "Tư vấn trực tuyến với chuyên gia", "qa_chatbot")
+        ]
+        
+        results = []
+        for i, triage in enumerate(triage_results):
+            route_type, route_description, next_agent = routes[band[i]]
+            priority_score = int(priority_scores[i])
+            results.append({
+                "success": True,
+                "route_type": route_type,
+                "route_description": route_description,
+                "next_agent": next_agent,
+                "priority_score": priority_score,
+                "urgency_level": triage.get("urgency_level", "Không khẩn cấp"),
+                "routing_reason": f"Dựa trên mức độ ưu tiên {priority_score}/5"
+            })
+        return results
+    
+    def extract_patient_information(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Step 1: Extract and process patient information"""
+        try:
+            # Model calls are tagged with the pre-triage priority (emergencies get hedged requests)
+            with call_priority(self.pre_triage_priority(patient_data)):
+                # Process text description
+                text_result = {}
+                if patient_data.get("description"):
+                    text_result = self.triage_cascade.extract_symptoms(
+                        patient_data["description"], patient_data.get("vital_signs"),
+                        fallback=functools.partial(self.rule_based_extraction, patient_data)
+                    )
+                
+                # Process image if available
+                image_result = {}
+                if patient_data.get("image_data"):
+                    image_result = self.image_processor.analyze_image(patient_data["image_data"])
+            
+            return self._combine_extraction(patient_data, text_result, image_result)
             
         except Exception as e:
-            logger.error(f"Information extraction error: {e}")
-            return {
-                "success": False,
-                "error": str(e),
-                "extracted_symptoms": [],
-                "severity_indicators": []
-            }
+            return self._extraction_error(e)
+    
+    def pre_triage_priority(self, patient_data: Dict[str, Any]) -> int:
+        """Cheap priority (1-5) from keywords and vital signs only, available before step 1"""
+        try:
+            vital_signs = patient_data.get("vital_signs") or {}
+            indicators = self.check_severity_indicators(
+                {"original_text": patient_data.get("description") or ""}, vital_signs
+            )
+            return self.calculate_priority_score([], vital_signs, indicators)
+        except Exception:
+            return 2
+    
+    def rule_based_extraction(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Model-free stand-in for the text analysis, used while the model backend is unavailable"""
+        description = (patient_data.get("description") or "").lower()
+        local = self.symptom_extractor.phan_tich(description)
+        return {
+            "symptoms": list(dict.fromkeys(
+                self.keyword_matcher.match(description, ["emergency"])["emergency"] + local["trieu_chung"]
+            )),
+            "onset_time": local["thoi_gian_khoi_phat"],
+            "priority": self.pre_triage_priority(patient_data),
+            "specialty": local["chuyen_khoa"] if local["trieu_chung"] else self.determine_required_specialty(patient_data)
+        }
+    
+    def rule_based_answer(self, question: str) -> Dict[str, Any]:
+        """Model-free QA answer, used while the model backend is unavailable"""
+        indicators = self.check_severity_indicators({"original_text": question or ""}, {})
+        if indicators:
+            return {"answer": "Triệu chứng bạn mô tả có thể nguy hiểm. Vui lòng gọi cấp cứu 115 "
+                              "hoặc đến cơ sở y tế gần nhất ngay lập tức."}
+        return {"answer": "Hệ thống tư vấn tự động đang quá tải. Nếu triệu chứng nặng lên, "
+                          "vui lòng đến cơ sở y tế gần nhất; nhân viên y tế sẽ liên hệ với bạn sớm."}
+    
+    def _combine_extraction(self, patient_data: Dict[str, Any], text_result: Dict[str, Any],
+                            image_result: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine text/image analysis with vital signs into the step 1 result"""
+        vital_signs = patient_data.get("vital_signs", {})
+        
+        return {
+            "success": True,
+            "text_analysis": text_result,
+            "image_analysis": image_result,
+            "vital_signs": vital_signs,
+            "location": patient_data.get("location", {}),
+            "extracted_symptoms": text_result.get("symptoms", []),
+            "analysis_source": text_result.get("source"),
+            "triage_tier": text_result.get("triage_tier"),
+            "triage_confidence": text_result.get("confidence"),
+            "severity_indicators": self.check_severity_indicators(text_result, vital_signs)
+        }
+    
+    @staticmethod
+    def _extraction_error(error: Exception) -> Dict[str, Any]:
+        """Step 1 result for a failed extraction"""
+        logger.error(f"Information extraction error: {error}")
+        return {
+            "success": False,
+            "error": str(error),
+            "extracted_symptoms": [],
+            "severity_indicators": []
+        }
     
     def perform_triage_assessment(self, extraction_result: Dict[str, Any]) -> Dict[str, Any]:
         """Step 2: Assess patient priority and urgency"""
@@ -142,7 +551,8 @@ class PatientDispatchWorkflow:
             severity_indicators = extraction_result.get("severity_indicators", [])
             
             # Calculate priority score (1-5, where 5 is most urgent)
-            priority_score = self.calculate_priority_score(symptoms, vital_signs, severity_indicators)
+            priority = self.evaluate_priority(symptoms, vital_signs, severity_indicators)
+            priority_score = priority["score"]
             
             # Determine urgency level
             if priority_score >= 5:
@@ -160,6 +570,7 @@ class PatientDispatchWorkflow:
                 "priority_score": priority_score,
                 "urgency_level": urgency_level,
                 "recommended_action": recommended_action,
+                "priority_rules": priority["fired"],
                 "triage_notes": f"Đánh giá dựa trên {len(symptoms)} triệu chứng và chỉ số sinh tồn"
             }
             
@@ -213,18 +624,19 @@ class PatientDispatchWorkflow:
                 "error": str(e)
             }
     
-    def execute_routing(self, routing_result: Dict[str, Any], patient_data: Dict[str, Any]) -> Dict[str, Any]:
-        """Step 4: Execute the routing decision"""
+    def execute_routing(self, routing_result: Dict[str, Any], patient_data: Dict[str, Any],
+                        lookup_cache: Optional[Dict] = None) -> Dict[str, Any]:
+        """Step 4: Execute the routing decision (lookup_cache shares lookups across a batch)"""
         try:
             route_type = routing_result.get("route_type")
             next_agent = routing_result.get("next_agent")
             
             if next_agent == "dispatch_agent":
                 # Emergency dispatch
-                result = self.handle_emergency_dispatch(patient_data, routing_result)
+                result = self.handle_emergency_dispatch(patient_data, routing_result, lookup_cache)
             elif next_agent == "hospital_agent":
                 # Hospital routing
-                result = self.handle_hospital_routing(patient_data, routing_result)
+                result = self.handle_hospital_routing(patient_data, routing_result, lookup_cache)
             else:
                 # QA consultation
                 result = self.handle_qa_consultation(patient_data, routing_result)
@@ -243,14 +655,20 @@ class PatientDispatchWorkflow:
                 "error": str(e)
             }
     
-    def handle_emergency_dispatch(self, patient_data: Dict[str, Any], routing_result: Dict[str, Any]) -> Dict[str, Any]:
+    def handle_emergency_dispatch(self, patient_data: Dict[str, Any], routing_result: Dict[str, Any],
+                                  lookup_cache: Optional[Dict] = None) -> Dict[str, Any]:
         """Handle emergency dispatch routing"""
         try:
             # Get available ambulances
-            ambulances = self.dispatch_agent.find_ambulance(
-                location=patient_data.get("location", {}),
-                priority=routing_result.get("priority_score", 5),
-                is_emergency=True
+            location = patient_data.get("location", {})
+            priority = routing_result.get("priority_score", 5)
+            ambulances = self._cached_lookup(
+                lookup_cache, ("ambulance", self._location_key(location), priority),
+                lambda: self.dispatch_agent.find_ambulance(
+                    location=location,
+                    priority=priority,
+                    is_emergency=True
+                )
             )
             
             if ambulances:
@@ -279,14 +697,21 @@ class PatientDispatchWorkflow:
                 "error": str(e)
             }
     
-    def handle_hospital_routing(self, patient_data: Dict[str, Any], routing_result: Dict[str, Any]) -> Dict[str, Any]:
+    def handle_hospital_routing(self, patient_data: Dict[str, Any], routing_result: Dict[str, Any],
+                                lookup_cache: Optional[Dict] = None) -> Dict[str, Any]:
         """Handle direct hospital routing"""
         try:
             # Find suitable hospitals
-            hospitals = self.hospital_agent.find_hospital(
-                location=patient_data.get("location", {}),
-                specialty=self.determine_required_specialty(patient_data),
-                priority=routing_result.get("priority_score", 3)
+            location = patient_data.get("location", {})
+            specialty = self.determine_required_specialty(patient_data)
+            priority = routing_result.get("priority_score", 3)
+            hospitals = self._cached_lookup(
+                lookup_cache, ("hospital", self._location_key(location), specialty, priority),
+                lambda: self.hospital_agent.find_hospital(
+                    location=location,
+                    specialty=specialty,
+                    priority=priority
+                )
             )
             
             if hospitals:
@@ -326,7 +751,8 @@ Khuyến nghị: Tư vấn trực tuyến"""
             # Initial response
             initial_response = self.qa_chatbot.ask_question(
                 "Xin chào, tôi có thể giúp gì cho bạn về tình trạng sức khỏe hiện tại?",
-                context
+                context,
+                fallback=lambda: {"answer": "Xin chào, tôi sẵn sàng tư vấn cho bạn."}
             )
             
             return {
@@ -334,6 +760,7 @@ Khuyến nghị: Tư vấn trực tuyến"""
                 "type": "qa_consultation",
                 "consultation_started": True,
                 "initial_response": initial_response.get("answer", "Xin chào, tôi sẵn sàng tư vấn cho bạn."),
+                "response_source": initial_response.get("source"),
                 "chat_context": context,
                 "message": "Đã kết nối với chuyên gia tư vấn y tế"
             }
@@ -347,15 +774,19 @@ Khuyến nghị: Tư vấn trực tuyến"""
                 "error": str(e)
             }
     
-    def optimize_assignment(self, execution_result: Dict[str, Any]) -> Dict[str, Any]:
+    def optimize_assignment(self, execution_result: Dict[str, Any],
+                            lookup_cache: Optional[Dict] = None) -> Dict[str, Any]:
         """Step 5: Final optimization and confirmation"""
         try:
             route_type = execution_result.get("type")
             
             if route_type == "emergency_dispatch":
                 # For emergency, also find backup hospital
-                backup_hospitals = self.hospital_agent.find_hospital(
-                    location={}, specialty="cấp cứu", priority=5
+                backup_hospitals = self._cached_lookup(
+                    lookup_cache, ("backup_hospital",),
+                    lambda: self.hospital_agent.find_hospital(
+                        location={}, specialty="cấp cứu", priority=5
+                    )
                 )
                 execution_result["backup_hospital"] = backup_hospitals[0] if backup_hospitals else None
                 
@@ -377,56 +808,263 @@ Khuyến nghị: Tư vấn trực tuyến"""
             return execution_result
     
     # Helper methods
+    @staticmethod
+    def _location_key(location: Any) -> Any:
+        """Hashable form of a location dict for lookup caching"""
+        if isinstance(location, dict):
+            return tuple(sorted(location.items()))
+        return location
+    
+    @staticmethod
+    def _cached_lookup(lookup_cache: Optional[Dict], key: tuple, lookup):
+        """Run lookup() once per key when a batch-wide cache is given"""
+        if lookup_cache is None:
+            return lookup()
+        try:
+            if key not in lookup_cache:
+                lookup_cache[key] = lookup()
+            return lookup_cache[key]
+        except TypeError:
+            # Unhashable location - no sharing for this patient
+            return lookup()
+    
     def check_severity_indicators(self, text_result: Dict, vital_signs: Dict) -> List[str]:
         """Check for severity indicators in symptoms and vital signs"""
         indicators = []
         
         # Check vital signs
-        if vital_signs.get("heart_rate", 0) > 100:
+        if vital_signs.get("heart_rate", 0) > TACHYCARDIA_HEART_RATE:
             indicators.append("Nhịp tim nhanh")
-        if vital_signs.get("spo2", 100) < 95:
+        if vital_signs.get("spo2", 100) < LOW_SPO2:
             indicators.append("SpO2 thấp")
         
-        # Check symptoms for emergency keywords
-        description = text_result.get("original_text", "").lower()
-        emergency_keywords = ["khó thở", "đau ngực", "choáng váng", "bất tỉnh", "co giật"]
+        # Check symptoms for emergency keywords (diacritics optional, typos tolerated)
+        red_flags = self.red_flag_extractor.phrases_in(text_result.get("original_text", ""))
         
-        for keyword in emergency_keywords:
-            if keyword in description:
+        for keyword in EMERGENCY_KEYWORDS:
+            if keyword in red_flags:
                 indicators.append(f"Triệu chứng khẩn cấp: {keyword}")
         
         return indicators
     
+    def evaluate_priority(self, symptoms: List, vital_signs: Dict, severity_indicators: List) -> Dict[str, Any]:
+        """Priority score from 1-5 and the ids of the rules that fired ("workflow_priority" ruleset)"""
+        features = dict(vital_signs)
+        features["symptom_count"] = len(symptoms)
+        features["indicator_count"] = len(severity_indicators)
+        return self.triage_rules.evaluate("workflow_priority", features)
+    
     def calculate_priority_score(self, symptoms: List, vital_signs: Dict, severity_indicators: List) -> int:
         """Calculate priority score from 1-5"""
-        score = 1
+        return self.evaluate_priority(symptoms, vital_signs, severity_indicators)["score"]
+    
+    @staticmethod
+    def _numeric_vital(value: Any) -> float:
+        """Vital-sign value as float; raises TypeError where the scalar comparisons would"""
+        if not isinstance(value, (int, float)):
+            raise TypeError(f"Vital sign is not numeric: {value!r}")
+        return float(value)
+    
+    def evaluate_priorities(self, symptom_counts: np.ndarray, heart_rate: np.ndarray,
+                            spo2: np.ndarray, indicator_counts: np.ndarray) -> Dict[str, Any]:
+        """Vectorized evaluate_priority: scores (n,), fired rule matrix (n, rules) and rule ids"""
+        return self.triage_rules.evaluate_batch("workflow_priority", {
+            "symptom_count": symptom_counts,
+            "indicator_count": indicator_counts,
+            "heart_rate": heart_rate,
+            "spo2": spo2
+        })
+    
+    def calculate_priority_scores(self, symptom_counts: np.ndarray, heart_rate: np.ndarray,
+                                  spo2: np.ndarray, indicator_counts: np.ndarray) -> np.ndarray:
+        """Vectorized calculate_priority_score over arrays of equal length"""
+        return self.evaluate_priorities(symptom_counts, heart_rate, spo2, indicator_counts)["scores"]
+    
+    def determine_required_specialty(self, patient_data: Dict) -> str:
+        """Determine required medical specialty"""
+        description = patient_data.get("description", "").lower()
+        
+        category = self.keyword_matcher.first_category(description, SPECIALTY_CATEGORIES)
+        return SPECIALTY_CATEGORIES.get(category, "nội tổng hợp")
+
+
+class AsyncPatientDispatchWorkflow(PatientDispatchWorkflow):
+    """
+    Asyncio workflow - one event loop serves many in-flight patients
+    
+    Blocking agent calls (model calls, hospital/ambulance lookups) run on a small
+    shared thread pool; triage and routing stay on the event loop. Coroutines are
+    a-prefixed (aprocess_patient_input, aiter_steps) so the inherited synchronous
+    methods keep working unchanged.
+    """
+    
+    def __init__(self, max_blocking_calls: int = 32):
+        super().__init__()
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_blocking_calls, thread_name_prefix="workflow-io"
+        )
+    
+    async def _run_blocking(self, func, *args, **kwargs):
+        """Run a blocking agent call on the workflow thread pool"""
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, context.run, functools.partial(func, *args, **kwargs))
+    
+    async def aprocess_patient_input(self, patient_data: Dict[str, Any],
+                                     sink: Optional[Callable[[StepEvent], None]] = None) -> Dict[str, Any]:
+        """Async version of PatientDispatchWorkflow.process_patient_input (same result shape)"""
+        workflow_result = self._new_workflow_result()
+        
+        with collect_llm_calls() as call_log:
+            try:
+                async for event in self.aiter_steps(patient_data, workflow_result["workflow_id"]):
+                    workflow_result["steps"][event.key] = event.result
+                    if sink is not None:
+                        sink(event)
+                return self._complete_workflow_result(workflow_result)
+                
+            except Exception as e:
+                return self._fail_workflow_result(workflow_result, e)
+            finally:
+                workflow_result["llm_calls"] = call_log.summary()
+    
+    async def aiter_steps(self, patient_data: Dict[str, Any],
+                          workflow_id: Optional[str] = None) -> AsyncIterator[StepEvent]:
+        """Async version of iter_steps, yielding the same StepEvents"""
+        extraction = await self._run_step_async(workflow_id, 1, self.aextract_patient_information(patient_data))
+        yield extraction
+        
+        triage = self._run_step(workflow_id, 2, self.perform_triage_assessment, extraction.result)
+        yield triage
         
-        # Base score from number of symptoms
-        score += min(len(symptoms) // 2, 1)
+        routing = self._run_step(workflow_id, 3, self.make_routing_decision, triage.result)
+        yield routing
         
-        # Add score for severity indicators
-        score += min(len(severity_indicators), 2)
+        # Step 5 needs a backup hospital for emergencies - start that lookup alongside step 4
+        backup_lookup = None
+        if routing.result.get("route_type") == "emergency_dispatch":
+            backup_lookup = asyncio.ensure_future(self._run_blocking(
+                self.hospital_agent.find_hospital, location={}, specialty="cấp cứu", priority=5
+            ))
         
-        # Vital signs impact
-        if vital_signs.get("heart_rate", 0) > 120:
-            score += 1
-        if vital_signs.get("spo2", 100) < 90:
-            score += 2
+        execution = await self._run_step_async(
+            workflow_id, 4, self._run_blocking(self.execute_routing, routing.result, patient_data)
+        )
+        yield execution
         
-        return min(score, 5)
+        lookup_cache: Dict = {}
+        if backup_lookup is not None:
+            try:
+                lookup_cache[("backup_hospital",)] = await backup_lookup
+            except Exception as e:
+                # optimize_assignment retries the lookup and records the error itself
+                logger.error(f"Backup hospital lookup error: {e}")
+        yield await self._run_step_async(
+            workflow_id, 5, self._run_blocking(self.optimize_assignment, execution.result, lookup_cache)
+        )
     
-    def determine_required_specialty(self, patient_data: Dict) -> str:
-        """Determine required medical specialty"""
-        description = patient_data.get("description", "").lower()
+    async def _run_step_async(self, workflow_id: Optional[str], step: int, awaitable) -> StepEvent:
+        """Await one workflow step and wrap its result in a StepEvent"""
+        key, name, log_message = WORKFLOW_STEPS[step - 1]
+        logger.info(f"Step {step}: {log_message}")
+        started = time.perf_counter()
+        result = await awaitable
+        return StepEvent(workflow_id, step, key, name, result, (time.perf_counter() - started) * 1000)
+    
+    async def aextract_patient_information(self, patient_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Async version of extract_patient_information: text and image analysis run concurrently"""
+        try:
+            with call_priority(self.pre_triage_priority(patient_data)):
+                text_call = None
+                if patient_data.get("description"):
+                    text_call = self._run_blocking(
+                        self.triage_cascade.extract_symptoms, patient_data["description"],
+                        patient_data.get("vital_signs"),
+                        fallback=functools.partial(self.rule_based_extraction, patient_data)
+                    )
+                
+                image_call = None
+                if patient_data.get("image_data"):
+                    image_call = self._run_blocking(self.image_processor.analyze_image, patient_data["image_data"])
+                
+                calls = [call for call in (text_call, image_call) if call is not None]
+                results = iter(await asyncio.gather(*calls))
+            text_result = next(results) if text_call is not None else {}
+            image_result = next(results) if image_call is not None else {}
+            
+            return self._combine_extraction(patient_data, text_result, image_result)
+            
+        except Exception as e:
+            return self._extraction_error(e)
+    
+    async def process_patients(self, patients: List[Dict[str, Any]],
+                               max_in_flight: int = 1000) -> List[Dict[str, Any]]:
+        """
+        Process many patients concurrently on the current event loop
+        
+        Args:
+            patients: List of patient dictionaries
+            max_in_flight: Upper bound on patients being processed at once
+            
+        Returns:
+            List of workflow results, in the same order as the input
+        """
+        semaphore = asyncio.Semaphore(max_in_flight)
         
-        if any(word in description for word in ["tim", "ngực", "huyết áp"]):
-            return "tim mạch"
-        elif any(word in description for word in ["phổi", "ho", "khó thở"]):
-            return "hô hấp"
-        elif any(word in description for word in ["dạ dày", "bụng", "tiêu hóa"]):
-            return "tiêu hóa"
-        else:
-            return "nội tổng hợp"
+        async def run_one(patient_data):
+            async with semaphore:
+                return await self.aprocess_patient_input(patient_data)
+        
+        return await asyncio.gather(*(run_one(patient) for patient in patients))
+    
+    async def stream_patients(self, patients: Iterable[Dict[str, Any]],
+                              max_in_flight: int = 32) -> AsyncIterator[Tuple[int, Dict[str, Any]]]:
+        """
+        Process patients concurrently and yield results as soon as each one finishes
+        
+        Args:
+            patients: Iterable of patient dictionaries, consumed lazily
+            max_in_flight: Upper bound on patients being processed at once
+            
+        Yields:
+            (input index, workflow result) in completion order; a failing patient
+            yields an error result without affecting the others
+        """
+        async def run_one(index, patient_data):
+            if not isinstance(patient_data, dict):
+                workflow_result = self._new_workflow_result()
+                error = TypeError(f"Patient must be an object, got {type(patient_data).__name__}")
+                return index, self._fail_workflow_result(workflow_result, error)
+            return index, await self.aprocess_patient_input(patient_data)
+        
+        pending = set()
+        patient_iter = enumerate(patients)
+        exhausted = False
+        
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_in_flight:
+                try:
+                    index, patient_data = next(patient_iter)
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(run_one(index, patient_data)))
+            if not pending:
+                break
+            
+            try:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+            except (asyncio.CancelledError, GeneratorExit):
+                # Consumer went away - do not leave orphaned patients running
+                for task in pending:
+                    task.cancel()
+                raise
+    
+    def close(self):
+        """Shut down the blocking-call thread pool"""
+        self.executor.shutdown(wait=False)
 
 
 def run_workflow_demo():